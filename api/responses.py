@@ -0,0 +1,45 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # a declared dependency; the stdlib encoder keeps minimal installs working
+    orjson = None
+
+
+def _default(obj):
+    import numpy as np  # only reached for values the encoder cannot handle itself
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serialisable")
+
+
+def dumps(content) -> bytes:
+    """
+    JSON bytes for content that may hold NumPy arrays and scalars. With
+    orjson installed arrays are encoded straight from their buffers.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSONResponse that skips jsonable_encoder and understands NumPy."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
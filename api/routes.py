@@ -1,190 +1,540 @@
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
-
-from fastapi import APIRouter, HTTPException
-# from fastapi.responses import JSONResponse
-from mcdn_engine.entropy_weights import entropy_weights
-from mcdn_engine.fuzzy_ahp import fuzzy_ahp
-from mcdn_engine.fuzzy_topsis import fuzzy_topsis
-import numpy as np
-from mcdn_engine.tfn import defuzz
-from services.criteria_suggester import GROQ_API_KEY , generate_criteria_suggestions
-from models import  SuggestCriteriaRequest, CombinedRequest
-import json, re, os, httpx
-from services.recommendations import generate_recommendation
-from services.sensitivity_analysis import sensitivity_analysis
-from services.normalise_real import normalise_real_values, merge_into_matrix
-from models import CombinedRequest, NormaliseRequest , NormaliseResult
+import config
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from models import (
+    SuggestCriteriaRequest, CombinedRequest, RealValuePrefillRequest, NormaliseRequest, NormaliseResult,
+    SensitivityIntervalRequest, SMAARequest, DatasetUpload, SessionPatch, BatchAnalyzeRequest,
+    MAX_SMAA_ALTERNATIVES,
+)
+import json, math, re, os, asyncio, tempfile, time
+from typing import List, Optional
+from services.result_cache import (
+    analysis_cache, cache_stats, canonical_key, ranking_store, tag_dataset, purge_dataset,
+)
+from services.process_pool import (
+    pool_stats, run_cpu,
+    PoolSaturated, DeadlineExceeded, PoolUnavailable,
+)
+from services.http_client import get_http_client
+from api.responses import NumpyJSONResponse, dumps
+from services.telemetry import (
+    stage_timer, timed, server_timing, size_bucket, render_registry, render_gauges,
+    analyze_seconds, analyze_stage_seconds, groq_seconds, groq_first_token_seconds,
+)
+# The LLM and web-search subsystems (services.criteria_suggester,
+# services.evidence, services.suggestion_cache) and everything that needs
+# NumPy (mcdn_engine, the analysis, session, dataset, SMAA and batch
+# services) are imported inside their handlers, so start-up does not pay
+# for them.
 
 router = APIRouter()
 
-@router.post("/normalise")
-def normalise(req: NormaliseRequest):
-    if not req.real_values:
-        raise HTTPException(400, "No real values provided")
 
-    result = normalise_real_values(
-        req.criteria,
-        req.alternatives,
-        req.benefit,
-        req.real_values,
-    )
+def _resolve(req):
+    from services.dataset_store import DatasetNotFound, resolve_dataset
 
-    return {
-        "normalised_scores": result["normalised_scores"],
-        "per_criterion":     result["per_criterion"],
-    }
-
-@router.post("/analyze")
-def analyze(req: CombinedRequest):
-    n_c = len(req.criteria)
-    n_a = len(req.alternatives)
+    try:
+        return resolve_dataset(req)
+    except DatasetNotFound:
+        raise HTTPException(404, "Unknown dataset_id")
 
-    if n_c < 2:
-        raise HTTPException(400, "Need at least 2 criteria")
-    if n_a < 2:
-        raise HTTPException(400, "Need at least 2 alternatives")
-    
 
-    # merge real values into score matrix 
-    score_matrix = req.score_matrix
-    normalise_meta = None
+@router.post("/datasets")
+def upload_dataset(req: DatasetUpload):
+    """Store a decision matrix once; later calls reference it by dataset_id."""
+    from services.dataset_store import real_values_to_array, save_dataset
+    from services.normalise_real import has_real_values
 
-    if req.real_values:
-        norm_result = normalise_real_values(
+    try:
+        real_values = None
+        if has_real_values(req.real_values):
+            real_values = real_values_to_array(req.real_values, req.criteria, req.alternatives)
+        dataset_id = save_dataset(
             req.criteria,
             req.alternatives,
             req.benefit,
-            req.real_values
-        )
-        score_matrix = merge_into_matrix(
             req.score_matrix,
-            norm_result["normalised_scores"],
-            req.criteria,
-            req.alternatives
+            req.preference_matrix,
+            real_values,
         )
-        normalise_meta = norm_result["per_criterion"]
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return dataset_summary(dataset_id)
 
-    #  Get weights
-    ahp_w, lam, ci, cr = fuzzy_ahp(n_c, req.preference_matrix)  # TFN
 
+@router.get("/datasets/{dataset_id}")
+def get_dataset(dataset_id: str):
+    from services.dataset_store import DatasetNotFound, dataset_summary
 
-    ent_w, entropy = entropy_weights(score_matrix, req.benefit)  # crisp
-    print("\n=== ENTROPY VALUES ===")
-    for i, e in enumerate(entropy):
-        print(f"  {req.criteria[i]}: entropy={e:.4f}  weight={ent_w[i]:.4f}")
+    try:
+        return dataset_summary(dataset_id)
+    except DatasetNotFound:
+        raise HTTPException(404, "Unknown dataset_id")
 
-    #  Adaptive alpha (use defuzzed AHP)
-    def adaptive_alpha(ahp_w, ent_w):
-        ahp_crisp = np.array([defuzz(w) for w in ahp_w])
-        ahp_var = np.var(ahp_crisp)
-        ent_var = np.var(ent_w)
 
-        total = ahp_var + ent_var
-        return ahp_var / total if total != 0 else 0.5
+@router.delete("/datasets/{dataset_id}")
+def remove_dataset(dataset_id: str):
+    from services.dataset_store import DatasetNotFound, delete_dataset
 
-    alpha = adaptive_alpha(ahp_w, ent_w)
+    try:
+        delete_dataset(dataset_id)
+    except DatasetNotFound:
+        raise HTTPException(404, "Unknown dataset_id")
+    # responses computed from it must not outlive it
+    purge_dataset(dataset_id)
+    return {"deleted": dataset_id}
 
-    # Convert entropy → TFN
-    ent_w_tfn = [(w, w, w) for w in ent_w]
 
-    # Combine weights (fuzzy)
-    cw_fuzzy = [
-        (
-            ahp_w[i][0] * alpha + ent_w_tfn[i][0] * (1 - alpha),
-            ahp_w[i][1] * alpha + ent_w_tfn[i][1] * (1 - alpha),
-            ahp_w[i][2] * alpha + ent_w_tfn[i][2] * (1 - alpha),
-        )
-        for i in range(n_c)
-    ]
+@router.post("/normalise")
+def normalise(req: NormaliseRequest):
+    from services.normalise_real import normalise_real_values, has_real_values
 
-    #  Normalize fuzzy weights
-    sum_l = sum(w[0] for w in cw_fuzzy)
-    sum_m = sum(w[1] for w in cw_fuzzy)
-    sum_u = sum(w[2] for w in cw_fuzzy)
+    req = _resolve(req)
+    if not has_real_values(req.real_values):
+        raise HTTPException(400, "No real values provided")
 
-    cw_fuzzy = [
-        (
-            w[0] / sum_l if sum_l else 0,
-            w[1] / sum_m if sum_m else 0,
-            w[2] / sum_u if sum_u else 0,
+    try:
+        result = normalise_real_values(
+            req.criteria,
+            req.alternatives,
+            req.benefit,
+            req.real_values,
         )
-        for w in cw_fuzzy
-    ]
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    return {
+        "normalised_scores": result["normalised_scores"],
+        "per_criterion":     result["per_criterion"],
+    }
+
+NO_CACHE_DIRECTIVES = ("no-cache", "no-store")
 
-    #  Fuzzy TOPSIS
-    cc, d_pos, d_neg = fuzzy_topsis(
-        score_matrix,
-        cw_fuzzy,
-        req.benefit,
+
+def _cache_opt_out(request: Request) -> bool:
+    """Clients skip the result cache with Cache-Control: no-cache or X-No-Cache: 1."""
+    cache_control = request.headers.get("cache-control", "").lower()
+    return (
+        any(d in cache_control for d in NO_CACHE_DIRECTIVES)
+        or request.headers.get("x-no-cache", "").lower() in ("1", "true")
     )
 
-    #  Defuzz weights for UI modules
-    cw_display = [defuzz(w) for w in cw_fuzzy]
 
-    #  Sensitivity & recommendation (use crisp weights)
-    sens = sensitivity_analysis(
-        req.alternatives,
-        score_matrix,
-        cw_display,
-        req.benefit,
-        req.criteria,
+def analysis_key(req: CombinedRequest) -> str:
+    """Canonical hash of everything that influences an /analyze response."""
+    body = req.model_dump()
+    if body["include"] is not None:
+        body["include"] = sorted(set(body["include"]))
+    return canonical_key("analyze", body)
+
+
+def _validate_analysis(req: CombinedRequest) -> CombinedRequest:
+    from services.analysis_pipeline import validate_request
+
+    try:
+        validate_request(req)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return req
+
+
+@router.post("/analyze", response_class=NumpyJSONResponse)
+async def analyze(req: CombinedRequest, request: Request, response: Response):
+    from services.analysis_pipeline import analyze_request
+    from services.dataset_store import DatasetNotFound
+
+    t0 = time.perf_counter()
+    use_cache = not _cache_opt_out(request)
+    # top_k pages are stored under the same key, cache or not
+    key = analysis_key(req) if use_cache or req.top_k is not None else None
+    if key is not None and req.dataset_id:
+        tag_dataset(req.dataset_id, key)
+
+    if use_cache:
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            _record_analyze(response, cached, {"cache": time.perf_counter() - t0}, "hit")
+            response.headers["X-Cache"] = "HIT"
+            return NumpyJSONResponse(_keep_ranking(cached, key), headers=dict(response.headers))
+
+    # CPU-bound: run on the process pool so the event loop stays free
+    try:
+        result, stages = await run_cpu(analyze_request, req)
+    except PoolSaturated:
+        raise HTTPException(429, "Analysis queue is full, retry shortly", headers={"Retry-After": "1"})
+    except DeadlineExceeded:
+        raise HTTPException(503, "Analysis did not finish within its deadline")
+    except PoolUnavailable:
+        raise HTTPException(503, "Analysis workers are restarting, retry shortly", headers={"Retry-After": "1"})
+    except DatasetNotFound:
+        raise HTTPException(404, "Unknown dataset_id")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    # queueing and pickling between the parent and the worker
+    stages["pool"] = max(0.0, time.perf_counter() - t0 - sum(stages.values()))
+    if use_cache:
+        analysis_cache.set(key, result)
+        response.headers["X-Cache"] = "MISS"
+    else:
+        response.headers["X-Cache"] = "BYPASS"
+    _record_analyze(response, result, stages, "miss" if use_cache else "bypass")
+    return NumpyJSONResponse(_keep_ranking(result, key), headers=dict(response.headers))
+
+
+def _keep_ranking(result: dict, key: str) -> dict:
+    """
+    Store a top_k response's full ranking under its analysis key and point
+    next_cursor at the second page; returns the body without it. Cached
+    results keep "_ranking", so a hit can restore an expired store entry.
+    """
+    stored = result.get("_ranking")
+    if stored is None:
+        return result
+    body = {k: v for k, v in result.items() if k != "_ranking"}
+    page = body["ranking_page"]
+    if key is not None:
+        ranking_store.set(key, stored)
+        if page["limit"] < page["total"]:
+            body["ranking_page"] = {**page, "next_cursor": f"{key}:{page['limit']}"}
+    return body
+
+
+@router.get("/analyze/ranking", response_class=NumpyJSONResponse)
+def analyze_ranking_page(cursor: str, limit: Optional[int] = Query(None, ge=1, le=10000)):
+    """
+    The next page of a top_k /analyze ranking, from the full score vector
+    kept server-side; nothing is recomputed. limit defaults to the top_k
+    of the original request.
+    """
+    from services.analysis_pipeline import ranking_page
+
+    key, _, offset = cursor.rpartition(":")
+    if not key or not offset.isdigit():
+        raise HTTPException(400, "Malformed cursor")
+    stored = ranking_store.get(key)
+    if stored is None:
+        raise HTTPException(404, "Ranking expired; re-run /analyze with top_k")
+
+    offset = int(offset)
+    limit = limit or stored["limit"]
+    page = ranking_page(stored, offset, limit)
+    end = offset + limit
+    page["next_cursor"] = f"{key}:{end}" if end < page["total"] else None
+    return NumpyJSONResponse(page)
+
+
+def _record_analyze(response: Response, result: dict, stages: dict, cache: str):
+    """Server-Timing header plus the stage and end-to-end histograms."""
+    size = size_bucket(len(result["alternatives"]), len(result["criteria"]))
+    total = sum(stages.values())
+    for stage, seconds in stages.items():
+        analyze_stage_seconds.observe(seconds, stage=stage, size=size)
+    analyze_seconds.observe(total, size=size, cache=cache)
+    response.headers["Server-Timing"] = server_timing({**stages, "total": total})
+
+
+@router.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of latency histograms, pool and cache state."""
+    pool = pool_stats.snapshot()
+    lines = render_registry()
+    lines += render_gauges(
+        "dss_pool", "Process-pool admission state.",
+        {k: v for k, v in pool.items() if not k.startswith("wait_")}, "field",
+    )
+    lines += render_gauges(
+        "dss_pool_wait_seconds", "Queue wait before a worker picked the job up.",
+        {"0.5": pool["wait_seconds_p50"], "0.99": pool["wait_seconds_p99"], "1": pool["wait_seconds_max"]},
+        "quantile",
+    )
+    from services.criteria_suggester import suggestion_flights
+    from services.suggestion_cache import suggestion_cache
+
+    for name, stats in {**cache_stats(), "suggestions": suggestion_cache.stats()}.items():
+        lines += render_gauges(
+            f"dss_cache_{name}", f"{name} cache counters.",
+            {k: v for k, v in stats.items() if isinstance(v, (int, float))}, "field",
+        )
+    lines += render_gauges(
+        "dss_suggestion_coalescing", "Single-flight counters for suggestion calls.",
+        suggestion_flights.stats(), "field",
     )
+    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
 
-    recommendation = generate_recommendation(
-    req.alternatives,
-    score_matrix,       # correct: raw score matrix for contribution analysis
-    cc,                 # correct: closeness coefficients to identify winner
-    cw_display,
-    req.criteria,
-    req.benefit,        # now passed: needed for strength/weakness classification
-    sensitivity_result=sens  # now passed: enables confidence message
-)
 
-    #  Ranking
-    ranked = sorted(range(n_a), key=lambda x: cc[x], reverse=True)
-
-    table = [
-        {
-            "rank": r + 1,
-            "alternative": req.alternatives[idx],
-            "closeness": round(cc[idx], 4),
-            "d_pos": round(d_pos[idx], 4),
-            "d_neg": round(d_neg[idx], 4),
-            "idx": idx,
-        }
-        for r, idx in enumerate(ranked)
+@router.get("/metrics/pool")
+def get_pool_metrics():
+    """Queue depth, admission counters and queue-wait percentiles."""
+    return pool_stats.snapshot()
+
+
+MAX_BATCH_SCENARIOS = 1000
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(batch: BatchAnalyzeRequest, request: Request):
+    """
+    Analyse many scenarios in parallel and stream one NDJSON line per
+    scenario as soon as it is ready. Lines carry the scenario's index, so
+    they may arrive out of order. Cached scenarios are emitted first.
+    """
+    from services.batch import plan_batches, stream_batches
+
+    if not batch.scenarios:
+        raise HTTPException(400, "No scenarios provided")
+    if len(batch.scenarios) > MAX_BATCH_SCENARIOS:
+        raise HTTPException(400, f"At most {MAX_BATCH_SCENARIOS} scenarios per batch")
+
+    use_cache = not _cache_opt_out(request)
+    keys = [
+        analysis_key(req) if use_cache or req.top_k is not None else None
+        for req in batch.scenarios
     ]
+    for req, key in zip(batch.scenarios, keys):
+        if key is not None and req.dataset_id:
+            tag_dataset(req.dataset_id, key)
+
+    hits, pending = [], []
+    for index, req in enumerate(batch.scenarios):
+        cached = analysis_cache.get(keys[index]) if use_cache else None
+        if cached is not None:
+            hits.append({
+                "index": index, "status": 200, "cache": "HIT", "result": _keep_ranking(cached, keys[index]),
+            })
+        else:
+            pending.append((index, req))
+
+    async def lines():
+        for line in hits:
+            yield dumps(line) + b"\n"
+        if not pending:
+            return
+        batches = plan_batches(pending)
+        async for line in stream_batches(batches):
+            if line["status"] == 200:
+                if use_cache:
+                    analysis_cache.set(keys[line["index"]], line["result"])
+                line["result"] = _keep_ranking(line["result"], keys[line["index"]])
+            yield dumps(line) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/sessions", response_class=NumpyJSONResponse)
+def create_analysis_session(req: CombinedRequest):
+    """Start an editable analysis; later slider moves go through PATCH."""
+    from services.sessions import create_session, get_session, session_snapshot
+
+    req = _validate_analysis(_resolve(req))
+    try:
+        session_id = create_session(req)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return NumpyJSONResponse(session_snapshot(session_id, get_session(session_id)))
+
+
+def _session_or_404(session_id: str):
+    from services.sessions import SessionNotFound, get_session
+
+    try:
+        return get_session(session_id)
+    except SessionNotFound:
+        raise HTTPException(404, "Unknown or expired session")
+
+
+@router.get("/sessions/{session_id}", response_class=NumpyJSONResponse)
+def read_analysis_session(session_id: str, include_sensitivity: bool = True):
+    from services.sessions import session_snapshot
+
+    session = _session_or_404(session_id)
+    with session["lock"]:
+        return NumpyJSONResponse(session_snapshot(session_id, session, include_sensitivity))
+
+
+@router.patch("/sessions/{session_id}", response_class=NumpyJSONResponse)
+def update_analysis_session(session_id: str, patch: SessionPatch):
+    """Apply single-cell edits and recompute only the affected state."""
+    from services.sessions import apply_updates, session_snapshot
+
+    session = _session_or_404(session_id)
+    with session["lock"]:
+        try:
+            apply_updates(session, patch.updates)
+        except (IndexError, ValueError) as e:
+            raise HTTPException(400, str(e))
+        return NumpyJSONResponse(session_snapshot(session_id, session, patch.include_sensitivity))
+
+
+@router.delete("/sessions/{session_id}")
+def delete_analysis_session(session_id: str):
+    from services.sessions import sessions
+
+    if sessions.pop(session_id) is None:
+        raise HTTPException(404, "Unknown or expired session")
+    return {"deleted": session_id}
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    return cache_stats()
+
+
+@router.post("/sensitivity/intervals")
+def sensitivity_intervals(req: SensitivityIntervalRequest):
+    """Exact per-criterion weight ranges over which the top-k set holds."""
+    from services.analysis_pipeline import validate_matrix
+    from services.sensitivity_analysis import stability_intervals
+
+    req = _resolve(req)
+    try:
+        validate_matrix(req.criteria, req.alternatives, req.score_matrix, req.benefit)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if len(req.combined_weights) != len(req.criteria):
+        raise HTTPException(400, "combined_weights must have one entry per criterion")
+    if not all(math.isfinite(w) and w >= 0 for w in req.combined_weights) or sum(req.combined_weights) <= 0:
+        raise HTTPException(400, "combined_weights must be finite, non-negative and not all zero")
+    if not all(math.isfinite(x) for row in req.score_matrix for x in row):
+        raise HTTPException(400, "score_matrix must be finite")
+    if req.top_k < 1:
+        raise HTTPException(400, "top_k must be at least 1")
+
+    try:
+        return stability_intervals(
+            req.alternatives,
+            req.score_matrix,
+            req.combined_weights,
+            req.benefit,
+            req.criteria,
+            top_k=req.top_k,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    return {
-        "ranking_table": table,
-        "winner": req.alternatives[ranked[0]],
-        "ahp_weights": ahp_w,               
-        "entropy_weights": ent_w,            
-        "combined_weights": cw_display,       
-        "entropy_values": entropy,
-        "consistency": {
-            "lambda_max": lam,
-            "CI": ci,
-            "CR": cr,
-            "ok": cr < 0.1,
-        },
-        "criteria": req.criteria,
-        "alternatives": req.alternatives,
-        "benefit": req.benefit,
-        "recommendation": recommendation,
-        "sensitivity": sens,
-        "normalisation_meta": normalise_meta
-    }
+
+@router.post("/smaa")
+async def smaa(req: SMAARequest):
+    """Stochastic rank acceptability analysis, streamed as NDJSON progress lines."""
+    import numpy as np
+    from mcdn_engine.fuzzy_ahp import fuzzy_ahp, AHP_METHODS
+    from services.smaa import stream_smaa, dirichlet_alpha, smaa_distance_cells
+
+    req = _resolve(req)
+    n_c = len(req.criteria)
+
+    if n_c < 2:
+        raise HTTPException(400, "Need at least 2 criteria")
+    if len(req.alternatives) < 2:
+        raise HTTPException(400, "Need at least 2 alternatives")
+    if len(req.alternatives) > MAX_SMAA_ALTERNATIVES:
+        raise HTTPException(400, f"SMAA takes at most {MAX_SMAA_ALTERNATIVES} alternatives")
+
+    if req.weight_source == "dirichlet":
+        if not req.combined_weights or len(req.combined_weights) != n_c:
+            raise HTTPException(400, "dirichlet sampling needs combined_weights for every criterion")
+        params = dirichlet_alpha(req.combined_weights, req.concentration)
+    elif req.weight_source == "fuzzy_ahp":
+        if not req.preference_matrix:
+            raise HTTPException(400, "fuzzy_ahp sampling needs a preference_matrix")
+        if req.ahp_method not in AHP_METHODS:
+            raise HTTPException(400, f"ahp_method must be one of {', '.join(AHP_METHODS)}")
+        try:
+            ahp_w, _, _, _ = fuzzy_ahp(n_c, req.preference_matrix, req.ahp_method)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        params = np.array(ahp_w, dtype=float)
+    else:
+        raise HTTPException(400, "weight_source must be 'dirichlet' or 'fuzzy_ahp'")
+
+    # validate and prepare before the 200 goes out with the stream
+    try:
+        d_pos_cells, d_neg_cells = smaa_distance_cells(
+            req.score_matrix, req.benefit, len(req.alternatives), n_c
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    async def events():
+        async for event in stream_smaa(
+            req.alternatives,
+            req.criteria,
+            d_pos_cells,
+            d_neg_cells,
+            req.weight_source,
+            params,
+            req.n_samples,
+            req.seed,
+            req.chunk_size,
+            req.ranks,
+        ):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# out-of-core ranking reads the whole upload, so it gets longer than /analyze
+STREAM_DEADLINE = float(os.getenv("DSS_STREAM_DEADLINE", 600))
+# upload bytes gathered per spool write, so each thread hop writes ~1 MB
+SPOOL_WRITE_BYTES = 1 << 20
+
+
+@router.post("/topsis/stream")
+async def topsis_stream(
+    request: Request,
+    benefit: List[bool] = Query(...),
+    weights: Optional[List[float]] = Query(None),
+    format: str = Query("csv"),
+    header: bool = True,
+    id_column: bool = False,
+    top_k: int = 50,
+    chunk_rows: int = 65536,
+):
+    """
+    Rank a large alternative set uploaded as the raw request body (CSV or
+    .npy). The body is spooled to disk and ranked out of core; entropy
+    weights are used when no weights are given.
+    """
+    from mcdn_engine.streaming_topsis import rank_file
+
+    if format not in ("csv", "npy"):
+        raise HTTPException(400, "format must be 'csv' or 'npy'")
+    if top_k < 1 or chunk_rows < 1:
+        raise HTTPException(400, "top_k and chunk_rows must be positive")
+
+    # file I/O runs in worker threads, off the event loop
+    fd, path = await asyncio.to_thread(tempfile.mkstemp, suffix=f".{format}")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pending = bytearray()
+            async for part in request.stream():
+                pending += part
+                if len(pending) >= SPOOL_WRITE_BYTES:
+                    await asyncio.to_thread(f.write, pending)
+                    pending = bytearray()
+            await asyncio.to_thread(f.write, pending)
+
+        try:
+            return await run_cpu(
+                rank_file, path, format, benefit, weights, top_k, chunk_rows, header, id_column,
+                deadline=STREAM_DEADLINE,
+            )
+        except PoolSaturated:
+            raise HTTPException(429, "Analysis queue is full, retry shortly", headers={"Retry-After": "1"})
+        except DeadlineExceeded:
+            raise HTTPException(503, "Ranking did not finish within its deadline")
+        except PoolUnavailable:
+            raise HTTPException(503, "Analysis workers are restarting, retry shortly", headers={"Retry-After": "1"})
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    finally:
+        await asyncio.to_thread(os.remove, path)
 
 
 #===================== GROQ helper ==============================================
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_API_KEY = config.GROQ_API_KEY
+GROQ_URL = config.GROQ_URL
+GROQ_MODEL = config.GROQ_MODEL
 
 
 async def _groq_chat(system: str, user: str, max_tokens: int = 1200, temperature: float = 0.6) -> str:
@@ -197,10 +547,56 @@ async def _groq_chat(system: str, user: str, max_tokens: int = 1200, temperature
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
-    async with httpx.AsyncClient(timeout=25) as client:
-        r = await client.post(GROQ_URL, headers=headers, json=payload)
-        r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"]
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        with timed("groq"):
+            r = await get_http_client().post(GROQ_URL, headers=headers, json=payload)
+            r.raise_for_status()
+            content = r.json()["choices"][0]["message"]["content"]
+        outcome = "ok"
+        return content
+    finally:
+        groq_seconds.observe(time.perf_counter() - t0, mode="chat", outcome=outcome)
+
+
+async def _groq_chat_stream(system: str, user: str, max_tokens: int = 1200, temperature: float = 0.6):
+    """Yield content deltas from Groq's server-sent-event completion stream."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set")
+    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    t0 = time.perf_counter()
+    first = True
+    outcome = "error"
+    try:
+        async with get_http_client().stream("POST", GROQ_URL, headers=headers, json=payload) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    if first:
+                        groq_first_token_seconds.observe(time.perf_counter() - t0)
+                        first = False
+                    yield delta
+        outcome = "ok"
+    except GeneratorExit:
+        # the consumer stopped early (enough suggestions); not an upstream error
+        outcome = "ok"
+        raise
+    finally:
+        groq_seconds.observe(time.perf_counter() - t0, mode="stream", outcome=outcome)
 
 
 def _parse_json_from_text(text: str):
@@ -222,18 +618,85 @@ CRITERIA_SYSTEM = (
 )
 #---------------------------------------------------------------------------------------------------------------------------------#
 
-@router.post("/suggest-criteria")
-async def suggest_criteria(req: SuggestCriteriaRequest):
-    """Return AI-generated criteria suggestions for the user's decision."""
+@router.get("/suggest-criteria/cache/stats")
+def suggestion_cache_stats():
+    from services.criteria_suggester import suggestion_flights
+    from services.suggestion_cache import suggestion_cache
 
-    return await generate_criteria_suggestions(
-        req,
-        _groq_chat,
-        _parse_json_from_text,
-        CRITERIA_SYSTEM
-    )
+    return {**suggestion_cache.stats(), "coalescing": suggestion_flights.stats()}
 
 
+@router.post("/suggest-criteria")
+async def suggest_criteria(req: SuggestCriteriaRequest, response: Response):
+    """Return AI-generated criteria suggestions for the user's decision."""
+    from services.criteria_suggester import generate_criteria_suggestions
+
+    with stage_timer() as stages:
+        result = await generate_criteria_suggestions(
+            req,
+            _groq_chat,
+            _parse_json_from_text,
+            CRITERIA_SYSTEM
+        )
+    response.headers["Server-Timing"] = server_timing(stages)
+    return result
+
+
+@router.post("/real-values/prefill")
+async def prefill_real_values(req: RealValuePrefillRequest):
+    """
+    Web evidence and numeric candidates for each (alternative, criterion)
+    cell. Suggestions only: nothing is merged into the score matrix.
+    """
+    if req.units is not None and len(req.units) != len(req.criteria):
+        raise HTTPException(400, "units must match criteria")
+    from services.evidence import gather_evidence, prefill_queries, extract_numbers
+
+    queries = prefill_queries(req.alternatives, req.criteria, req.units)
+    evidence = await gather_evidence(queries, deadline=req.deadline)
+
+    cells = []
+    suggested = {}
+    units = req.units or [""] * len(req.criteria)
+    cell_queries = iter(queries)
+    for alt in req.alternatives:
+        for crit, unit in zip(req.criteria, units):
+            query = next(cell_queries)
+            snippets = evidence["results"].get(query)
+            candidates = extract_numbers(snippets or [], unit)
+            if candidates:
+                suggested[f"{alt}__{crit}"] = candidates[0]
+            cells.append({
+                "alternative": alt,
+                "criterion": crit,
+                "query": query,
+                "found": snippets is not None,
+                "snippets": snippets or [],
+                "candidates": candidates,
+            })
 
+    return {
+        "cells": cells,
+        "suggested_real_values": suggested,
+        **{k: evidence[k] for k in ("timed_out", "failed", "skipped", "elapsed")},
+    }
 
 
+@router.post("/suggest-criteria/stream")
+async def suggest_criteria_stream(req: SuggestCriteriaRequest):
+    """
+    Server-sent events: one "criterion" event per suggestion as soon as
+    the model finishes writing it, then "done" (or "error").
+    """
+    from services.criteria_suggester import stream_criteria_suggestions
+    async def events():
+        async for event, data in stream_criteria_suggestions(
+            req, _groq_chat_stream, CRITERIA_SYSTEM
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
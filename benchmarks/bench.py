@@ -0,0 +1,304 @@
+"""
+Benchmarks for the MCDM engine and the /analyze pipeline.
+
+    python benchmarks/bench.py                       # quick grid -> benchmarks/results/<timestamp>.json
+    python benchmarks/bench.py --grid full --out base.json
+    python benchmarks/bench.py --compare base.json   # run, then flag regressions against base.json
+    python benchmarks/bench.py --report new.json --compare base.json   # compare two stored reports
+
+Inputs are synthetic and seeded, so two runs on the same machine time the
+same work. Each case is timed with perf_counter until it has at least
+--min-repeats samples and --budget seconds of samples (or --max-repeats),
+then run once more under tracemalloc for peak Python-side memory (NumPy
+buffers are tracked too). tracemalloc only sees this process, so for
+analyze, whose work happens in a pool worker, the memory sample runs the
+same pipeline in-process instead of through the HTTP client. Cases whose matrix exceeds a benchmark's cell
+cap are skipped and reported as such.
+
+Compare mode matches cases on (bench, m, n) and flags any whose p50 grew
+by more than --threshold (default 20%); the exit status is 1 when there
+is a regression, so it can gate a CI job.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+# /analyze runs on the process pool; big grid points need more than the default deadline
+os.environ.setdefault("DSS_ANALYZE_DEADLINE", "3600")
+
+from mcdn_engine.entropy_weights import entropy_weights  # noqa: E402
+from mcdn_engine.fuzzy_ahp import fuzzy_ahp  # noqa: E402
+from mcdn_engine.fuzzy_topsis import fuzzy_topsis  # noqa: E402
+from services.normalise_real import normalise_real_values  # noqa: E402
+from services.recommendations import generate_recommendation  # noqa: E402
+from services.sensitivity_analysis import sensitivity_analysis  # noqa: E402
+
+GRIDS = {
+    "quick": {"m": [3, 100, 1000], "n": [2, 10, 50]},
+    "full": {"m": [3, 100, 1000, 10_000, 100_000], "n": [2, 10, 50, 200]},
+}
+
+# largest m*n each benchmark is run at; the per-cell Python work in the
+# real-value and recommendation paths makes the top of the grid take minutes
+CELL_CAPS = {
+    "fuzzy_ahp": None,
+    "entropy_weights": 20_000_000,
+    "fuzzy_topsis": 20_000_000,
+    "fuzzy_topsis_float32": 20_000_000,
+    "sensitivity_analysis": 5_000_000,
+    "normalise_real_values": 1_000_000,
+    "generate_recommendation": 5_000_000,
+    "analyze": 2_000_000,
+}
+
+
+def make_case(m: int, n: int, seed: int) -> dict:
+    """Seeded synthetic inputs shared by every benchmark at one grid point."""
+    rng = np.random.default_rng([seed, m, n])
+    scores = rng.uniform(1, 9, (m, n)).round(2)
+    benefit = (rng.random(n) < 0.7).tolist()
+
+    pref = np.ones((n, n))
+    iu = np.triu_indices(n, 1)
+    pref[iu] = rng.choice([1, 2, 3, 4, 5, 1 / 2, 1 / 3, 1 / 4, 1 / 5], size=len(iu[0]))
+    pref[(iu[1], iu[0])] = 1 / pref[iu]
+
+    criteria = [f"C{j}" for j in range(n)]
+    alternatives = [f"A{i}" for i in range(m)]
+    weights = rng.dirichlet(np.ones(n))
+    raw = rng.lognormal(3, 1, (m, n))
+
+    return {
+        "m": m,
+        "n": n,
+        "criteria": criteria,
+        "alternatives": alternatives,
+        "scores": scores.tolist(),
+        "benefit": benefit,
+        "pref": pref.tolist(),
+        "weights": weights.tolist(),
+        "tfn_weights": [(w * 0.9, w, w * 1.1) for w in weights.tolist()],
+        "closeness": rng.random(m).tolist(),
+        "real_values": {
+            f"{a}__{c}": float(raw[i, j])
+            for i, a in enumerate(alternatives)
+            for j, c in enumerate(criteria)
+        } if m * n <= CELL_CAPS["normalise_real_values"] else None,
+    }
+
+
+def _analyze_client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
+
+
+def benchmarks(client_factory):
+    """name -> (case -> zero-argument callable)."""
+    client = {}
+
+    def analyze(case):
+        if "c" not in client:
+            client["c"] = client_factory()
+        body = {
+            "criteria": case["criteria"],
+            "alternatives": case["alternatives"],
+            "preference_matrix": case["pref"],
+            "score_matrix": case["scores"],
+            "benefit": case["benefit"],
+        }
+
+        def call():
+            r = client["c"].post("/api/analyze", json=body, headers={"X-No-Cache": "1"})
+            r.raise_for_status()
+
+        def in_process():
+            from models import CombinedRequest
+            from services.analysis_pipeline import analyze_request
+            from services.result_cache import ahp_cache, entropy_cache
+
+            # cold stage caches, as in a worker seeing this matrix first
+            ahp_cache.clear()
+            entropy_cache.clear()
+            analyze_request(CombinedRequest(**body))
+
+        call.memory_fn = in_process
+        return call
+
+    return {
+        "fuzzy_ahp": lambda c: lambda: fuzzy_ahp(c["n"], c["pref"]),
+        "entropy_weights": lambda c: lambda: entropy_weights(c["scores"], c["benefit"]),
+        "fuzzy_topsis": lambda c: lambda: fuzzy_topsis(c["scores"], c["tfn_weights"], c["benefit"]),
+        "fuzzy_topsis_float32": lambda c: lambda: fuzzy_topsis(
+            c["scores"], c["tfn_weights"], c["benefit"], dtype=np.float32
+        ),
+        "sensitivity_analysis": lambda c: lambda: sensitivity_analysis(
+            c["alternatives"], c["scores"], c["weights"], c["benefit"], c["criteria"]
+        ),
+        "normalise_real_values": lambda c: lambda: normalise_real_values(
+            c["criteria"], c["alternatives"], c["benefit"], c["real_values"]
+        ),
+        "generate_recommendation": lambda c: lambda: generate_recommendation(
+            c["alternatives"], c["scores"], c["closeness"], c["weights"], c["criteria"], c["benefit"]
+        ),
+        "analyze": analyze,
+    }
+
+
+def _percentile(samples, q):
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+
+def time_case(fn, min_repeats: int, max_repeats: int, budget: float) -> dict:
+    """
+    Timing percentiles of fn, plus peak memory of one run of fn.memory_fn
+    (fn itself when it has none) under tracemalloc.
+    """
+    fn()  # warm-up: imports, lru caches, pool start-up
+    samples = []
+    while len(samples) < max_repeats and (len(samples) < min_repeats or sum(samples) < budget):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+
+    memory_fn = getattr(fn, "memory_fn", fn)
+    memory_fn()  # warm-up for the in-process path
+    tracemalloc.start()
+    memory_fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeats": len(samples),
+        "p50_ms": round(_percentile(samples, 50) * 1e3, 4),
+        "p99_ms": round(_percentile(samples, 99) * 1e3, 4),
+        "mean_ms": round(float(np.mean(samples)) * 1e3, 4),
+        "min_ms": round(min(samples) * 1e3, 4),
+        "peak_mem_mb": round(peak / 2**20, 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args) -> dict:
+    grid = GRIDS[args.grid]
+    names = args.bench or list(CELL_CAPS)
+    suite = benchmarks(_analyze_client)
+    results = []
+
+    for m in grid["m"]:
+        for n in grid["n"]:
+            case = make_case(m, n, args.seed)
+            for name in names:
+                cap = CELL_CAPS[name]
+                row = {"bench": name, "m": m, "n": n}
+                if cap is not None and m * n > cap:
+                    results.append({**row, "skipped": f"m*n > {cap}"})
+                    continue
+                if name == "fuzzy_ahp" and m != grid["m"][0]:
+                    continue  # depends on n only
+                timing = time_case(suite[name](case), args.min_repeats, args.max_repeats, args.budget)
+                p50 = timing["p50_ms"] / 1e3
+                row.update(timing)
+                row["ops_per_s"] = round(1 / p50, 3) if p50 else None
+                row["cells_per_s"] = round(m * n / p50, 1) if p50 else None
+                results.append(row)
+                print(
+                    f"{name:<24} m={m:<7} n={n:<4} p50={timing['p50_ms']:>11.3f}ms "
+                    f"p99={timing['p99_ms']:>11.3f}ms peak={timing['peak_mem_mb']:>9.2f}MB",
+                    flush=True,
+                )
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "grid": args.grid,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Rows whose p50 grew by more than threshold relative to the baseline."""
+    base = {(r["bench"], r["m"], r["n"]): r for r in baseline["results"] if "p50_ms" in r}
+    regressions = []
+    print(f"\n{'bench':<24} {'m':>7} {'n':>4} {'base p50':>12} {'new p50':>12} {'ratio':>7}")
+    for r in current["results"]:
+        b = base.get((r["bench"], r["m"], r["n"]))
+        if b is None or "p50_ms" not in r or not b["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / b["p50_ms"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append({**r, "baseline_p50_ms": b["p50_ms"], "ratio": round(ratio, 3)})
+        print(
+            f"{r['bench']:<24} {r['m']:>7} {r['n']:>4} {b['p50_ms']:>12.3f} "
+            f"{r['p50_ms']:>12.3f} {ratio:>7.2f}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    p.add_argument("--bench", action="append", choices=sorted(CELL_CAPS), help="repeatable; default all")
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--min-repeats", type=int, default=5)
+    p.add_argument("--max-repeats", type=int, default=200)
+    p.add_argument("--budget", type=float, default=1.0, help="seconds of samples per case")
+    p.add_argument("--out", help="report path (default benchmarks/results/<timestamp>.json)")
+    p.add_argument("--report", help="compare this stored report instead of running")
+    p.add_argument("--compare", help="baseline report to compare against")
+    p.add_argument("--threshold", type=float, default=0.2)
+    args = p.parse_args(argv)
+
+    if args.report:
+        with open(args.report) as f:
+            current = json.load(f)
+    else:
+        current = run(args)
+        out = args.out or os.path.join(
+            "benchmarks", "results", time.strftime("%Y%m%d-%H%M%S") + ".json"
+        )
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nreport written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Import-time profile of the app, i.e. the cold-start cost of `uvicorn main:app`.
+
+    python benchmarks/import_profile.py                  # report, exit 1 if over budget
+    python benchmarks/import_profile.py --budget-ms 400 --json
+
+Each run imports the module in a fresh interpreter under `python -X
+importtime` and the fastest run is reported: the module's cumulative
+import time and the slowest imports beneath it. NumPy with the engines
+built on it, and the LLM and web-search subsystems, are meant to load on
+first use, so the check also fails when any of DEFERRED is imported at
+start-up. profile_imports() returns the
+same data for tests to assert against.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# must not be imported by `import main`
+DEFERRED = (
+    "numpy",
+    "mcdn_engine.fuzzy_topsis",
+    "services.analysis_pipeline",
+    "httpx",
+    "services.criteria_suggester",
+    "services.evidence",
+    "services.web_search",
+    "services.suggestion_cache",
+    "services.json_stream",
+)
+
+# ~1.25x the measured best-of-5 (460-560 ms, most of it FastAPI), so a new
+# eager import trips it; slower runners raise it through the environment
+DEFAULT_BUDGET_MS = float(os.getenv("DSS_IMPORT_BUDGET_MS", 700))
+
+
+def _import_times(module: str) -> list:
+    """(module, self_us, cumulative_us) for every import, in -X importtime order."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_imports(module: str = "main", runs: int = 5, top: int = 15) -> dict:
+    """Fastest of `runs` cold imports of module."""
+    best = None
+    for _ in range(runs):
+        rows = _import_times(module)
+        total = next(cum for name, _, cum in reversed(rows) if name == module)
+        if best is None or total < best[0]:
+            best = (total, rows)
+
+    total, rows = best
+    loaded = {name for name, _, _ in rows}
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)
+    return {
+        "module": module,
+        "runs": runs,
+        "total_ms": round(total / 1e3, 3),
+        "modules_imported": len(rows),
+        "slowest": [
+            {"module": name, "self_ms": round(s / 1e3, 3), "cumulative_ms": round(c / 1e3, 3)}
+            for name, s, c in slowest[:top]
+        ],
+        "deferred_loaded": [name for name in DEFERRED if name in loaded],
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--module", default="main")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = p.parse_args(argv)
+
+    report = profile_imports(args.module, args.runs, args.top)
+    report["budget_ms"] = args.budget_ms
+    report["ok"] = report["total_ms"] <= args.budget_ms and not report["deferred_loaded"]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {report['module']}: {report['total_ms']:.1f} ms "
+              f"(best of {report['runs']}, {report['modules_imported']} modules, budget {args.budget_ms:.0f} ms)")
+        print(f"\n{'module':<48} {'self ms':>9} {'cum ms':>9}")
+        for row in report["slowest"]:
+            print(f"{row['module']:<48} {row['self_ms']:>9.1f} {row['cumulative_ms']:>9.1f}")
+        if report["deferred_loaded"]:
+            print(f"\nloaded at start-up but meant to be deferred: {', '.join(report['deferred_loaded'])}")
+        print("\nOK" if report["ok"] else "\nOVER BUDGET" if not report["deferred_loaded"] else "\nFAILED")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Process-wide settings. Importing this module reads the project's .env
+file into os.environ once (when python-dotenv is installed), so modules
+that read os.getenv at import time see it as long as they import config
+first. load_env() is safe to call again; it only reads the file once.
+"""
+import os
+
+_env_loaded = False
+
+
+def load_env():
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+load_env()
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# point GROQ_URL at a local stand-in server for testing
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+# run a small analysis in-process and in every pool worker at start-up
+WARMUP = os.getenv("DSS_WARMUP", "0").lower() in ("1", "true", "yes")
@@ -1,18 +1,38 @@
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
-
+import config  # noqa: F401  reads .env before anything below reads os.environ
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from api.routes import router as api_router
+from services.http_client import close_http_client
+from services.process_pool import pool_size, run_cpu, shutdown_process_pool
+from services.telemetry import log_event
+import asyncio
+import logging
 import uvicorn
 import os
 
-app = FastAPI()
+# DSS_LOG_LEVEL=DEBUG with DSS_LOG_SAMPLE_RATE>0 turns on sampled debug payloads
+logging.basicConfig(level=os.getenv("DSS_LOG_LEVEL", "WARNING"))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if config.WARMUP:
+        # pay for NumPy and worker start-up here rather than on the first request
+        from services.analysis_pipeline import warm_up
+
+        seconds = warm_up()
+        await asyncio.gather(*(run_cpu(warm_up) for _ in range(pool_size())))
+        log_event("warm_up", logging.INFO, seconds=round(seconds, 4), workers=pool_size())
+    yield
+    # release pooled connections and worker processes on shutdown
+    await close_http_client()
+    shutdown_process_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow requests from the frontend (adjust origins for production)
 app.add_middleware(
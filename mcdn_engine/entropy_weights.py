@@ -4,35 +4,169 @@ from typing import List
 
 
 
-def entropy_weights(matrix, benefit):
-    arr = np.array(matrix, dtype=float)
+def entropy_weights(matrix, benefit, dtype=float):
+    arr = np.asarray(matrix, dtype=dtype)
     m, n = arr.shape
 
-    norm = np.zeros_like(arr)
+    e = column_entropy(arr, benefit, m, dtype)
+    w = weights_from_entropy(e)
 
-    for j in range(n):
-        col = arr[:, j]
-        lo, hi = col.min(), col.max()
-        rng = hi - lo
+    return w.tolist(), e.tolist()
 
-        if rng == 0:
-            norm[:, j] = 1.0 / m  
-        else:
-            if benefit[j]:
-                norm[:, j] = (col - lo) / rng
-            else:
-                norm[:, j] = (hi - col) / rng
+
+def column_entropy(cols, benefit, m, dtype=float):
+    """
+    Entropy of each column of an (m, k) slice, same rules as
+    entropy_weights, so single columns can be refreshed in O(m).
+    """
+    cols = np.asarray(cols, dtype=dtype)
+    benefit = np.asarray(benefit, dtype=bool)
+    lo, hi = cols.min(axis=0), cols.max(axis=0)
+    rng = hi - lo
+    flat = rng == 0
+    safe_rng = np.where(flat, 1.0, rng)
+
+    norm = np.where(benefit, cols - lo, hi - cols) / safe_rng
+    norm = np.where(flat, 1.0 / m, norm)
 
     col_sums = norm.sum(axis=0)
     col_sums[col_sums == 0] = 1e-10
-
     p = norm / col_sums
 
     k = 1 / math.log(m) if m > 1 else 1
-    e = -k * np.sum(p * np.log(p + 1e-15), axis=0)
+    return -k * np.sum(p * np.log(p + 1e-15), axis=0)
 
+
+def weights_from_entropy(e):
+    """Diversification weights d / sum(d) with d = 1 - e."""
+    e = np.asarray(e, dtype=float)
     d = 1 - e
     d_sum = d.sum()
-    w = d / d_sum if d_sum != 0 else np.ones(n) / n
+    return d / d_sum if d_sum != 0 else np.ones(len(e)) / len(e)
+
+
+def _ylogy(y):
+    """y log y, with 0 log 0 = 0."""
+    y = np.asarray(y, dtype=float)
+    return np.where(y > 0, y * np.log(np.where(y > 0, y, 1.0)), 0.0)
+
+
+class IncrementalEntropy:
+    """
+    Entropy weights of a matrix whose rows (alternatives) are appended,
+    removed or edited one at a time.
+
+    With y = x - min for a benefit column (max - x for cost) and T = sum(y),
+    p = y / T, so sum(p log p) = sum(y log y) / T - log T. Each column keeps
+    its min, max, sum(y) and sum(y log y). An edit that leaves the column's
+    anchor (min for benefit, max for cost) and its range in place updates
+    them in O(1); one that moves either rescans that column in O(m).
+    entropy() is O(n) and matches column_entropy up to its 1e-15 log guard.
+    """
+
+    def __init__(self, matrix, benefit):
+        self.benefit = np.array(benefit, dtype=bool)
+        n = len(self.benefit)
+        rows = np.asarray(matrix, dtype=float).reshape(-1, n)
+
+        self.m = rows.shape[0]
+        self._buf = np.empty((max(16, 2 * self.m), n))
+        self._buf[:self.m] = rows
+        self.lo = np.zeros(n)
+        self.hi = np.zeros(n)
+        self.sum_y = np.zeros(n)
+        self.sum_ylogy = np.zeros(n)
+        self._rescan(np.arange(n))
+
+    @property
+    def values(self) -> np.ndarray:
+        """The current (m, n) matrix, a view into the row buffer."""
+        return self._buf[:self.m]
+
+    def _y(self, x, cols):
+        return np.where(self.benefit[cols], x - self.lo[cols], self.hi[cols] - x)
+
+    def _rescan(self, cols):
+        if len(cols) == 0:
+            return
+        block = self.values[:, cols]
+        if self.m == 0:
+            self.lo[cols], self.hi[cols] = np.inf, -np.inf
+            self.sum_y[cols] = self.sum_ylogy[cols] = 0.0
+            return
+        self.lo[cols] = block.min(axis=0)
+        self.hi[cols] = block.max(axis=0)
+        y = self._y(block, cols)
+        self.sum_y[cols] = y.sum(axis=0)
+        self.sum_ylogy[cols] = _ylogy(y).sum(axis=0)
+
+    #  Edits
+    def append(self, row) -> int:
+        """Add an alternative; returns its row index."""
+        x = np.asarray(row, dtype=float).reshape(-1)
+        n = len(self.benefit)
+        if x.shape[0] != n:
+            raise ValueError(f"Expected {n} scores, got {x.shape[0]}")
+        if self.m == self._buf.shape[0]:
+            grown = np.empty((2 * self._buf.shape[0], n))
+            grown[:self.m] = self.values
+            self._buf = grown
+        self._buf[self.m] = x
+        self.m += 1
+
+        moved = (x < self.lo) | (x > self.hi)
+        keep = np.flatnonzero(~moved)
+        y = self._y(x[keep], keep)
+        self.sum_y[keep] += y
+        self.sum_ylogy[keep] += _ylogy(y)
+        self._rescan(np.flatnonzero(moved))
+        return self.m - 1
+
+    def remove(self, index: int) -> np.ndarray:
+        """Drop the alternative at index (later rows shift up); returns its scores."""
+        if not 0 <= index < self.m:
+            raise IndexError("alternative out of range")
+        x = self._buf[index].copy()
+        self._buf[index:self.m - 1] = self._buf[index + 1:self.m]
+        self.m -= 1
+
+        moved = (x == self.lo) | (x == self.hi)
+        keep = np.flatnonzero(~moved)
+        y = self._y(x[keep], keep)
+        self.sum_y[keep] -= y
+        self.sum_ylogy[keep] -= _ylogy(y)
+        self._rescan(np.flatnonzero(moved))
+        return x
+
+    def set_value(self, row: int, col: int, value: float):
+        old = self._buf[row, col]
+        value = float(value)
+        self._buf[row, col] = value
+        cols = np.array([col])
+        if old in (self.lo[col], self.hi[col]) or not self.lo[col] <= value <= self.hi[col]:
+            self._rescan(cols)
+            return
+        y_old, y_new = self._y(np.array([old, value]), cols)
+        self.sum_y[col] += y_new - y_old
+        self.sum_ylogy[col] += _ylogy(y_new) - _ylogy(y_old)
+
+    def set_benefit(self, col: int, flag: bool):
+        self.benefit[col] = bool(flag)
+        self._rescan(np.array([col]))
+
+    #  Results
+    def entropy(self) -> np.ndarray:
+        m = self.m
+        if m == 0:
+            raise ValueError("No alternatives")
+        flat = self.hi - self.lo == 0
+        total = np.where(self.sum_y > 0, self.sum_y, 1.0)
+        plogp = np.where(flat, math.log(1 / m), self.sum_ylogy / total - np.log(total))
+
+        k = 1 / math.log(m) if m > 1 else 1
+        return -k * plogp
 
-    return w.tolist(), e.tolist()
\ No newline at end of file
+    def weights(self):
+        """(weights, entropy) as arrays, like entropy_weights returns as lists."""
+        e = self.entropy()
+        return weights_from_entropy(e), e
@@ -1,53 +1,174 @@
 import numpy as np
-import math
+from functools import lru_cache
 from typing import List
 
-from mcdn_engine.tfn import val_to_tfn, tfn_mul, tfn_add, tfn_recip, defuzz, recip_tfn
-
-def fuzzy_ahp(n: int, pref: List[List[float]]):
-    #  fuzzy pairwise matrix 
-    fmat = []
-    for i in range(n):
-        row = []
-        for j in range(n):
-            if i == j:
-                row.append((1.0, 1.0, 1.0))
-            elif i < j:
-                row.append(val_to_tfn(pref[i][j]))
-            else:
-                row.append(recip_tfn(val_to_tfn(pref[j][i])))
-        fmat.append(row)
-
-    row_sums = [tfn_add(fmat[i]) for i in range(n)]
-    total = tfn_add(row_sums)
-    tr = tfn_recip(total)
-    extents = [tfn_mul(row_sums[i], tr) for i in range(n)]
-    weights_fuzzy = extents
-
-    # Consistency check
-    crisp = np.array([
-        [defuzz(fmat[i][j]) for j in range(n)]
-        for i in range(n)
-    ])
-    w_crisp = np.array([defuzz(w) for w in weights_fuzzy])
-
-    ws = crisp @ w_crisp
-
-    lam = float(np.mean([
-        ws[i] / w_crisp[i] if w_crisp[i] > 0 else 1
-        for i in range(n)
-    ]))
-
-    ci = (lam - n) / (n - 1) if n > 1 else 0
-
-    ri_table = {
-        1:0, 2:0, 3:.58, 4:.9, 5:1.12, 6:1.24, 7:1.32,
-        8:1.41, 9:1.45, 10:1.49, 11:1.51, 12:1.54,
-        13:1.56, 14:1.57, 15:1.58
+from mcdn_engine.tfn import val_to_tfn_array
+
+AHP_METHODS = ("extent", "geometric_mean")
+
+# Saaty's random index; larger n is estimated by simulation
+RI_TABLE = {
+    1:0, 2:0, 3:.58, 4:.9, 5:1.12, 6:1.24, 7:1.32,
+    8:1.41, 9:1.45, 10:1.49, 11:1.51, 12:1.54,
+    13:1.56, 14:1.57, 15:1.58
+}
+
+_SAATY_SCALE = np.array(
+    [1 / v for v in range(9, 1, -1)] + [float(v) for v in range(1, 10)]
+)
+
+
+def fuzzy_pairwise_tensor(n: int, pref) -> np.ndarray:
+    """
+    (n, n, 3) fuzzy comparison matrix. The upper triangle of pref is mapped
+    with val_to_tfn, the lower triangle is its TFN reciprocal. A stack of
+    k preference matrices gives a (k, n, n, 3) tensor. Only the leading
+    n x n block of each matrix is read; smaller matrices raise ValueError.
+    """
+    p = np.asarray(pref, dtype=float)
+    if p.ndim < 2 or p.shape[-2] < n or p.shape[-1] < n:
+        raise ValueError(f"preference_matrix must be at least {n} x {n}")
+    p = p[..., :n, :n]
+    upper = val_to_tfn_array(p)
+    recip = 1.0 / upper[..., ::-1]
+
+    iu = np.triu(np.ones((n, n), dtype=bool), 1)
+    return np.where(
+        iu[:, :, None], upper,
+        np.where(iu.T[:, :, None], np.swapaxes(recip, -3, -2), 1.0)
+    )
+
+
+def _extent_weights(fmat: np.ndarray) -> np.ndarray:
+    """Chang's extent analysis: fuzzy synthetic extent of each row."""
+    row_sums = fmat.sum(axis=-2)
+    total = row_sums.sum(axis=-2, keepdims=True)
+    return row_sums / total[..., ::-1]
+
+
+def _geometric_mean_weights(fmat: np.ndarray) -> np.ndarray:
+    """Buckley's method: fuzzy geometric mean of each row, normalised."""
+    r = np.exp(np.log(fmat).mean(axis=-2))
+    total = r.sum(axis=-2, keepdims=True)
+    return r / total[..., ::-1]
+
+
+@lru_cache(maxsize=None)
+def random_index(n: int, samples: int = 200, seed: int = 2024) -> float:
+    """
+    Random consistency index for n criteria. Saaty's table up to 15,
+    otherwise the mean principal eigenvalue of seeded random reciprocal
+    matrices on the 1/9..9 scale (cached per n).
+    """
+    if n in RI_TABLE:
+        return RI_TABLE[n]
+
+    rng = np.random.default_rng(seed)
+    iu = np.triu_indices(n, 1)
+    lam = []
+    for start in range(0, samples, 50):
+        k = min(50, samples - start)
+        a = np.ones((k, n, n))
+        vals = rng.choice(_SAATY_SCALE, size=(k, len(iu[0])))
+        a[:, iu[0], iu[1]] = vals
+        a[:, iu[1], iu[0]] = 1.0 / vals
+
+        # power iteration for the Perron root of each positive matrix
+        v = np.ones((k, n)) / n
+        for _ in range(200):
+            nv = np.einsum("kij,kj->ki", a, v)
+            nv /= nv.sum(axis=1, keepdims=True)
+            if np.max(np.abs(nv - v)) < 1e-12:
+                v = nv
+                break
+            v = nv
+        lam.append((np.einsum("kij,kj->ki", a, v) / v).mean(axis=1))
+
+    lam_mean = float(np.concatenate(lam).mean())
+    return (lam_mean - n) / (n - 1)
+
+
+def _fuzzy_weights(fmat: np.ndarray, method: str) -> np.ndarray:
+    if method == "extent":
+        return _extent_weights(fmat)
+    if method == "geometric_mean":
+        return _geometric_mean_weights(fmat)
+    raise ValueError(f"Unknown AHP method '{method}', expected one of {AHP_METHODS}")
+
+
+def consistency(fmat: np.ndarray, weights: np.ndarray):
+    """
+    lambda_max, CI and CR of the defuzzified comparison matrix against the
+    defuzzified weights. Works on one (n, n, 3) matrix or a (k, n, n, 3)
+    stack at once, returning (k,) arrays for the latter.
+    """
+    n = fmat.shape[-2]
+    crisp = fmat.mean(axis=-1)
+    w_crisp = weights.mean(axis=-1)
+    ws = np.einsum("...ij,...j->...i", crisp, w_crisp)
+
+    ratio = np.where(w_crisp > 0, ws / np.where(w_crisp > 0, w_crisp, 1.0), 1.0)
+    lam = ratio.mean(axis=-1)
+
+    ci = (lam - n) / (n - 1) if n > 1 else np.zeros_like(lam)
+
+    ri = random_index(n)
+    cr = ci / ri if ri > 0 else np.zeros_like(ci)
+
+    return lam, ci, cr
+
+
+def ahp_from_tensor(fmat: np.ndarray, method: str = "extent"):
+    """Fuzzy weights (n, 3) and consistency for one (n, n, 3) comparison matrix."""
+    weights = _fuzzy_weights(fmat, method)
+    lam, ci, cr = consistency(fmat, weights)
+    return weights, float(lam), float(ci), float(cr)
+
+
+def group_tensor(fmats: np.ndarray, expert_weights=None) -> np.ndarray:
+    """
+    Aggregate (k, n, n, 3) expert comparison matrices into one (n, n, 3)
+    group matrix by the weighted fuzzy geometric mean, component-wise.
+    Weights are normalised to sum to 1 (equal when omitted), so the
+    result stays reciprocal.
+    """
+    k = fmats.shape[0]
+    w = np.ones(k) if expert_weights is None else np.asarray(expert_weights, dtype=float)
+    if w.shape != (k,):
+        raise ValueError("expert_weights must have one weight per preference matrix")
+    if not np.isfinite(w).all() or (w < 0).any() or w.sum() <= 0:
+        raise ValueError("expert_weights must be finite, non-negative and not all zero")
+    w = w / w.sum()
+    return np.exp(np.tensordot(w, np.log(fmats), axes=1))
+
+
+def group_fuzzy_ahp(n: int, prefs, expert_weights=None, method: str = "extent"):
+    """
+    Group AHP over k experts' preference matrices.
+
+    Returns fuzzy_ahp's tuple for the aggregated matrix plus a dict of
+    per-expert lambda_max / CI / CR lists, all computed in one batched
+    pass over the (k, n, n, 3) tensor.
+    """
+    fmats = fuzzy_pairwise_tensor(n, prefs)
+    group = group_tensor(fmats, expert_weights)
+    weights, lam, ci, cr = ahp_from_tensor(group, method)
+
+    e_lam, e_ci, e_cr = consistency(fmats, _fuzzy_weights(fmats, method))
+    experts = {
+        "lambda_max": np.round(e_lam, 4).tolist(),
+        "CI": np.round(e_ci, 4).tolist(),
+        "CR": np.round(e_cr, 4).tolist(),
     }
 
-    ri = ri_table.get(n, 1.58)
-    cr = ci / ri if ri > 0 else 0
+    weights_fuzzy = [tuple(w) for w in weights.tolist()]
+    return weights_fuzzy, round(lam, 4), round(ci, 4), round(cr, 4), experts
+
+
+def fuzzy_ahp(n: int, pref: List[List[float]], method: str = "extent"):
+    fmat = fuzzy_pairwise_tensor(n, pref)
+    weights, lam, ci, cr = ahp_from_tensor(fmat, method)
 
+    weights_fuzzy = [tuple(w) for w in weights.tolist()]
 
     return weights_fuzzy, round(lam, 4), round(ci, 4), round(cr, 4)
@@ -1,87 +1,126 @@
 import numpy as np
-import math
 from typing import List , Union, Tuple
-from mcdn_engine.tfn import tfn_mul
+
+
+def normalise_matrix(arr: np.ndarray) -> np.ndarray:
+    """Vector normalisation of every column; all-zero columns are left as-is."""
+    den = np.sqrt(np.sum(arr ** 2, axis=0))
+    safe = np.where(den != 0, den, 1.0)
+    return arr / safe
+
+
+def compute_spread(norm: np.ndarray) -> np.ndarray:
+    """Per-criterion TFN spread: coefficient of variation capped at 0.3."""
+    std = np.std(norm, axis=0)
+    mean = np.mean(norm, axis=0)
+    return np.minimum(0.3, std / (np.abs(mean) + 1e-10))
+
+
+def weights_to_tfn(weights: List[Union[float, Tuple[float, float, float]]]) -> np.ndarray:
+    """(n, 3) TFN weight array; scalar weights are treated as crisp (w, w, w)."""
+    rows = [
+        tuple(w) if isinstance(w, (list, tuple)) and len(w) == 3 else (w, w, w)
+        for w in weights
+    ]
+    return np.array(rows, dtype=float).reshape(len(rows), 3)
+
+
+def fuzzy_matrix(norm: np.ndarray, spreads: np.ndarray) -> np.ndarray:
+    """(m, n, 3) fuzzy decision matrix (x(1-s), x, x(1+s))."""
+    factors = np.stack([1 - spreads, np.ones_like(spreads), 1 + spreads], axis=-1)
+    return norm[:, :, None] * factors[None, :, :]
+
+
+def topsis_from_normalised(
+    norm: np.ndarray,
+    spreads: np.ndarray,
+    w_tfn: np.ndarray,
+    benefit: List[bool],
+    fmat: np.ndarray = None
+):
+    """
+    Steps 2-5 of fuzzy TOPSIS on an already normalised (m, n) matrix;
+    fmat is fuzzy_matrix(norm, spreads), when the caller already has it.
+    """
+    benefit = np.asarray(benefit, dtype=bool)
+
+    #  Weighted fuzzy matrix (m, n, 3)
+    if fmat is None:
+        fmat = fuzzy_matrix(norm, spreads)
+    vmat = fmat * np.asarray(w_tfn, dtype=fmat.dtype)[None, :, :]
+
+    #  Ideal points (n, 3), taken per TFN component
+    v_max = vmat.max(axis=0)
+    v_min = vmat.min(axis=0)
+    fpis = np.where(benefit[:, None], v_max, v_min)
+    fnis = np.where(benefit[:, None], v_min, v_max)
+
+    #  Vertex distance per cell, summed over criteria
+    d_pos = np.sqrt(np.sum((vmat - fpis) ** 2, axis=2) / 3).sum(axis=1)
+    d_neg = np.sqrt(np.sum((vmat - fnis) ** 2, axis=2) / 3).sum(axis=1)
+
+    # Closeness coefficient
+    total = d_pos + d_neg
+    cc = np.where(total > 1e-10, d_neg / np.where(total > 1e-10, total, 1.0), 0.0)
+
+    return cc, d_pos, d_neg
+
+
+def crisp_distance_matrices(
+    norm: np.ndarray,
+    spreads: np.ndarray,
+    benefit: List[bool]
+):
+    """
+    Per-cell distances to FPIS/FNIS at unit crisp weight, each (m, n).
+
+    For a crisp weight w_j >= 0 the weighted cell and both ideal points scale
+    by w_j, so d_pos = D_pos @ w and d_neg = D_neg @ w for any weight vector.
+    """
+    benefit = np.asarray(benefit, dtype=bool)
+    fmat = fuzzy_matrix(norm, spreads)
+
+    f_max = fmat.max(axis=0)
+    f_min = fmat.min(axis=0)
+    fpis = np.where(benefit[:, None], f_max, f_min)
+    fnis = np.where(benefit[:, None], f_min, f_max)
+
+    d_pos = np.sqrt(np.sum((fmat - fpis) ** 2, axis=2) / 3)
+    d_neg = np.sqrt(np.sum((fmat - fnis) ** 2, axis=2) / 3)
+    return d_pos, d_neg
+
+
+def closeness_batch(d_pos_cells: np.ndarray, d_neg_cells: np.ndarray, weights: np.ndarray):
+    """
+    Closeness coefficients for k non-negative crisp weight vectors at once.
+
+    weights is (k, n); returns cc, d_pos, d_neg, each (k, m), in the
+    cells' dtype.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=d_pos_cells.dtype))
+    d_pos = weights @ d_pos_cells.T
+    d_neg = weights @ d_neg_cells.T
+
+    total = d_pos + d_neg
+    cc = np.where(total > 1e-10, d_neg / np.where(total > 1e-10, total, 1.0), 0.0)
+    return cc, d_pos, d_neg
 
 
 def fuzzy_topsis(
     matrix: List[List[float]],
     weights: List[Union[float, Tuple[float, float, float]]],
-    benefit: List[bool]
+    benefit: List[bool],
+    dtype=float
 ):
-    arr = np.array(matrix, dtype=float)
-    m, n = arr.shape
-
-    #  Step 1: Vector normalization 
-    norm = np.zeros_like(arr)
-    for j in range(n):
-        col = arr[:, j]
-        den = np.sqrt(np.sum(col**2))
-        norm[:, j] = col / den if den != 0 else col
-
-    def compute_spread(col):
-        std = np.std(col)
-        mean = np.mean(col)
-        return min(0.3, std / (abs(mean) + 1e-10))
- 
-    sp_list = [compute_spread(norm[:, j]) for j in range(n)]
-    #  Construct fuzzy matrix
-    fmat = [
-    [
-        (norm[i,j]*(1-sp_list[j]), norm[i,j], norm[i,j]*(1+sp_list[j]))
-        for j in range(n)
-    ]
-    for i in range(m)
-]
-
-    w_tfn = []
-    for w in weights:
-        if isinstance(w, (list, tuple)) and len(w) == 3:
-            w_tfn.append(tuple(w))
-        else:
-            # treat scalar as crisp weight
-            w_tfn.append((w, w, w))
-
-    #  Weighted fuzzy matrix
-    vmat = [
-        [tfn_mul(fmat[i][j], w_tfn[j]) for j in range(n)]
-        for i in range(m)
-    ]
-    fpis, fnis = [], []
-    for j in range(n):
-        cl = [vmat[i][j][0] for i in range(m)]
-        cm = [vmat[i][j][1] for i in range(m)]
-        cu = [vmat[i][j][2] for i in range(m)]
-
-        if benefit[j]:
-            fpis.append((max(cl), max(cm), max(cu)))
-            fnis.append((min(cl), min(cm), min(cu)))
-        else:
-            fpis.append((min(cl), min(cm), min(cu)))
-            fnis.append((max(cl), max(cm), max(cu)))
-
-    #  Distance function
-    def dist(a, b):
-        return math.sqrt(
-            ((a[0] - b[0]) ** 2 +
-             (a[1] - b[1]) ** 2 +
-             (a[2] - b[2]) ** 2) / 3
-        )
-
-    d_pos = [
-        sum(dist(vmat[i][j], fpis[j]) for j in range(n))
-        for i in range(m)
-    ]
+    """dtype=np.float32 halves memory traffic; see PRECISION_TOLERANCE in the pipeline."""
+    arr = np.asarray(matrix, dtype=dtype)
 
-    d_neg = [
-        sum(dist(vmat[i][j], fnis[j]) for j in range(n))
-        for i in range(m)
-    ]
+    #  Step 1: Vector normalization
+    norm = normalise_matrix(arr)
+    spreads = compute_spread(norm)
 
-    # Closeness coefficient
-    cc = [
-        d_neg[i] / (d_pos[i] + d_neg[i]) if (d_pos[i] + d_neg[i]) > 1e-10 else 0
-        for i in range(m)
-    ]
+    cc, d_pos, d_neg = topsis_from_normalised(
+        norm, spreads, weights_to_tfn(weights), benefit
+    )
 
-    return cc, d_pos, d_neg
\ No newline at end of file
+    return cc.tolist(), d_pos.tolist(), d_neg.tolist()
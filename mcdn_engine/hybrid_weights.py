@@ -0,0 +1,45 @@
+import numpy as np
+
+from mcdn_engine.tfn import defuzz
+
+
+#  Adaptive alpha (use defuzzed AHP)
+def adaptive_alpha(ahp_w, ent_w):
+    ahp_crisp = np.array([defuzz(w) for w in ahp_w])
+    ahp_var = np.var(ahp_crisp)
+    ent_var = np.var(ent_w)
+
+    total = ahp_var + ent_var
+    return ahp_var / total if total != 0 else 0.5
+
+
+def combine_weights(ahp_w, ent_w):
+    """Blend fuzzy AHP and crisp entropy weights; returns normalised TFN weights."""
+    alpha = adaptive_alpha(ahp_w, ent_w)
+
+    # Convert entropy → TFN
+    ent_w_tfn = [(w, w, w) for w in ent_w]
+
+    # Combine weights (fuzzy)
+    cw_fuzzy = [
+        (
+            ahp_w[i][0] * alpha + ent_w_tfn[i][0] * (1 - alpha),
+            ahp_w[i][1] * alpha + ent_w_tfn[i][1] * (1 - alpha),
+            ahp_w[i][2] * alpha + ent_w_tfn[i][2] * (1 - alpha),
+        )
+        for i in range(len(ahp_w))
+    ]
+
+    #  Normalize fuzzy weights
+    sum_l = sum(w[0] for w in cw_fuzzy)
+    sum_m = sum(w[1] for w in cw_fuzzy)
+    sum_u = sum(w[2] for w in cw_fuzzy)
+
+    return [
+        (
+            w[0] / sum_l if sum_l else 0,
+            w[1] / sum_m if sum_m else 0,
+            w[2] / sum_u if sum_u else 0,
+        )
+        for w in cw_fuzzy
+    ]
@@ -0,0 +1,153 @@
+import numpy as np
+from typing import List
+
+from mcdn_engine.entropy_weights import IncrementalEntropy, weights_from_entropy
+from mcdn_engine.fuzzy_ahp import fuzzy_ahp
+from mcdn_engine.fuzzy_topsis import normalise_matrix, compute_spread, fuzzy_matrix
+from mcdn_engine.hybrid_weights import combine_weights
+
+
+class IncrementalAnalysis:
+    """
+    Hybrid AHP/entropy fuzzy TOPSIS state that can be edited one cell at a
+    time.
+
+    Every normalisation statistic is per column, so a score edit refreshes
+    that column's norm, spread, ideal points, entropy and squared TFN gaps
+    in O(m). With non-negative weights the weighted gap of cell (i, j) is
+    w_j^2 * gap, so after any weight change the per-criterion distance
+    contributions are re-aggregated from the cached gaps in a single
+    O(m*n) vectorised pass; nothing is re-normalised or re-sorted.
+
+    Alternatives can be appended and removed. Vector normalisation, the
+    spreads and the ideal points depend on every row, so those columns are
+    rebuilt (vectorised, O(m*n)); the entropy side goes through an
+    IncrementalEntropy and costs O(n) unless a column's extremes move.
+    """
+
+    def __init__(
+        self,
+        score_matrix: List[List[float]],
+        preference_matrix: List[List[float]],
+        benefit: List[bool],
+        ahp_method: str = "extent",
+    ):
+        self.pref = np.array(preference_matrix, dtype=float)
+        self.benefit = np.array(benefit, dtype=bool)
+        self.ahp_method = ahp_method
+        self.entropy_state = IncrementalEntropy(score_matrix, self.benefit)
+
+        self._allocate_rows()
+        self._refresh_columns(list(range(self.shape[1])))
+        self._refresh_ahp()
+        self._refresh_weights()
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.entropy_state.values
+
+    @property
+    def shape(self):
+        return self.scores.shape
+
+    def _allocate_rows(self):
+        m, n = self.shape
+        self.norm = np.zeros((m, n))
+        self.spreads = np.zeros(n)
+        self.fmat = np.zeros((m, n, 3))
+        self.gap_pos = np.zeros((m, n, 3))
+        self.gap_neg = np.zeros((m, n, 3))
+
+    #  Per-column state
+    def _refresh_columns(self, cols):
+        block = self.scores[:, cols]
+
+        norm = normalise_matrix(block)
+        spreads = compute_spread(norm)
+        self.norm[:, cols] = norm
+        self.spreads[cols] = spreads
+        self.fmat[:, cols] = fuzzy_matrix(norm, spreads)
+        self._refresh_gaps(cols)
+
+    def _refresh_gaps(self, cols):
+        f = self.fmat[:, cols]
+        b = self.benefit[cols][:, None]
+        f_max, f_min = f.max(axis=0), f.min(axis=0)
+        self.gap_pos[:, cols] = (f - np.where(b, f_max, f_min)) ** 2
+        self.gap_neg[:, cols] = (f - np.where(b, f_min, f_max)) ** 2
+
+    #  Weights and distances
+    def _refresh_ahp(self):
+        n = self.scores.shape[1]
+        self.ahp_w, self.lam, self.ci, self.cr = fuzzy_ahp(n, self.pref, self.ahp_method)
+
+    def _refresh_weights(self):
+        self.entropy = self.entropy_state.entropy()
+        self.ent_w = weights_from_entropy(self.entropy)
+        self.cw_fuzzy = combine_weights(self.ahp_w, self.ent_w.tolist())
+
+        w2 = np.array(self.cw_fuzzy) ** 2
+        self.contrib_pos = np.sqrt(np.einsum("ijc,jc->ij", self.gap_pos, w2) / 3)
+        self.contrib_neg = np.sqrt(np.einsum("ijc,jc->ij", self.gap_neg, w2) / 3)
+
+        self.d_pos = self.contrib_pos.sum(axis=1)
+        self.d_neg = self.contrib_neg.sum(axis=1)
+        total = self.d_pos + self.d_neg
+        self.cc = np.where(total > 1e-10, self.d_neg / np.where(total > 1e-10, total, 1.0), 0.0)
+
+    def distance_cells(self):
+        """Unit-weight crisp distances, as crisp_distance_matrices returns them."""
+        return (
+            np.sqrt(self.gap_pos.sum(axis=2) / 3),
+            np.sqrt(self.gap_neg.sum(axis=2) / 3),
+        )
+
+    #  Edits
+    def set_score(self, row: int, col: int, value: float):
+        m, n = self.scores.shape
+        if not (0 <= row < m and 0 <= col < n):
+            raise IndexError("score cell out of range")
+        self.entropy_state.set_value(row, col, value)
+        self._refresh_columns([col])
+        self._refresh_weights()
+
+    def set_preference(self, row: int, col: int, value: float):
+        n = self.scores.shape[1]
+        if not (0 <= row < col < n):
+            raise IndexError("only upper-triangle preference cells (row < col) are read")
+        self.pref[row, col] = float(value)
+        self._refresh_ahp()
+        self._refresh_weights()
+
+    def set_benefit(self, col: int, flag: bool):
+        if not 0 <= col < self.scores.shape[1]:
+            raise IndexError("criterion out of range")
+        if bool(flag) == bool(self.benefit[col]):
+            return
+        self.benefit[col] = bool(flag)
+
+        # flipping the direction swaps FPIS and FNIS for this column
+        pos = self.gap_pos[:, col].copy()
+        self.gap_pos[:, col] = self.gap_neg[:, col]
+        self.gap_neg[:, col] = pos
+        self.entropy_state.set_benefit(col, flag)
+        self._refresh_weights()
+
+    def append_alternative(self, scores: List[float]) -> int:
+        """Add an alternative's row of scores; returns its row index."""
+        row = self.entropy_state.append(scores)
+        self._allocate_rows()
+        self._refresh_columns(list(range(self.shape[1])))
+        self._refresh_weights()
+        return row
+
+    def remove_alternative(self, row: int):
+        m = self.shape[0]
+        if not 0 <= row < m:
+            raise IndexError("alternative out of range")
+        if m <= 2:
+            raise ValueError("Need at least 2 alternatives")
+        self.entropy_state.remove(row)
+        self._allocate_rows()
+        self._refresh_columns(list(range(self.shape[1])))
+        self._refresh_weights()
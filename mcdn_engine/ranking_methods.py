@@ -0,0 +1,188 @@
+import numpy as np
+
+from mcdn_engine.fuzzy_topsis import fuzzy_matrix, topsis_from_normalised
+
+# cells per PROMETHEE tile of the (m, m) preference matrix; 2 MB per float64 buffer
+TILE_CELLS = 262_144
+
+
+def method_context(norm, spreads, w_tfn, benefit, fmat=None) -> dict:
+    """
+    Inputs every ranking method reads: the vector-normalised matrix, its
+    TFN spreads, the (m, n, 3) fuzzy matrix built from them and the
+    combined (n, 3) fuzzy weights. fmat is reused when the caller has it.
+    """
+    # weights follow the matrix's precision so float32 inputs stay float32
+    w_tfn = np.asarray(w_tfn, dtype=norm.dtype)
+    crisp = w_tfn.mean(axis=1)
+    total = crisp.sum()
+    return {
+        "norm": norm,
+        "spreads": spreads,
+        "fmat": fuzzy_matrix(norm, spreads) if fmat is None else fmat,
+        "w_tfn": w_tfn,
+        "w": crisp / total if total > 0 else np.full(len(crisp), 1 / len(crisp)),
+        "benefit": np.asarray(benefit, dtype=bool),
+    }
+
+
+def topsis(ctx) -> dict:
+    cc, d_pos, d_neg = topsis_from_normalised(
+        ctx["norm"], ctx["spreads"], ctx["w_tfn"], ctx["benefit"], fmat=ctx["fmat"]
+    )
+    return {"score": cc, "d_pos": d_pos, "d_neg": d_neg}
+
+
+def vikor(ctx, v: float = 0.5) -> dict:
+    """
+    Fuzzy VIKOR. Each cell's gap to the column's best value, scaled by the
+    column's best-worst range, is weighted TFN by TFN; S sums the weighted
+    gaps, R keeps the largest. Q (lower is better) blends the two, with v
+    the weight of the group-utility term S.
+    """
+    fmat, benefit, w_tfn = ctx["fmat"], ctx["benefit"], ctx["w_tfn"]
+
+    #  Best / worst value per criterion over all TFN components
+    hi = fmat[..., 2].max(axis=0)
+    lo = fmat[..., 0].min(axis=0)
+    rng = hi - lo
+    safe = np.where(rng > 0, rng, 1.0)
+
+    #  Normalised gap TFNs (m, n, 3), components kept in ascending order
+    gap_benefit = (hi[None, :, None] - fmat[..., ::-1]) / safe[None, :, None]
+    gap_cost = (fmat - lo[None, :, None]) / safe[None, :, None]
+    gap = np.where(benefit[None, :, None], gap_benefit, gap_cost)
+    gap = np.where(rng[None, :, None] > 0, gap, 0.0)
+
+    weighted = gap * w_tfn[None, :, :]
+    S = weighted.sum(axis=1).mean(axis=1)
+    R = weighted.max(axis=1).mean(axis=1)
+
+    S_span = S.max() - S.min()
+    R_span = R.max() - R.min()
+    Q = (
+        v * ((S - S.min()) / S_span if S_span > 0 else np.zeros_like(S))
+        + (1 - v) * ((R - R.min()) / R_span if R_span > 0 else np.zeros_like(R))
+    )
+    return {"score": Q, "S": S, "R": R}
+
+
+def waspas(ctx, lam: float = 0.5) -> dict:
+    """
+    Fuzzy WASPAS: lam * weighted sum + (1 - lam) * weighted product of
+    linearly normalised TFNs (x / column max for benefit, column min / x
+    for cost). Higher is better.
+    """
+    fmat, benefit, w_tfn = ctx["fmat"], ctx["benefit"], ctx["w_tfn"]
+
+    #  Linear ratio normalisation (m, n, 3)
+    top = fmat[..., 2].max(axis=0)
+    bottom = fmat[..., 0].min(axis=0)
+    r_benefit = fmat / np.where(top > 0, top, 1.0)[None, :, None]
+    flipped = fmat[..., ::-1]
+    r_cost = np.where(
+        flipped > 0, bottom[None, :, None] / np.where(flipped > 0, flipped, 1.0), 1.0
+    )
+    r = np.where(benefit[None, :, None], r_benefit, r_cost)
+
+    wsm = (r * w_tfn[None, :, :]).sum(axis=1)
+
+    #  r <= 1, so r ** w shrinks as w grows: the lower bound takes the largest weight
+    log_r = np.log(np.maximum(r, 1e-12))
+    wpm = np.exp(np.stack([
+        (log_r[..., 0] * w_tfn.max(axis=1)).sum(axis=1),
+        (log_r[..., 1] * w_tfn[:, 1]).sum(axis=1),
+        (log_r[..., 2] * w_tfn.min(axis=1)).sum(axis=1),
+    ], axis=-1))
+
+    wsm, wpm = wsm.mean(axis=1), wpm.mean(axis=1)
+    return {"score": lam * wsm + (1 - lam) * wpm, "wsm": wsm, "wpm": wpm}
+
+
+def promethee(ctx, tile_cells: int = TILE_CELLS) -> dict:
+    """
+    Fuzzy PROMETHEE II with the linear (V-shape) preference function, its
+    threshold at each criterion's range. The fuzzy difference of two cells
+    goes through the preference function component-wise and is defuzzified
+    by the mean; pi(a, b) is the crisp-weighted sum over criteria.
+
+    The (m, m) preference matrix is never built: a tile of rows of it, of
+    about tile_cells cells, is filled one criterion at a time into reused
+    buffers, and both flows are accumulated tile by tile.
+    """
+    fmat, benefit, w = ctx["fmat"], ctx["benefit"], ctx["w"]
+    m, n = fmat.shape[:2]
+
+    #  Orient cost criteria so larger is always better
+    sign = np.where(benefit, 1.0, -1.0)
+    oriented = fmat * sign[None, :, None]
+    parts = [np.where(benefit[None, :], oriented[..., k], oriented[..., 2 - k]) for k in range(3)]
+
+    #  Scale to weighted preference units, so P_j(d) * w_j = clip(d, 0, w_j); one row per criterion
+    span = parts[1].max(axis=0) - parts[1].min(axis=0)
+    scale = np.where(span > 0, w / np.where(span > 0, span, 1.0), 0.0)
+    lo, mid, hi = (np.ascontiguousarray((p * scale).T) for p in parts)
+    active = [j for j in range(n) if scale[j] > 0]
+
+    plus = np.zeros(m)
+    minus = np.zeros(m)
+    rows = max(1, min(m, tile_cells // max(m, 1)))
+    d_buf = np.empty((rows, m), dtype=fmat.dtype)
+    pi_buf = np.empty((rows, m), dtype=fmat.dtype)
+    for start in range(0, m, rows):
+        stop = min(m, start + rows)
+        d, pi = d_buf[:stop - start], pi_buf[:stop - start]
+        pi.fill(0.0)
+
+        #  Fuzzy difference a - b = (l_a - u_b, m_a - m_b, u_a - l_b)
+        for j in active:
+            for a_part, b_part in ((lo, hi), (mid, mid), (hi, lo)):
+                np.subtract(a_part[j, start:stop, None], b_part[j, None, :], out=d)
+                np.clip(d, 0.0, w[j], out=d)
+                pi += d
+        pi /= 3
+        pi[np.arange(stop - start), np.arange(start, stop)] = 0.0
+
+        plus[start:stop] += pi.sum(axis=1)
+        minus += pi.sum(axis=0)
+
+    norm = 1 / (m - 1) if m > 1 else 1.0
+    plus *= norm
+    minus *= norm
+    return {"score": plus - minus, "phi_plus": plus, "phi_minus": minus}
+
+
+# name -> (method, whether a higher score ranks first)
+RANKING_METHODS = {
+    "topsis": (topsis, True),
+    "vikor": (vikor, False),
+    "waspas": (waspas, True),
+    "promethee": (promethee, True),
+}
+
+
+def run_method(name: str, ctx) -> dict:
+    """One method's result plus its best-first order."""
+    return with_order(name, RANKING_METHODS[name][0](ctx))
+
+
+def with_order(name: str, result: dict) -> dict:
+    """Add the best-first order and score direction to a method's result."""
+    higher_first = RANKING_METHODS[name][1]
+    key = -result["score"] if higher_first else result["score"]
+    result["order"] = np.argsort(key, kind="stable")
+    result["higher_is_better"] = higher_first
+    return result
+
+
+def rank_agreement(orders: dict) -> dict:
+    """Pairwise Spearman rank correlation between best-first orders."""
+    names = list(orders)
+    m = len(next(iter(orders.values())))
+    ranks = np.empty((len(names), m))
+    for k, name in enumerate(names):
+        ranks[k, orders[name]] = np.arange(m)
+
+    d2 = ((ranks[:, None, :] - ranks[None, :, :]) ** 2).sum(axis=2)
+    rho = 1 - 6 * d2 / (m * (m * m - 1)) if m > 1 else np.ones_like(d2)
+    return {"methods": names, "spearman": rho}
@@ -0,0 +1,252 @@
+import csv
+import math
+import numpy as np
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from mcdn_engine.fuzzy_topsis import weights_to_tfn
+
+# A chunk is (row labels or None, (rows, n) float array)
+Chunk = Tuple[Optional[List[str]], np.ndarray]
+
+
+def iter_npy_chunks(path: str, chunk_rows: int = 65536) -> Iterator[Chunk]:
+    """Row chunks of a 2-D .npy file, read through a read-only memory map."""
+    arr = np.load(path, mmap_mode="r")
+    if arr.ndim != 2:
+        raise ValueError("Expected a 2-D array")
+    for start in range(0, arr.shape[0], chunk_rows):
+        yield None, np.asarray(arr[start:start + chunk_rows], dtype=float)
+
+
+def iter_csv_chunks(
+    path: str,
+    chunk_rows: int = 65536,
+    header: bool = True,
+    id_column: bool = False
+) -> Iterator[Chunk]:
+    """Row chunks of a numeric CSV, optionally with a header row and a label column."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        if header:
+            next(reader, None)
+
+        labels, rows = [], []
+        for line in reader:
+            if not line:
+                continue
+            if id_column:
+                labels.append(line[0])
+                line = line[1:]
+            rows.append([float(x) for x in line])
+            if len(rows) == chunk_rows:
+                yield (labels if id_column else None), np.array(rows, dtype=float)
+                labels, rows = [], []
+
+        if rows:
+            yield (labels if id_column else None), np.array(rows, dtype=float)
+
+
+def column_stats(chunks: Iterator[Chunk]) -> dict:
+    """
+    Pass 1: per-column count, sum, sum of squares, min, max, mean and M2,
+    merged chunk by chunk (Chan et al.) so the variance stays accurate.
+    """
+    count = 0
+    total = sumsq = lo = hi = mean = m2 = None
+
+    for _, block in chunks:
+        k = block.shape[0]
+        if k == 0:
+            continue
+        b_mean = block.mean(axis=0)
+        b_m2 = ((block - b_mean) ** 2).sum(axis=0)
+
+        if count == 0:
+            total = block.sum(axis=0)
+            sumsq = (block ** 2).sum(axis=0)
+            lo, hi = block.min(axis=0), block.max(axis=0)
+            mean, m2 = b_mean, b_m2
+        else:
+            total = total + block.sum(axis=0)
+            sumsq = sumsq + (block ** 2).sum(axis=0)
+            lo = np.minimum(lo, block.min(axis=0))
+            hi = np.maximum(hi, block.max(axis=0))
+            delta = b_mean - mean
+            n_ab = count + k
+            mean = mean + delta * k / n_ab
+            m2 = m2 + b_m2 + delta ** 2 * count * k / n_ab
+        count += k
+
+    if count == 0:
+        raise ValueError("No rows in input")
+
+    return {
+        "count": count, "sum": total, "sumsq": sumsq,
+        "min": lo, "max": hi, "mean": mean, "m2": m2,
+    }
+
+
+def stream_spreads(stats: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Column norms and TFN spreads matching compute_spread on the full matrix."""
+    den = np.sqrt(stats["sumsq"])
+    safe = np.where(den != 0, den, 1.0)
+    mean_n = stats["mean"] / safe
+    std_n = np.sqrt(stats["m2"] / stats["count"]) / safe
+    return safe, np.minimum(0.3, std_n / (np.abs(mean_n) + 1e-10))
+
+
+def stream_entropy_weights(chunks: Iterator[Chunk], stats: dict, benefit: List[bool]):
+    """Entropy weights over a chunked matrix, same rules as entropy_weights."""
+    m = stats["count"]
+    benefit = np.asarray(benefit, dtype=bool)
+    lo, hi = stats["min"], stats["max"]
+    rng = hi - lo
+    flat = rng == 0
+    safe_rng = np.where(flat, 1.0, rng)
+
+    col_sums = np.where(
+        flat, 1.0,
+        np.where(benefit, stats["sum"] - m * lo, m * hi - stats["sum"]) / safe_rng
+    )
+    col_sums = np.where(col_sums == 0, 1e-10, col_sums)
+
+    plogp = np.zeros_like(lo)
+    for _, block in chunks:
+        norm = np.where(benefit, block - lo, hi - block) / safe_rng
+        norm = np.where(flat, 1.0 / m, norm)
+        p = norm / col_sums
+        plogp += np.sum(p * np.log(p + 1e-15), axis=0)
+
+    k = 1 / math.log(m) if m > 1 else 1
+    e = -k * plogp
+    d = 1 - e
+    d_sum = d.sum()
+    w = d / d_sum if d_sum != 0 else np.ones(len(d)) / len(d)
+    return w, e
+
+
+def streaming_topsis(
+    open_chunks: Callable[[], Iterator[Chunk]],
+    benefit: List[bool],
+    weights=None,
+    top_k: int = 50,
+    out_path: Optional[str] = None,
+) -> dict:
+    """
+    Fuzzy TOPSIS over a matrix that is read chunk by chunk.
+
+    open_chunks must return a fresh chunk iterator on every call. Pass 1
+    collects column statistics; when no weights are given an extra pass
+    derives entropy weights; the final pass computes distances and
+    closeness per chunk. Memory is bounded by the chunk size and top_k.
+    If out_path is given the full closeness vector is written there as .npy.
+    """
+    stats = column_stats(open_chunks())
+    m, n = stats["count"], stats["sum"].shape[0]
+    if len(benefit) != n:
+        raise ValueError("benefit must have one entry per column")
+    passes = 1
+
+    entropy = None
+    if weights is None:
+        weights, entropy = stream_entropy_weights(open_chunks(), stats, benefit)
+        weights = weights.tolist()
+        passes += 1
+    w_tfn = weights_to_tfn(weights)
+    if w_tfn.shape[0] != n:
+        raise ValueError("weights must have one entry per column")
+
+    den, spreads = stream_spreads(stats)
+    factors = np.stack([1 - spreads, np.ones_like(spreads), 1 + spreads], axis=-1)
+
+    # ideal points from raw column extremes: coef * x is monotone in x
+    coef = factors / den[:, None] * w_tfn
+    at_max = coef * stats["max"][:, None]
+    at_min = coef * stats["min"][:, None]
+    v_max = np.where(coef >= 0, at_max, at_min)
+    v_min = np.where(coef >= 0, at_min, at_max)
+    b = np.asarray(benefit, dtype=bool)[:, None]
+    fpis = np.where(b, v_max, v_min)
+    fnis = np.where(b, v_min, v_max)
+
+    out = None
+    if out_path:
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype=float, shape=(m,))
+
+    top_idx = np.empty(0, dtype=np.int64)
+    top_cc = np.empty(0)
+    top_dp = np.empty(0)
+    top_dn = np.empty(0)
+    top_labels: List[Optional[str]] = []
+
+    offset = 0
+    for labels, block in open_chunks():
+        vmat = (block / den)[:, :, None] * factors[None, :, :] * w_tfn[None, :, :]
+        d_pos = np.sqrt(np.sum((vmat - fpis) ** 2, axis=2) / 3).sum(axis=1)
+        d_neg = np.sqrt(np.sum((vmat - fnis) ** 2, axis=2) / 3).sum(axis=1)
+        total = d_pos + d_neg
+        cc = np.where(total > 1e-10, d_neg / np.where(total > 1e-10, total, 1.0), 0.0)
+
+        if out is not None:
+            out[offset:offset + len(cc)] = cc
+
+        idx = np.concatenate([top_idx, offset + np.arange(len(cc))])
+        all_cc = np.concatenate([top_cc, cc])
+        all_dp = np.concatenate([top_dp, d_pos])
+        all_dn = np.concatenate([top_dn, d_neg])
+        all_labels = top_labels + (labels if labels is not None else [None] * len(cc))
+
+        if len(all_cc) > top_k:
+            keep = np.argpartition(-all_cc, top_k - 1)[:top_k]
+        else:
+            keep = np.arange(len(all_cc))
+        top_idx, top_cc, top_dp, top_dn = idx[keep], all_cc[keep], all_dp[keep], all_dn[keep]
+        top_labels = [all_labels[k] for k in keep]
+
+        offset += len(cc)
+    passes += 1
+
+    if out is not None:
+        out.flush()
+
+    order = np.lexsort((top_idx, -top_cc))
+    ranking = [
+        {
+            "rank": r + 1,
+            "row": int(top_idx[k]),
+            "label": top_labels[k],
+            "closeness": round(float(top_cc[k]), 4),
+            "d_pos": round(float(top_dp[k]), 4),
+            "d_neg": round(float(top_dn[k]), 4),
+        }
+        for r, k in enumerate(order)
+    ]
+
+    return {
+        "n_alternatives": m,
+        "n_criteria": n,
+        "weights": w_tfn.tolist(),
+        "entropy_values": None if entropy is None else entropy.tolist(),
+        "passes": passes,
+        "ranking": ranking,
+    }
+
+
+def rank_file(
+    path: str,
+    fmt: str,
+    benefit: List[bool],
+    weights=None,
+    top_k: int = 50,
+    chunk_rows: int = 65536,
+    header: bool = True,
+    id_column: bool = False,
+) -> dict:
+    """streaming_topsis over a .npy or CSV file on disk."""
+    if fmt == "npy":
+        open_chunks = lambda: iter_npy_chunks(path, chunk_rows)
+    elif fmt == "csv":
+        open_chunks = lambda: iter_csv_chunks(path, chunk_rows, header, id_column)
+    else:
+        raise ValueError("format must be 'csv' or 'npy'")
+    return streaming_topsis(open_chunks, benefit, weights, top_k)
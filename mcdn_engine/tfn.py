@@ -1,3 +1,5 @@
+import numpy as np
+
 def tfn_mul(a,b): return (a[0]*b[0], a[1]*b[1], a[2]*b[2])
 def tfn_add(ts): return (sum(x[0] for x in ts), sum(x[1] for x in ts), sum(x[2] for x in ts))
 def tfn_recip(a): return (1/a[2], 1/a[1], 1/a[0])
@@ -16,3 +18,7 @@ def recip_tfn(t):
     return (1/t[2], 1/t[1], 1/t[0])
 
 
+def val_to_tfn_array(v):
+    """Vectorised val_to_tfn: (...) preference values → (..., 3) TFNs."""
+    v = np.clip(np.asarray(v, dtype=float), 1.0, 9.0)
+    return np.stack([np.maximum(1.0, v - 1.0), v, np.minimum(9.0, v + 1.0)], axis=-1)
@@ -1,21 +1,77 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Dict, Any, ClassVar, Tuple, Union
 
 
-class CombinedRequest(BaseModel):
-    criteria: List[str]
-    alternatives: List[str]
-    preference_matrix: List[List[float]]
-    score_matrix: List[List[float]]
-    benefit: List[bool]
-    real_values: Optional[Dict[str, float]] = None
+class DatasetBacked(BaseModel):
+    """Matrix fields may be left out when dataset_id names a stored dataset."""
+    dataset_fields: ClassVar[Tuple[str, ...]] = ()
+    # field -> another field that can stand in for it
+    field_alternatives: ClassVar[Dict[str, str]] = {}
+    dataset_id: Optional[str] = None
 
+    @model_validator(mode="after")
+    def require_inline_or_dataset(self):
+        if not self.dataset_id:
+            missing = [
+                f for f in self.dataset_fields
+                if getattr(self, f) is None
+                and getattr(self, self.field_alternatives.get(f, ""), None) is None
+            ]
+            if missing:
+                raise ValueError(f"Provide dataset_id or {', '.join(missing)}")
+        return self
+
+
+class ColumnarRealValues(BaseModel):
+    """
+    Real values aligned to alternatives x criteria. null marks a missing
+    cell; mask (True = present) may mark more.
+    """
+    values: List[List[Optional[float]]]
+    mask: Optional[List[List[bool]]] = None
 
-class NormaliseRequest(BaseModel):
-    criteria: List[str]
-    alternatives: List[str]
-    benefit: List[bool]
-    real_values: Dict[str, float]
+
+# "{alt}__{crit}" -> value, or the columnar form
+RealValues = Union[ColumnarRealValues, Dict[str, float]]
+
+
+class CombinedRequest(DatasetBacked):
+    dataset_fields: ClassVar[Tuple[str, ...]] = (
+        "criteria", "alternatives", "preference_matrix", "score_matrix", "benefit"
+    )
+    field_alternatives: ClassVar[Dict[str, str]] = {"preference_matrix": "preference_matrices"}
+    criteria: Optional[List[str]] = None
+    alternatives: Optional[List[str]] = None
+    preference_matrix: Optional[List[List[float]]] = None
+    # group mode: one matrix per expert; takes precedence over preference_matrix
+    preference_matrices: Optional[List[List[List[float]]]] = None
+    expert_weights: Optional[List[float]] = None
+    score_matrix: Optional[List[List[float]]] = None
+    benefit: Optional[List[bool]] = None
+    real_values: Optional[RealValues] = None
+    ahp_method: str = "extent"
+    # response sections to compute and return; None means all of them
+    include: Optional[List[str]] = None
+    # "rows" (one dict per alternative) or "columns" (parallel arrays)
+    layout: str = "rows"
+    # ranking method behind ranking_table, winner and recommendation
+    method: str = "topsis"
+    # also rank with every method and report how far they agree
+    compare_methods: bool = False
+    # return only the first top_k ranking rows; later pages via a cursor
+    top_k: Optional[int] = None
+    # "float64" or "float32" (half the memory; falls back on near ties)
+    precision: str = "float64"
+
+
+class NormaliseRequest(DatasetBacked):
+    dataset_fields: ClassVar[Tuple[str, ...]] = (
+        "criteria", "alternatives", "benefit", "real_values"
+    )
+    criteria: Optional[List[str]] = None
+    alternatives: Optional[List[str]] = None
+    benefit: Optional[List[bool]] = None
+    real_values: Optional[RealValues] = None
 
 
 class NormaliseResult(BaseModel):
@@ -28,6 +84,14 @@ class SuggestCriteriaRequest(BaseModel):
     alternatives: Optional[List[str]] = []
     existing_criteria: Optional[List[str]] = []
     num_suggestions: int = 8
+    use_web_evidence: bool = False
+
+
+class RealValuePrefillRequest(BaseModel):
+    criteria: List[str]
+    alternatives: List[str]
+    units: Optional[List[str]] = None
+    deadline: Optional[float] = None
 
 class VerdictRequest(BaseModel):
     decision_name: str
@@ -41,9 +105,69 @@ class VerdictRequest(BaseModel):
     score_matrix: List[List[float]]
     consistency_cr: float
 
-class SensitivityRequest(BaseModel):
+class SensitivityRequest(DatasetBacked):
+    dataset_fields: ClassVar[Tuple[str, ...]] = (
+        "criteria", "alternatives", "score_matrix", "benefit"
+    )
+    criteria: Optional[List[str]] = None
+    alternatives: Optional[List[str]] = None
+    combined_weights: List[float]
+    score_matrix: Optional[List[List[float]]] = None
+    benefit: Optional[List[bool]] = None
+
+class SensitivityIntervalRequest(SensitivityRequest):
+    top_k: int = 1
+
+# Per-request SMAA limits; chunks run one per worker at a time
+MAX_SMAA_SAMPLES = 1_000_000
+MAX_SMAA_CHUNK = 100_000
+MAX_SMAA_ALTERNATIVES = 20_000
+
+
+class SMAARequest(DatasetBacked):
+    dataset_fields: ClassVar[Tuple[str, ...]] = (
+        "criteria", "alternatives", "score_matrix", "benefit"
+    )
+    criteria: Optional[List[str]] = None
+    alternatives: Optional[List[str]] = None
+    score_matrix: Optional[List[List[float]]] = None
+    benefit: Optional[List[bool]] = None
+    weight_source: str = "dirichlet"
+    combined_weights: Optional[List[float]] = None
+    preference_matrix: Optional[List[List[float]]] = None
+    ahp_method: str = "extent"
+    concentration: float = Field(100.0, gt=0)
+    n_samples: int = Field(20000, ge=1, le=MAX_SMAA_SAMPLES)
+    chunk_size: int = Field(2000, ge=1, le=MAX_SMAA_CHUNK)
+    # rank positions reported per alternative (rank 1 .. ranks)
+    ranks: int = Field(10, ge=1, le=1000)
+    seed: int = 42
+
+
+class DatasetUpload(BaseModel):
     criteria: List[str]
     alternatives: List[str]
-    combined_weights: List[float]
+    benefit: List[bool]
     score_matrix: List[List[float]]
-    benefit: List[bool]
\ No newline at end of file
+    preference_matrix: Optional[List[List[float]]] = None
+    real_values: Optional[RealValues] = None
+
+
+class SessionUpdate(BaseModel):
+    op: str  # "score", "preference", "benefit", "add_alternative" or "remove_alternative"
+    row: Optional[int] = None
+    col: Optional[int] = None
+    value: Optional[float] = None
+    # add_alternative: the new alternative's name and one score per criterion
+    name: Optional[str] = None
+    scores: Optional[List[float]] = None
+
+
+class SessionPatch(BaseModel):
+    updates: List[SessionUpdate]
+    # the sensitivity sweep costs more than the edit itself; GET the session for it
+    include_sensitivity: bool = False
+
+
+class BatchAnalyzeRequest(BaseModel):
+    scenarios: List[CombinedRequest]
@@ -0,0 +1,594 @@
+import math
+import os
+import time
+
+import numpy as np
+
+from mcdn_engine.entropy_weights import entropy_weights
+from mcdn_engine.fuzzy_ahp import fuzzy_ahp, group_fuzzy_ahp, AHP_METHODS
+from mcdn_engine.fuzzy_topsis import (
+    normalise_matrix,
+    compute_spread,
+    weights_to_tfn,
+    topsis_from_normalised,
+    crisp_distance_matrices,
+    fuzzy_matrix,
+)
+from mcdn_engine.ranking_methods import (
+    RANKING_METHODS, method_context, run_method, with_order, rank_agreement,
+)
+from mcdn_engine.hybrid_weights import combine_weights
+from mcdn_engine.tfn import defuzz
+from services.dataset_store import resolve_dataset
+from services.normalise_real import (
+    has_real_values, real_values_array, normalise_real_array, merge_real_scores, per_criterion_meta,
+    round_array,
+)
+from services.recommendations import generate_recommendation
+from services.result_cache import ahp_cache, entropy_cache, canonical_key
+from services.sensitivity_analysis import sensitivity_analysis
+from services.telemetry import stage_timer, timed, log_sampled, log_event
+
+
+def ahp_stage(n_c, preference_matrix, method):
+    """fuzzy_ahp, memoised per preference matrix and method."""
+    key = canonical_key("ahp", n_c, preference_matrix, method)
+    result = ahp_cache.get(key)
+    if result is None:
+        result = fuzzy_ahp(n_c, preference_matrix, method)
+        ahp_cache.set(key, result)
+    return result
+
+
+def group_ahp_stage(n_c, preference_matrices, expert_weights, method):
+    """group_fuzzy_ahp, memoised per expert panel, expert weights and method."""
+    key = canonical_key("group_ahp", n_c, preference_matrices, expert_weights, method)
+    result = ahp_cache.get(key)
+    if result is None:
+        result = group_fuzzy_ahp(n_c, preference_matrices, expert_weights, method)
+        ahp_cache.set(key, result)
+    return result
+
+
+def entropy_stage(score_matrix, benefit):
+    """entropy_weights, memoised per score matrix and benefit flags."""
+    key = canonical_key("entropy", score_matrix, benefit)
+    result = entropy_cache.get(key)
+    if result is None:
+        result = entropy_weights(score_matrix, benefit)
+        entropy_cache.set(key, result)
+    return result
+
+
+# response sections a client can ask for with include=
+ANALYSIS_SECTIONS = (
+    "ranking", "weights", "consistency", "sensitivity", "recommendation", "normalisation_meta"
+)
+RANKING_LAYOUTS = ("rows", "columns")
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+# Largest closeness error float32 is trusted to stay under. Only the
+# TOPSIS-side matrices drop to float32 (entropy stays float64); measured
+# full-pipeline max |cc32 - cc64| over random 1-9 score matrices:
+# 1.1e-7 at 1000 x 10, 2.1e-7 at 20k x 50, 6.8e-7 at 100k x 20,
+# 5.5e-7 at 100k x 50, 1.6e-7 at 20k x 200. When the two best
+# alternatives are closer than this, the request is rerun in float64.
+PRECISION_TOLERANCE = float(os.getenv("DSS_FLOAT32_TOLERANCE", 1e-4))
+
+
+def resolve_include(include) -> frozenset:
+    """Requested sections; the recommendation's confidence needs sensitivity."""
+    sections = set(ANALYSIS_SECTIONS if include is None else include)
+    if "recommendation" in sections:
+        sections.add("sensitivity")
+    return frozenset(sections)
+
+
+def validate_matrix(criteria, alternatives, score_matrix, benefit):
+    """Decision-matrix shape checks shared by every endpoint that ranks."""
+    n_c = len(criteria)
+    n_a = len(alternatives)
+
+    if n_c < 2:
+        raise ValueError("Need at least 2 criteria")
+    if n_a < 2:
+        raise ValueError("Need at least 2 alternatives")
+    # same messages as save_dataset; row lengths only, no array is built
+    if len(score_matrix) != n_a or any(len(row) != n_c for row in score_matrix):
+        raise ValueError("score_matrix must be alternatives x criteria")
+    if len(benefit) != n_c:
+        raise ValueError("benefit must have one entry per criterion")
+
+
+def validate_request(req):
+    """Shape checks shared by /analyze, sessions and batch scenarios."""
+    validate_matrix(req.criteria, req.alternatives, req.score_matrix, req.benefit)
+    n_c = len(req.criteria)
+    if req.preference_matrix is not None and req.preference_matrices is None and (
+        len(req.preference_matrix) != n_c or any(len(row) != n_c for row in req.preference_matrix)
+    ):
+        raise ValueError("preference_matrix must be criteria x criteria")
+    if req.ahp_method not in AHP_METHODS:
+        raise ValueError(f"ahp_method must be one of {', '.join(AHP_METHODS)}")
+    if req.preference_matrices is not None:
+        validate_group(req.preference_matrices, req.expert_weights, n_c)
+    elif req.expert_weights is not None:
+        raise ValueError("expert_weights needs preference_matrices")
+    unknown = set(req.include or ()) - set(ANALYSIS_SECTIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown include section(s) {', '.join(sorted(unknown))}; "
+            f"choose from {', '.join(ANALYSIS_SECTIONS)}"
+        )
+    if req.layout not in RANKING_LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(RANKING_LAYOUTS)}")
+    if req.method not in RANKING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(RANKING_METHODS)}")
+    if req.top_k is not None and req.top_k < 1:
+        raise ValueError("top_k must be at least 1")
+    if req.precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}")
+
+
+def validate_group(preference_matrices, expert_weights, n_c):
+    k = len(preference_matrices)
+    if k == 0:
+        raise ValueError("preference_matrices must hold at least one matrix")
+    if any(len(p) < n_c or any(len(row) < n_c for row in p[:n_c]) for p in preference_matrices):
+        raise ValueError("every preference matrix must be at least criteria x criteria")
+    if expert_weights is not None:
+        if len(expert_weights) != k:
+            raise ValueError("expert_weights must have one weight per preference matrix")
+        if not all(math.isfinite(w) and w >= 0 for w in expert_weights) or sum(expert_weights) <= 0:
+            raise ValueError("expert_weights must be finite, non-negative and not all zero")
+
+
+def merge_real_values(req):
+    """
+    Normalise req.real_values column-wise and write the scores over the
+    slider matrix. Returns (score_matrix array, per_criterion meta).
+    """
+    values, present = real_values_array(req.real_values, req.criteria, req.alternatives)
+    result = normalise_real_array(values, present, req.benefit)
+    score_matrix = merge_real_scores(req.score_matrix, result["scores"])
+    meta = per_criterion_meta(req.criteria, req.alternatives, req.benefit, values, present, result)
+    return score_matrix, meta
+
+
+def prepare_scores(req) -> dict:
+    """
+    Everything that depends only on the score side of a request: the
+    real-value merge and entropy weights. Scenarios that share a score
+    matrix share this dict; the TOPSIS normalisation, the per-criterion
+    meta, the fuzzy matrix and the unit-weight distance cells are filled
+    in on first use (see normalised).
+    """
+    # merge real values into score matrix
+    score_matrix = req.score_matrix
+    real = None
+
+    if has_real_values(req.real_values):
+        with timed("real_values"):
+            values, present = real_values_array(req.real_values, req.criteria, req.alternatives)
+            real = (values, present, normalise_real_array(values, present, req.benefit))
+            score_matrix = merge_real_scores(req.score_matrix, real[2]["scores"])
+
+    with timed("entropy"):
+        # always float64: 1 - e is small, so float32 entropy error turns into large weight error
+        ent_w, entropy = entropy_stage(score_matrix, req.benefit)  # crisp
+    if log_sampled():
+        log_event("entropy", criteria=req.criteria, entropy=entropy, weights=ent_w)
+
+    return {
+        "score_matrix": score_matrix,
+        "real": real,
+        "normalise_meta": None,
+        "entropy": (ent_w, entropy),
+        "norm": None,
+        "spreads": None,
+        "fmat": None,
+        "distance_cells": None,
+    }
+
+
+def normalised(prepared: dict, precision: str) -> dict:
+    """Fill in the TOPSIS normalisation of a prepare_scores dict, once."""
+    if prepared["norm"] is None:
+        with timed("normalise"):
+            prepared["norm"] = normalise_matrix(
+                np.asarray(prepared["score_matrix"], dtype=PRECISIONS[precision])
+            )
+            prepared["spreads"] = compute_spread(prepared["norm"])
+    return prepared
+
+
+def run_analysis(req, prepared=None) -> dict:
+    """
+    The full /analyze pipeline for an already validated CombinedRequest.
+    prepared is the prepare_scores result, when the caller already has it.
+    Stages behind sections missing from req.include are skipped.
+
+    In float32, if the deciding scores of the two best alternatives are
+    within PRECISION_TOLERANCE the whole request is rerun in float64, so
+    the winner never depends on the reduced precision.
+    """
+    n_c = len(req.criteria)
+    sections = resolve_include(req.include)
+    if prepared is None:
+        prepared = prepare_scores(req)
+    ent_w, entropy = prepared["entropy"]
+
+    #  Get weights
+    experts = None
+    with timed("ahp"):
+        if req.preference_matrices is not None:
+            ahp_w, lam, ci, cr, experts = group_ahp_stage(
+                n_c, req.preference_matrices, req.expert_weights, req.ahp_method
+            )
+        else:
+            ahp_w, lam, ci, cr = ahp_stage(n_c, req.preference_matrix, req.ahp_method)  # TFN
+
+    with timed("weights"):
+        cw_fuzzy = combine_weights(ahp_w, ent_w)
+
+    # ranking, recommendation and method comparison need scores; weights,
+    # consistency and sensitivity alone do not
+    ranks = bool(sections & {"ranking", "recommendation"}) or req.compare_methods
+    if ranks or "sensitivity" in sections:
+        normalised(prepared, req.precision)
+    if not ranks:
+        return _finish(req, prepared, sections, (ahp_w, lam, ci, cr), cw_fuzzy, None, None, experts)
+
+    if prepared["fmat"] is None:
+        with timed("normalise"):
+            prepared["fmat"] = fuzzy_matrix(prepared["norm"], prepared["spreads"])
+    ctx = method_context(
+        prepared["norm"], prepared["spreads"], weights_to_tfn(cw_fuzzy), req.benefit, prepared["fmat"]
+    )
+
+    #  Fuzzy TOPSIS
+    with timed("topsis"):
+        cc, d_pos, d_neg = topsis_from_normalised(
+            ctx["norm"], ctx["spreads"], ctx["w_tfn"], req.benefit, fmat=ctx["fmat"]
+        )
+
+    #  Other ranking methods, from the same context
+    methods = None
+    if req.method != "topsis" or req.compare_methods:
+        methods = {"topsis": with_order("topsis", {"score": cc, "d_pos": d_pos, "d_neg": d_neg})}
+        for name in RANKING_METHODS if req.compare_methods else (req.method,):
+            if name not in methods:
+                with timed(name):
+                    methods[name] = run_method(name, ctx)
+
+    if req.precision == "float32":
+        deciding = cc if req.method == "topsis" else methods[req.method]["score"]
+        higher_first = req.method == "topsis" or methods[req.method]["higher_is_better"]
+        if top_two_gap(deciding, higher_first) <= PRECISION_TOLERANCE:
+            result = run_analysis(req.model_copy(update={"precision": "float64"}))
+            result["precision"] = {
+                "requested": "float32", "used": "float64", "tolerance": PRECISION_TOLERANCE,
+            }
+            return result
+
+    return _finish(
+        req, prepared, sections, (ahp_w, lam, ci, cr), cw_fuzzy, (cc, d_pos, d_neg), methods, experts
+    )
+
+
+def _finish(req, prepared, sections, ahp, cw_fuzzy, topsis, methods, experts):
+    """The lazily filled stages of run_analysis, then finish_analysis."""
+    if "sensitivity" in sections and prepared["distance_cells"] is None:
+        with timed("normalise"):
+            prepared["distance_cells"] = crisp_distance_matrices(
+                prepared["norm"], prepared["spreads"], req.benefit
+            )
+    if "normalisation_meta" in sections and prepared["real"] and prepared["normalise_meta"] is None:
+        with timed("real_values"):
+            prepared["normalise_meta"] = per_criterion_meta(
+                req.criteria, req.alternatives, req.benefit, *prepared["real"]
+            )
+
+    return finish_analysis(
+        req.criteria,
+        req.alternatives,
+        req.benefit,
+        prepared["score_matrix"],
+        ahp,
+        prepared["entropy"],
+        cw_fuzzy,
+        topsis,
+        prepared["normalise_meta"],
+        distance_cells=prepared["distance_cells"],
+        include=sections,
+        layout=req.layout,
+        experts=experts,
+        method=req.method,
+        methods=methods,
+        compare_methods=req.compare_methods,
+        top_k=req.top_k,
+        precision=req.precision,
+    )
+
+
+def warm_up() -> float:
+    """
+    Run a tiny analysis so NumPy's lazily loaded parts, the AHP random
+    index table and the pipeline's own imports are ready before the first
+    real request. Returns the seconds it took.
+    """
+    from models import CombinedRequest
+
+    t0 = time.perf_counter()
+    analyze_request(CombinedRequest(
+        criteria=["a", "b", "c"],
+        alternatives=["x", "y", "z"],
+        preference_matrix=[[1, 2, 3], [1 / 2, 1, 2], [1 / 3, 1 / 2, 1]],
+        score_matrix=[[7, 3, 5], [5, 5, 5], [2, 8, 4]],
+        benefit=[True, False, True],
+        compare_methods=True,
+    ))
+    return time.perf_counter() - t0
+
+
+def analyze_request(req):
+    """
+    Process-pool entry point for /analyze: resolve a dataset_id, validate
+    and run the pipeline. Returns (response, {stage: seconds}) so the
+    parent can export the worker's timings. Raises DatasetNotFound or
+    ValueError.
+    """
+    with stage_timer() as stages:
+        with timed("resolve"):
+            req = resolve_dataset(req)
+        validate_request(req)
+        result = run_analysis(req)
+    return result, stages
+
+
+def finish_analysis(
+    criteria,
+    alternatives,
+    benefit,
+    score_matrix,
+    ahp,
+    entropy_result,
+    cw_fuzzy,
+    topsis,
+    normalise_meta=None,
+    distance_cells=None,
+    with_sensitivity=True,
+    include=None,
+    layout="rows",
+    experts=None,
+    method="topsis",
+    methods=None,
+    compare_methods=False,
+    top_k=None,
+    precision="float64",
+) -> dict:
+    """
+    Sensitivity, recommendation and the /analyze response body from the
+    weight and TOPSIS stages; shared with incremental sessions. Only the
+    sections in include are computed and returned; criteria, alternatives
+    and benefit always are. experts is group_fuzzy_ahp's per-expert
+    consistency, reported under consistency in group mode.
+
+    methods maps ranking method names to run_method results; method picks
+    the one behind ranking_table, winner and recommendation, and
+    compare_methods adds a method_comparison section over all of them.
+    Sensitivity is always TOPSIS's.
+
+    With top_k, ranking_table holds only the best top_k rows and the full
+    score columns go under "_ranking" for the caller to keep (see
+    ranking_page); the route strips it before responding.
+    """
+    sections = resolve_include(include)
+    ahp_w, lam, ci, cr = ahp
+    ent_w, entropy = entropy_result
+    # topsis is None when no requested section ranks (e.g. include=["weights"])
+    if topsis is not None:
+        cc, d_pos, d_neg = (np.asarray(x, dtype=float) for x in topsis)
+    primary = None if method == "topsis" or topsis is None else methods[method]
+    # recommendation only needs an argmax, so lower-is-better scores are negated
+    if primary is None:
+        utility = cc if topsis is not None else None
+    else:
+        utility = primary["score"] if primary["higher_is_better"] else -primary["score"]
+
+    #  Defuzz weights for UI modules
+    cw_display = [defuzz(w) for w in cw_fuzzy]
+
+    #  Sensitivity & recommendation (use crisp weights)
+    sens = None
+    if "sensitivity" in sections and with_sensitivity:
+        with timed("sensitivity"):
+            sens = sensitivity_analysis(
+                alternatives,
+                score_matrix,
+                cw_display,
+                benefit,
+                criteria,
+                distance_cells=distance_cells,
+            )
+
+    recommendation = None
+    if "recommendation" in sections:
+        with timed("recommendation"):
+            recommendation = generate_recommendation(
+                alternatives,
+                score_matrix,       # correct: raw score matrix for contribution analysis
+                utility.tolist(),   # correct: closeness coefficients (or the chosen method's scores) to identify winner
+                cw_display,
+                criteria,
+                benefit,            # now passed: needed for strength/weakness classification
+                sensitivity_result=sens,  # now passed: enables confidence message
+                dtype=PRECISIONS[precision],
+            )
+
+    out = {}
+
+    #  Ranking
+    if "ranking" in sections:
+        with timed("ranking"):
+            if primary is None:
+                columns = {"closeness": cc, "d_pos": d_pos, "d_neg": d_neg}
+            else:
+                columns = {
+                    k: v for k, v in primary.items() if k not in ("order", "higher_is_better")
+                }
+            # ascending sort key; stable, so ties keep input order exactly as sorted(reverse=True) did
+            key = -utility
+            if top_k is None:
+                ranked = np.argsort(key, kind="stable") if primary is None else primary["order"]
+            else:
+                ranked = top_order(key, top_k)
+            out["ranking_table"] = ranking_table(alternatives, columns, ranked, layout)
+            out["winner"] = alternatives[ranked[0]]
+            if method != "topsis":
+                out["method"] = method
+            if top_k is not None:
+                out["ranking_page"] = {
+                    "total": len(alternatives), "offset": 0, "limit": top_k, "next_cursor": None,
+                }
+                out["_ranking"] = {
+                    "alternatives": alternatives, "columns": columns, "key": key,
+                    "layout": layout, "limit": top_k,
+                }
+
+    if "weights" in sections:
+        out["ahp_weights"] = ahp_w
+        out["entropy_weights"] = ent_w
+        out["combined_weights"] = cw_display
+        out["entropy_values"] = entropy
+    if "consistency" in sections:
+        out["consistency"] = {
+            "lambda_max": lam,
+            "CI": ci,
+            "CR": cr,
+            "ok": cr < 0.1,
+        }
+        if experts is not None:
+            out["consistency"]["experts"] = {
+                **experts,
+                "inconsistent": [i for i, c in enumerate(experts["CR"]) if c >= 0.1],
+            }
+
+    out["criteria"] = criteria
+    out["alternatives"] = alternatives
+    out["benefit"] = benefit
+
+    if "recommendation" in sections:
+        out["recommendation"] = recommendation
+    if "sensitivity" in sections:
+        out["sensitivity"] = sens
+    if "normalisation_meta" in sections:
+        out["normalisation_meta"] = normalise_meta
+    if compare_methods:
+        with timed("compare_methods"):
+            out["method_comparison"] = method_comparison(alternatives, methods, layout)
+    if precision != "float64":
+        out["precision"] = {"requested": precision, "used": precision, "tolerance": PRECISION_TOLERANCE}
+    return out
+
+
+def top_two_gap(scores, higher_is_better=True) -> float:
+    """Score difference between the best and second-best alternative."""
+    scores = np.asarray(scores, dtype=float)
+    if len(scores) < 2:
+        return float("inf")
+    if not higher_is_better:
+        scores = -scores
+    second, best = np.partition(scores, len(scores) - 2)[-2:]
+    return float(best - second)
+
+
+def method_comparison(alternatives, methods, layout="rows") -> dict:
+    """
+    Each method's winner, rank per alternative (input order) and raw
+    score, plus the pairwise Spearman correlation of their rankings.
+    """
+    per_method = {}
+    for name, result in methods.items():
+        ranks = np.empty(len(alternatives), dtype=int)
+        ranks[result["order"]] = np.arange(1, len(alternatives) + 1)
+        score = round_array(result["score"], 4)
+        per_method[name] = {
+            "winner": alternatives[result["order"][0]],
+            "higher_is_better": result["higher_is_better"],
+            "rank": ranks if layout == "columns" else ranks.tolist(),
+            "score": score if layout == "columns" else score.tolist(),
+        }
+
+    agreement = rank_agreement({name: r["order"] for name, r in methods.items()})
+    winners = {m["winner"] for m in per_method.values()}
+    return {
+        "methods": per_method,
+        "spearman": {
+            a: {b: round(float(agreement["spearman"][i, j]), 4) for j, b in enumerate(agreement["methods"])}
+            for i, a in enumerate(agreement["methods"])
+        },
+        "winners_agree": len(winners) == 1,
+    }
+
+
+def top_order(key, stop: int, start: int = 0) -> np.ndarray:
+    """
+    Positions start..stop-1 of np.argsort(key, kind="stable") without a
+    full sort: np.partition finds the stop-th smallest key, and only the
+    entries up to it (ties broken by index, as the stable sort does) are
+    sorted. O(m + stop log stop) instead of O(m log m).
+    """
+    key = np.asarray(key)
+    if stop >= len(key):
+        return np.argsort(key, kind="stable")[start:stop]
+    kth = np.partition(key, stop - 1)[stop - 1]
+    below = np.flatnonzero(key < kth)
+    tied = np.flatnonzero(key == kth)[:stop - len(below)]
+    picked = np.sort(np.concatenate([below, tied]))
+    return picked[np.argsort(key[picked], kind="stable")][start:stop]
+
+
+def ranking_page(stored: dict, offset: int, limit: int) -> dict:
+    """
+    Rows offset..offset+limit-1 of a ranking kept from a top_k response,
+    in that response's layout.
+    """
+    alternatives = stored["alternatives"]
+    ranked = top_order(stored["key"], offset + limit, offset)
+    return {
+        "ranking_table": ranking_table(alternatives, stored["columns"], ranked, stored["layout"], offset),
+        "total": len(alternatives),
+        "offset": offset,
+        "limit": limit,
+    }
+
+
+def ranking_table(alternatives, columns, ranked, layout="rows", offset=0):
+    """
+    The ranking as one dict per alternative ("rows"), or as parallel
+    arrays ("columns"), which stay NumPy until the response is encoded.
+    columns maps names to per-alternative arrays in input order, e.g.
+    closeness, d_pos and d_neg for TOPSIS; offset is the rank of the
+    first row minus one, for later pages.
+    """
+    if layout == "columns":
+        return {
+            "rank": np.arange(offset + 1, offset + len(ranked) + 1),
+            "alternative": [alternatives[i] for i in ranked],
+            **{name: round_array(values[ranked], 4) for name, values in columns.items()},
+            "idx": ranked,
+        }
+
+    # only the ranked rows are converted, so a top_k page costs O(top_k)
+    ranked = np.asarray(ranked)
+    values = {name: np.asarray(v)[ranked].tolist() for name, v in columns.items()}
+    return [
+        {
+            "rank": offset + r + 1,
+            "alternative": alternatives[idx],
+            **{name: round(v[r], 4) for name, v in values.items()},
+            "idx": idx,
+        }
+        for r, idx in enumerate(ranked.tolist())
+    ]
@@ -0,0 +1,105 @@
+import os
+from collections import OrderedDict
+
+from services.analysis_pipeline import prepare_scores, run_analysis, validate_request
+from services.dataset_store import DatasetNotFound, resolve_dataset
+from services.process_pool import (
+    PoolSaturated, DeadlineExceeded, PoolUnavailable, default_deadline, run_cpu_each,
+)
+from services.result_cache import TTLCache, canonical_key
+
+# Scenarios per pool job. Small, so lines stream as scenarios finish and
+# one slow job cannot take a large share of the batch past its deadline.
+BATCH_CHUNK = max(1, int(os.getenv("DSS_BATCH_CHUNK", 4)))
+
+# prepare_scores results per worker process, so later chunks of a score
+# group that land on the same worker skip the normalisation
+_prepared = TTLCache(maxsize=int(os.getenv("DSS_BATCH_PREPARED", 2)), ttl=300)
+
+
+def score_group_key(req) -> str:
+    """Scenarios with equal keys share the prepare_scores stage."""
+    return canonical_key(
+        "scores",
+        req.dataset_id,
+        req.criteria,
+        req.alternatives,
+        req.score_matrix,
+        req.benefit,
+        req.real_values,
+        req.precision,
+    )
+
+
+def plan_batches(indexed, chunk: int = None):
+    """
+    Group (index, request) pairs by score key, then cut each group into
+    chunks of at most `chunk` (default BATCH_CHUNK) scenarios.
+    """
+    chunk = chunk or BATCH_CHUNK
+    groups = OrderedDict()
+    for index, req in indexed:
+        groups.setdefault(score_group_key(req), []).append((index, req))
+
+    batches = []
+    for items in groups.values():
+        batches.extend(items[i:i + chunk] for i in range(0, len(items), chunk))
+    return batches
+
+
+def run_scenario_batch(items) -> list:
+    """
+    Worker entry point: analyse scenarios that share one score matrix,
+    preparing the score side once per worker. Failures are reported per
+    scenario.
+    """
+    out = []
+    prepared = None
+    for index, req in items:
+        try:
+            key = score_group_key(req)
+            req = resolve_dataset(req)
+            validate_request(req)
+            if prepared is None:
+                prepared = _prepared.get(key)
+                if prepared is None:
+                    prepared = prepare_scores(req)
+                    _prepared.set(key, prepared)
+            out.append({"index": index, "status": 200, "result": run_analysis(req, prepared)})
+        except DatasetNotFound:
+            out.append({"index": index, "status": 404, "error": "Unknown dataset_id"})
+        except (ValueError, IndexError) as e:
+            out.append({"index": index, "status": 400, "error": str(e)})
+        except Exception as e:
+            out.append({"index": index, "status": 500, "error": str(e)})
+    return out
+
+
+def _pool_error(error) -> tuple:
+    """(status, message) reported for every scenario of a batch the pool failed."""
+    if isinstance(error, PoolSaturated):
+        return 429, "Analysis queue is full, retry shortly"
+    if isinstance(error, DeadlineExceeded):
+        return 503, "Analysis did not finish within its deadline"
+    if isinstance(error, PoolUnavailable):
+        return 503, "Analysis workers are restarting, retry shortly"
+    return 500, str(error)
+
+
+async def stream_batches(batches):
+    """
+    Yield each batch's scenario results as soon as that batch finishes.
+    Batches go through run_cpu, at most one per worker at a time, each
+    with the /analyze deadline per scenario it holds.
+    """
+    deadline = default_deadline() * max(len(b) for b in batches)
+    calls = [(b,) for b in batches]
+    async for position, lines, error in run_cpu_each(run_scenario_batch, calls, deadline=deadline):
+        if error is not None:
+            status, message = _pool_error(error)
+            lines = [
+                {"index": index, "status": status, "error": message}
+                for index, _ in batches[position]
+            ]
+        for line in lines:
+            yield line
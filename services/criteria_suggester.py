@@ -1,12 +1,15 @@
-import os
+import asyncio
+import logging
+from contextlib import aclosing
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
+from config import GROQ_API_KEY
+from services.evidence import gather_evidence, suggestion_queries, evidence_prompt
+from services.http_client import SingleFlight
+from services.telemetry import timed, log_event
+from services.json_stream import JSONArrayStream
+from services.suggestion_cache import suggestion_cache, suggestion_cache_key
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+suggestion_flights = SingleFlight()
 
 
 async def generate_criteria_suggestions(
@@ -15,9 +18,34 @@ async def generate_criteria_suggestions(
     _parse_json_from_text,
     CRITERIA_SYSTEM
 ):
-    """Core logic moved from route (unchanged)"""
-
-    user_msg = f"""Decision: "{req.decision_text}"
+    """
+    Serve from the on-disk suggestion cache when possible; otherwise
+    concurrent identical requests share one upstream Groq call. SQLite
+    reads and writes run in a worker thread, off the event loop.
+    """
+    with timed("suggestion_cache"):
+        cached = await asyncio.to_thread(suggestion_cache.get, req)
+    if cached is not None:
+        return {"suggestions": cached, "source": "cache", "error": None}
+
+    key = (suggestion_cache_key(req), req.num_suggestions)
+    return await suggestion_flights.run(
+        key,
+        lambda: _generate(req, _groq_chat, _parse_json_from_text, CRITERIA_SYSTEM),
+    )
+
+
+async def build_user_message(req) -> str:
+    """
+    The Groq user prompt for a SuggestCriteriaRequest, with web evidence
+    appended when the request asks for it.
+    """
+    evidence = ""
+    if req.use_web_evidence:
+        with timed("evidence"):
+            evidence = evidence_prompt(await gather_evidence(suggestion_queries(req)))
+
+    return f"""Decision: "{req.decision_text}"
 Alternatives being compared: {", ".join(req.alternatives) if req.alternatives else "not specified yet"}
 Already chosen criteria (do NOT repeat): {", ".join(req.existing_criteria) if req.existing_criteria else "none"}
 
@@ -37,7 +65,32 @@ Rules:
 - Cost/price/time/distance/risk → benefit: false
 - Quality/speed/safety/reliability → benefit: true
 - name max 4 words, rationale max 25 words
-"""
+{evidence}"""
+
+
+def validate_criterion(item):
+    """One suggested criterion in response shape, or None if it is unusable."""
+    if not isinstance(item, dict) or not all(k in item for k in ("name", "benefit", "rationale")):
+        return None
+
+    return {
+        "name": str(item["name"]).strip(),
+        "benefit": bool(item["benefit"]),
+        "rationale": str(item.get("rationale", "")).strip(),
+        "unit": str(item.get("unit", "")).strip(),
+        "example_range": str(item.get("example_range", "")).strip(),
+    }
+
+
+async def _generate(
+    req,
+    _groq_chat,
+    _parse_json_from_text,
+    CRITERIA_SYSTEM
+):
+    """Core logic moved from route (unchanged)"""
+
+    user_msg = await build_user_message(req)
 
     try:
         if not GROQ_API_KEY:
@@ -52,36 +105,83 @@ Rules:
             temperature=0.65
         )
 
-        parsed = _parse_json_from_text(raw)
+        with timed("parse"):
+            parsed = _parse_json_from_text(raw)
 
         if not isinstance(parsed, list):
             raise ValueError("Expected list")
 
-        validated = []
-        for item in parsed:
-            if not isinstance(item, dict) or not all(k in item for k in ("name", "benefit", "rationale")):
-                continue
+        validated = [c for c in map(validate_criterion, parsed) if c is not None]
 
-            validated.append({
-                "name": str(item["name"]).strip(),
-                "benefit": bool(item["benefit"]),
-                "rationale": str(item.get("rationale", "")).strip(),
-                "unit": str(item.get("unit", "")).strip(),
-                "example_range": str(item.get("example_range", "")).strip(),
-            })
+        validated = validated[:req.num_suggestions]
+        if validated:
+            await asyncio.to_thread(suggestion_cache.set, req, validated)
 
         return {
-            "suggestions": validated[:req.num_suggestions],
+            "suggestions": validated,
             "source": "groq",
             "error": None
         }
 
     except Exception as e:
         error_msg = str(e)
-        print(f"⚠️  Groq API error: {error_msg}")
+        log_event("groq_error", logging.WARNING, error=error_msg)
 
         return {
             "suggestions": [],
             "source": "fallback",
             "error": error_msg
-        }
\ No newline at end of file
+        }
+
+async def stream_criteria_suggestions(req, _groq_chat_stream, CRITERIA_SYSTEM):
+    """
+    Yield ("criterion", dict) as soon as each object in the streamed Groq
+    answer is complete and valid, then ("done", summary) or
+    ("error", summary). The complete list is written to the suggestion
+    cache, and cached answers are replayed without an upstream call.
+    """
+    cached = await asyncio.to_thread(suggestion_cache.get, req)
+    if cached is not None:
+        for criterion in cached:
+            yield "criterion", criterion
+        yield "done", {"count": len(cached), "source": "cache", "error": None}
+        return
+
+    validated = []
+    try:
+        if not GROQ_API_KEY:
+            raise RuntimeError("GROQ_API_KEY environment variable not set.")
+
+        parser = JSONArrayStream()
+        chunks = _groq_chat_stream(
+            CRITERIA_SYSTEM,
+            await build_user_message(req),
+            max_tokens=1400,
+            temperature=0.65
+        )
+        # aclosing drops the upstream connection as soon as we stop reading
+        async with aclosing(chunks):
+            async for text in chunks:
+                for item in parser.feed(text):
+                    criterion = validate_criterion(item)
+                    if criterion is None:
+                        continue
+                    validated.append(criterion)
+                    yield "criterion", criterion
+                    if len(validated) >= req.num_suggestions:
+                        break
+                if len(validated) >= req.num_suggestions or parser.finished:
+                    break
+
+        if not parser.started:
+            raise ValueError("No JSON found in model response")
+
+    except Exception as e:
+        error_msg = str(e)
+        log_event("groq_error", logging.WARNING, error=error_msg)
+        yield "error", {"count": len(validated), "source": "fallback", "error": error_msg}
+        return
+
+    if validated:
+        await asyncio.to_thread(suggestion_cache.set, req, validated)
+    yield "done", {"count": len(validated), "source": "groq", "error": None}
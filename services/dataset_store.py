@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from services.normalise_real import real_values_array
+
+DATASET_DIR = os.getenv("DSS_DATASET_DIR", os.path.join("data", "datasets"))
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# dataset_id -> ((inode, mtime) of meta.json, loaded dataset), per process
+_loaded = OrderedDict()
+_loaded_lock = threading.Lock()
+_LOADED_MAX = 64
+
+
+class DatasetNotFound(KeyError):
+    pass
+
+
+def _dataset_path(dataset_id: str) -> str:
+    if not _ID_RE.match(dataset_id or ""):
+        raise DatasetNotFound(dataset_id)
+    return os.path.join(DATASET_DIR, dataset_id)
+
+
+def real_values_to_array(
+    real_values,
+    criteria: List[str],
+    alternatives: List[str]
+) -> np.ndarray:
+    """(m, n) array from either real_values form, NaN where missing."""
+    values, _ = real_values_array(real_values, criteria, alternatives)
+    return values
+
+
+def save_dataset(
+    criteria: List[str],
+    alternatives: List[str],
+    benefit: List[bool],
+    score_matrix,
+    preference_matrix: Optional[List[List[float]]] = None,
+    real_values: Optional[np.ndarray] = None,
+) -> str:
+    """
+    Store a decision matrix as .npy files plus meta.json and return its ID.
+
+    The ID is a content hash, so re-uploading the same data is a no-op.
+    Files are written to a temporary directory and renamed into place so
+    concurrent workers never observe a half-written dataset.
+    """
+    scores = np.ascontiguousarray(score_matrix, dtype=float)
+    if scores.shape != (len(alternatives), len(criteria)):
+        raise ValueError("score_matrix must be alternatives x criteria")
+    if len(benefit) != len(criteria):
+        raise ValueError("benefit must have one entry per criterion")
+    if preference_matrix is not None and np.shape(preference_matrix) != (len(criteria), len(criteria)):
+        raise ValueError("preference_matrix must be criteria x criteria")
+    if real_values is not None:
+        real_values = np.ascontiguousarray(real_values, dtype=float)
+        if real_values.shape != scores.shape:
+            raise ValueError("real_values must be alternatives x criteria")
+
+    meta = {
+        "criteria": list(criteria),
+        "alternatives": list(alternatives),
+        "benefit": [bool(b) for b in benefit],
+        "preference_matrix": preference_matrix,
+        "shape": list(scores.shape),
+        "has_real_values": real_values is not None,
+    }
+
+    h = hashlib.sha256(json.dumps(meta, sort_keys=True).encode())
+    h.update(scores.tobytes())
+    if real_values is not None:
+        h.update(real_values.tobytes())
+    dataset_id = h.hexdigest()[:32]
+
+    target = _dataset_path(dataset_id)
+    if os.path.isdir(target):
+        return dataset_id
+
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=DATASET_DIR, prefix=".upload-")
+    try:
+        np.save(os.path.join(tmp, "scores.npy"), scores)
+        if real_values is not None:
+            np.save(os.path.join(tmp, "real_values.npy"), real_values)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(target):
+            raise
+
+    return dataset_id
+
+
+def load_dataset(dataset_id: str) -> dict:
+    """
+    Metadata plus read-only memory maps of the stored arrays. Mapped pages
+    come from the OS page cache, so workers share one physical copy.
+
+    Loaded datasets are kept per process, but every call stats meta.json
+    first: a dataset deleted (or re-uploaded) through another process is
+    never served from a stale entry, and dropping the entry closes its maps.
+    """
+    path = _dataset_path(dataset_id)
+    try:
+        st = os.stat(os.path.join(path, "meta.json"))
+    except FileNotFoundError:
+        with _loaded_lock:
+            _loaded.pop(dataset_id, None)
+        raise DatasetNotFound(dataset_id)
+    stamp = (st.st_ino, st.st_mtime_ns)
+
+    with _loaded_lock:
+        entry = _loaded.get(dataset_id)
+        if entry is not None and entry[0] == stamp:
+            _loaded.move_to_end(dataset_id)
+            return entry[1]
+
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        meta["score_matrix"] = np.load(os.path.join(path, "scores.npy"), mmap_mode="r")
+        meta["real_values"] = (
+            np.load(os.path.join(path, "real_values.npy"), mmap_mode="r")
+            if meta["has_real_values"] else None
+        )
+    except FileNotFoundError:  # deleted while loading
+        raise DatasetNotFound(dataset_id)
+
+    with _loaded_lock:
+        _loaded[dataset_id] = (stamp, meta)
+        _loaded.move_to_end(dataset_id)
+        while len(_loaded) > _LOADED_MAX:
+            _loaded.popitem(last=False)
+    return meta
+
+
+def delete_dataset(dataset_id: str):
+    path = _dataset_path(dataset_id)
+    if not os.path.isdir(path):
+        raise DatasetNotFound(dataset_id)
+    shutil.rmtree(path)
+    with _loaded_lock:
+        _loaded.pop(dataset_id, None)
+
+
+def dataset_summary(dataset_id: str) -> dict:
+    ds = load_dataset(dataset_id)
+    return {
+        "dataset_id": dataset_id,
+        "criteria": ds["criteria"],
+        "alternatives": ds["alternatives"],
+        "benefit": ds["benefit"],
+        "shape": ds["shape"],
+        "has_preference_matrix": ds["preference_matrix"] is not None,
+        "has_real_values": ds["has_real_values"],
+    }
+
+
+def resolve_dataset(req):
+    """
+    Fill a request's matrix fields from its dataset_id. Fields sent inline
+    take precedence, so a stored matrix can be re-used with, say, a new
+    preference matrix. Requests without a dataset_id are returned as-is.
+    """
+    dataset_id = getattr(req, "dataset_id", None)
+    if not dataset_id:
+        return req
+
+    ds = load_dataset(dataset_id)
+    update = {}
+    for field, key in (
+        ("criteria", "criteria"),
+        ("alternatives", "alternatives"),
+        ("benefit", "benefit"),
+        ("score_matrix", "score_matrix"),
+        ("preference_matrix", "preference_matrix"),
+    ):
+        if field in type(req).model_fields and getattr(req, field) is None:
+            update[field] = ds[key]
+
+    if "real_values" in type(req).model_fields and req.real_values is None and ds["real_values"] is not None:
+        rv = ds["real_values"]
+        same_axes = all(
+            getattr(req, f, None) in (None, ds[f]) for f in ("criteria", "alternatives")
+        )
+        if same_axes:
+            # the stored NaN-for-missing array is already the columnar form
+            update["real_values"] = rv
+        else:
+            update["real_values"] = {
+                f"{ds['alternatives'][i]}__{ds['criteria'][j]}": float(rv[i, j])
+                for i, j in zip(*np.nonzero(~np.isnan(rv)))
+            }
+
+    return req.model_copy(update=update)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import re
+import time
+
+from services.result_cache import TTLCache
+from services.web_search import ddg_search
+
+EVIDENCE_DEADLINE = float(os.getenv("DSS_EVIDENCE_DEADLINE", 3))
+EVIDENCE_CONCURRENCY = int(os.getenv("DSS_EVIDENCE_CONCURRENCY", 8))
+MAX_QUERIES = int(os.getenv("DSS_EVIDENCE_MAX_QUERIES", 200))
+
+evidence_cache = TTLCache(
+    maxsize=int(os.getenv("DSS_EVIDENCE_CACHE_SIZE", 2048)),
+    ttl=float(os.getenv("DSS_EVIDENCE_CACHE_TTL", 6 * 3600)),
+)
+
+_NUMBER = re.compile(r"(?<![\w.])[-+]?\d{1,3}(?:,\d{3})+(?:\.\d+)?|(?<![\w.])[-+]?\d+(?:\.\d+)?")
+
+
+def _unique_snippets(snippets, seen=None) -> list:
+    """snippets without repeats (whitespace and case ignored), first kept."""
+    seen = set() if seen is None else seen
+    kept = []
+    for snippet in snippets:
+        norm = re.sub(r"\s+", " ", snippet).strip().lower()
+        if norm and norm not in seen:
+            seen.add(norm)
+            kept.append(snippet)
+    return kept
+
+
+async def _cached_search(query: str, semaphore: asyncio.Semaphore, max_results: int):
+    snippets = evidence_cache.get(query)
+    if snippets is None:
+        async with semaphore:
+            snippets = await ddg_search(query, max_results)
+        evidence_cache.set(query, snippets)
+    return snippets
+
+
+async def gather_evidence(
+    queries,
+    deadline: float = None,
+    concurrency: int = None,
+    max_results: int = 5,
+) -> dict:
+    """
+    Run every query concurrently (at most `concurrency` at a time) and
+    return whatever finished before one overall deadline, so the added
+    latency does not grow with the number of queries. Each query keeps
+    its own snippets, duplicates removed. Only the first MAX_QUERIES
+    distinct queries are issued.
+    """
+    deadline = EVIDENCE_DEADLINE if deadline is None else deadline
+    semaphore = asyncio.Semaphore(concurrency or EVIDENCE_CONCURRENCY)
+
+    unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    issued, skipped = unique[:MAX_QUERIES], unique[MAX_QUERIES:]
+
+    start = time.perf_counter()
+    tasks = {
+        asyncio.ensure_future(_cached_search(q, semaphore, max_results)): q
+        for q in issued
+    }
+    done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    results, failed = {}, 0
+    for task, query in tasks.items():
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            failed += 1
+            continue
+        # dedupe within a query only: another cell may need the same snippet
+        results[query] = _unique_snippets(task.result())
+
+    return {
+        "results": results,
+        "timed_out": len(pending),
+        "failed": failed,
+        "skipped": len(skipped),
+        "elapsed": round(time.perf_counter() - start, 4),
+    }
+
+
+def suggestion_queries(req) -> list:
+    """One query for the decision and one per alternative."""
+    text = req.decision_text.strip()
+    return [text] + [f"{alt} {text}" for alt in req.alternatives or []]
+
+
+def prefill_queries(alternatives, criteria, units=None) -> list:
+    """One query per (alternative, criterion) cell, row-major."""
+    units = units or [""] * len(criteria)
+    return [
+        f"{alt} {crit} {unit}".strip()
+        for alt in alternatives
+        for crit, unit in zip(criteria, units)
+    ]
+
+
+def extract_numbers(snippets, unit: str = "", limit: int = 5) -> list:
+    """
+    Numeric candidates mentioned in the snippets. Numbers directly followed
+    by the criterion's unit come first; otherwise order of appearance.
+    """
+    unit = unit.strip().lower()
+    with_unit, others = [], []
+    for snippet in snippets:
+        for match in _NUMBER.finditer(snippet):
+            value = float(match.group().replace(",", ""))
+            after = snippet[match.end():].lstrip().lower()
+            target = with_unit if unit and after.startswith(unit) else others
+            if value not in with_unit and value not in others:
+                target.append(value)
+    return (with_unit + others)[:limit]
+
+
+def evidence_prompt(evidence: dict, limit: int = 12) -> str:
+    """Evidence snippets as a prompt section, or "" when there are none."""
+    # queries can share snippets; the prompt lists each once
+    seen = set()
+    lines = [
+        s for snippets in evidence["results"].values() for s in _unique_snippets(snippets, seen)
+    ][:limit]
+    if not lines:
+        return ""
+    return "Web evidence (may be incomplete or outdated):\n" + "\n".join(f"- {s}" for s in lines) + "\n"
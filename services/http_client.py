@@ -0,0 +1,75 @@
+import asyncio
+import importlib.util
+import os
+
+# httpx is imported on first use, so app start-up does not pay for it
+_client = None
+
+# HTTP/2 needs the optional h2 package; without it the client stays on HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.getenv("DSS_HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.getenv("DSS_HTTP_MAX_KEEPALIVE", 20)),
+        keepalive_expiry=float(os.getenv("DSS_HTTP_KEEPALIVE_EXPIRY", 60)),
+    )
+
+
+def get_http_client():
+    """
+    Connection-pooled httpx.AsyncClient shared by every outbound call
+    (Groq, web search). Created lazily; the app lifespan closes it on
+    shutdown.
+    """
+    import httpx
+
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=_limits(),
+            timeout=httpx.Timeout(25, connect=5),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key: the first caller runs the
+    coroutine, later callers await the same task. A caller that is
+    cancelled does not cancel the shared call for the others.
+    """
+
+    def __init__(self):
+        self.inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key, factory):
+        task = self.inflight.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(factory())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
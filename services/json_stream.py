@@ -0,0 +1,60 @@
+import json
+
+
+class JSONArrayStream:
+    """
+    Incremental parser for a JSON array of objects arriving in text chunks.
+
+    Text before the first '[' (prose, a ```json fence) is skipped. feed()
+    returns every top-level element that was completed by the new chunk,
+    so an object is available as soon as its closing brace arrives.
+    Elements that fail to decode are dropped, like a bad item in a fully
+    parsed list.
+    """
+
+    def __init__(self):
+        self.buf = []
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk: str) -> list:
+        out = []
+        for ch in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                self.started = ch == "["
+                continue
+
+            if self.depth > 0:
+                self.buf.append(ch)
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if self.depth == 0:
+                    self.buf = [ch]
+                self.depth += 1
+            elif ch in "}]":
+                if self.depth == 0:
+                    # the outer array closed
+                    self.finished = True
+                    continue
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        out.append(json.loads("".join(self.buf)))
+                    except ValueError:
+                        pass
+                    self.buf = []
+        return out
@@ -1,15 +1,150 @@
-from typing import List, Dict, Optional, Any
+import numpy as np
+from typing import List, Dict, Optional, Any, Tuple
+
+
+def has_real_values(real_values) -> bool:
+    """True for a non-empty mapping, columnar model or array."""
+    if real_values is None:
+        return False
+    if isinstance(real_values, dict):
+        return bool(real_values)
+    return np.size(getattr(real_values, "values", real_values)) > 0
+
+
+def real_values_array(
+    real_values,
+    criteria: List[str],
+    alternatives: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (values, present) as (m, n) arrays aligned to alternatives x criteria.
+
+    Accepts the "{alt}__{crit}" mapping, the columnar form (an object with
+    .values and an optional .mask, True where a value is present) or a
+    bare array with NaN for missing cells.
+    """
+    shape = (len(alternatives), len(criteria))
+
+    if isinstance(real_values, dict):
+        values = np.full(shape, np.nan)
+        for i, alt in enumerate(alternatives):
+            for j, crit in enumerate(criteria):
+                v = real_values.get(f"{alt}__{crit}")
+                if v is not None:
+                    values[i, j] = v
+        return values, ~np.isnan(values)
+
+    mask = getattr(real_values, "mask", None)
+    values = np.array(getattr(real_values, "values", real_values), dtype=float)
+    if values.shape != shape:
+        raise ValueError("real_values must be alternatives x criteria")
+    present = ~np.isnan(values)
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != shape:
+            raise ValueError("real_values mask must be alternatives x criteria")
+        present &= mask
+    values[~present] = np.nan
+    return values, present
+
+
+def round_array(x: np.ndarray, decimals: int = 4) -> np.ndarray:
+    """
+    round(v, decimals) for every element. np.round scales first, which can
+    tip values sitting next to a rounding boundary the other way, so those
+    few are redone with Python's correctly rounded round().
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.round(x, decimals)
+    scaled = x * 10.0 ** decimals
+    edge = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for idx in zip(*np.nonzero(edge)):
+        out[idx] = round(float(x[idx]), decimals)
+    return out
+
+
+def normalise_real_array(
+    values: np.ndarray,
+    present: np.ndarray,
+    benefit: List[bool]
+) -> Dict[str, np.ndarray]:
+    """
+    Whole-column min-max scaling of real values onto 1-9.
+
+    Only columns with every value present are scored; scores is NaN
+    elsewhere. A constant column scores 5.0; cost columns are flipped.
+    """
+    all_present = present.all(axis=0)
+    filled = np.where(present, values, 0.0)
+    lo = np.where(all_present, filled.min(axis=0), np.nan)
+    hi = np.where(all_present, filled.max(axis=0), np.nan)
+    rng = hi - lo
+
+    flat = all_present & (rng == 0)
+    ratio = (values - lo) / np.where(flat, 1.0, rng)
+    cost = ~np.asarray(benefit, dtype=bool)
+    ratio[:, cost] = 1 - ratio[:, cost]
+
+    scores = round_array(1 + ratio * 8)
+    scores[:, flat] = 5.0
+    scores[:, ~all_present] = np.nan
+
+    return {"scores": scores, "all_present": all_present, "lo": lo, "hi": hi, "range": rng}
+
+
+def per_criterion_meta(
+    criteria: List[str],
+    alternatives: List[str],
+    benefit: List[bool],
+    values: np.ndarray,
+    present: np.ndarray,
+    result: Dict[str, np.ndarray]
+) -> Dict[str, Any]:
+    """The nested per_criterion response block for normalise_real_array output."""
+    raws = np.where(present, values, np.nan).T.tolist()
+    scores = result["scores"].T.tolist()
+    per_criterion = {}
+
+    for j, crit in enumerate(criteria):
+        col_raw = [None if r != r else r for r in raws[j]]
+
+        if not result["all_present"][j]:
+            per_criterion[crit] = {
+                "all_present": False,
+                "alternatives": {
+                    alt: {"raw": col_raw[i], "score": None}
+                    for i, alt in enumerate(alternatives)
+                }
+            }
+            continue
+
+        per_criterion[crit] = {
+            "all_present": True,
+            "lo": float(result["lo"][j]),
+            "hi": float(result["hi"][j]),
+            "range": float(result["range"][j]),
+            "benefit": benefit[j],
+            "alternatives": {
+                alt: {"raw": col_raw[i], "score": scores[j][i]}
+                for i, alt in enumerate(alternatives)
+            }
+        }
+
+    return per_criterion
 
 
 def normalise_real_values(
     criteria: List[str],
     alternatives: List[str],
     benefit: List[bool],
-    real_values: Dict[str, float]
+    real_values
 ) -> Dict[str, Any]:
     """
     Takes raw real values and normalises them to 1-9 scores.
 
+    real_values is the "{alt}__{crit}" mapping or the columnar form
+    accepted by real_values_array.
+
     Returns:
         {
             "normalised_scores": {"Dell XPS__Price": 6.0, ...},
@@ -27,61 +162,16 @@ def normalise_real_values(
             }
         }
     """
-    normalised_scores = {}
-    per_criterion = {}
+    values, present = real_values_array(real_values, criteria, alternatives)
+    result = normalise_real_array(values, present, benefit)
+    per_criterion = per_criterion_meta(criteria, alternatives, benefit, values, present, result)
 
+    normalised_scores = {}
+    scores = result["scores"].T.tolist()
     for j, crit in enumerate(criteria):
-
-        col_raw = {
-            alt: real_values.get(f"{alt}__{crit}")
-            for alt in alternatives
-        }
-
-        all_present = all(v is not None for v in col_raw.values())
-
-        if not all_present:
-            per_criterion[crit] = {
-                "all_present": False,
-                "alternatives": {
-                    alt: {"raw": col_raw[alt], "score": None}
-                    for alt in alternatives
-                }
-            }
-            continue
-
-        values = [float(col_raw[alt]) for alt in alternatives]
-        lo = min(values)
-        hi = max(values)
-        rng = hi - lo
-
-        crit_result = {
-            "all_present": True,
-            "lo": lo,
-            "hi": hi,
-            "range": rng,
-            "benefit": benefit[j],
-            "alternatives": {}
-        }
-
-        for i, alt in enumerate(alternatives):
-            raw = values[i]
-
-            if rng == 0:
-                score = 5.0  
-            else:
-                ratio = (raw - lo) / rng
-                if not benefit[j]:
-                    ratio = 1 - ratio
-                score = round(1 + ratio * 8, 4)  
-
-            key = f"{alt}__{crit}"
-            normalised_scores[key] = score
-            crit_result["alternatives"][alt] = {
-                "raw": raw,
-                "score": score
-            }
-
-        per_criterion[crit] = crit_result
+        if result["all_present"][j]:
+            for i, alt in enumerate(alternatives):
+                normalised_scores[f"{alt}__{crit}"] = scores[j][i]
 
     return {
         "normalised_scores": normalised_scores,
@@ -89,6 +179,14 @@ def normalise_real_values(
     }
 
 
+def merge_real_scores(score_matrix, scores: np.ndarray) -> np.ndarray:
+    """Score matrix as an array with every non-NaN normalised score written over it."""
+    matrix = np.array(score_matrix, dtype=float)
+    present = ~np.isnan(scores)
+    matrix[present] = scores[present]
+    return matrix
+
+
 def merge_into_matrix(
     score_matrix: List[List[float]],
     normalised_scores: Dict[str, float],
@@ -99,7 +197,7 @@ def merge_into_matrix(
     Replaces columns in score_matrix with normalised real values
     where available. Columns with no real values stay as sliders.
     """
-    matrix = [row[:] for row in score_matrix]  
+    matrix = [list(row) for row in score_matrix]
 
     for j, crit in enumerate(criteria):
         for i, alt in enumerate(alternatives):
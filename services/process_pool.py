@@ -0,0 +1,209 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.result_cache import merge_worker_delta, worker_cache_delta
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+class DeadlineExceeded(Exception):
+    """The job did not finish within its deadline."""
+
+
+class PoolUnavailable(Exception):
+    """The worker pool died and is being recreated."""
+
+
+def pool_size() -> int:
+    """Worker count from DSS_POOL_WORKERS, defaulting to the number of cores."""
+    configured = os.getenv("DSS_POOL_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
+
+
+def max_queue() -> int:
+    """Jobs allowed to wait for a worker (DSS_POOL_MAX_QUEUE, default 4 per worker)."""
+    configured = os.getenv("DSS_POOL_MAX_QUEUE")
+    return max(0, int(configured)) if configured else 4 * pool_size()
+
+
+def default_deadline() -> float:
+    return float(os.getenv("DSS_ANALYZE_DEADLINE", 30))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Lazily created process pool shared by every CPU-heavy endpoint."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=pool_size())
+        return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _reset_broken_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _PoolStats:
+    """Admission counters and queue-wait samples for run_cpu."""
+
+    def __init__(self, samples: int = 1000):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.deadline_exceeded = 0
+        self.waits = deque(maxlen=samples)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            waits = sorted(self.waits)
+            workers = pool_size()
+
+            def pct(q):
+                return round(waits[min(len(waits) - 1, int(q * len(waits)))], 6) if waits else 0.0
+
+            return {
+                "workers": workers,
+                "max_queue": max_queue(),
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "deadline_exceeded": self.deadline_exceeded,
+                "wait_seconds_p50": pct(0.5),
+                "wait_seconds_p99": pct(0.99),
+                "wait_seconds_max": round(waits[-1], 6) if waits else 0.0,
+            }
+
+
+pool_stats = _PoolStats()
+
+
+def _timed_call(fn, args):
+    """
+    Runs in the worker; reports when the job actually started and how the
+    worker's stage caches moved while it ran.
+    """
+    started = time.time()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        e.cache_delta = worker_cache_delta()
+        raise
+    return started, result, worker_cache_delta()
+
+
+async def run_cpu(fn, *args, deadline=None):
+    """
+    Run fn(*args) on the process pool with admission control.
+
+    Raises PoolSaturated immediately when workers + queue are full,
+    DeadlineExceeded when the job does not finish in time (a queued job
+    is cancelled; a running one is left to finish but its result is
+    dropped) and PoolUnavailable if the pool crashed.
+    """
+    with pool_stats.lock:
+        if pool_stats.in_flight >= pool_size() + max_queue():
+            pool_stats.rejected += 1
+            raise PoolSaturated()
+        pool_stats.in_flight += 1
+        pool_stats.submitted += 1
+
+    def release(_):
+        with pool_stats.lock:
+            pool_stats.in_flight -= 1
+
+    pool = get_process_pool()
+    submitted = time.time()
+    try:
+        cf = pool.submit(_timed_call, fn, args)
+    except (BrokenProcessPool, RuntimeError):
+        release(None)
+        _reset_broken_pool(pool)
+        raise PoolUnavailable()
+    cf.add_done_callback(release)
+
+    try:
+        started, result, delta = await asyncio.wait_for(
+            asyncio.wrap_future(cf),
+            timeout=deadline if deadline is not None else default_deadline(),
+        )
+    except asyncio.CancelledError:
+        # the caller went away (e.g. a client disconnect): drop the job if still queued
+        cf.cancel()
+        raise
+    except asyncio.TimeoutError:
+        cf.cancel()
+        with pool_stats.lock:
+            pool_stats.deadline_exceeded += 1
+        raise DeadlineExceeded()
+    except BrokenProcessPool:
+        _reset_broken_pool(pool)
+        raise PoolUnavailable()
+    except Exception as e:
+        if hasattr(e, "cache_delta"):
+            merge_worker_delta(e.cache_delta)
+        raise
+
+    merge_worker_delta(delta)
+    with pool_stats.lock:
+        pool_stats.completed += 1
+        pool_stats.waits.append(max(0.0, started - submitted))
+    return result
+
+
+async def run_cpu_each(fn, arg_tuples, limit=None, deadline=None):
+    """
+    run_cpu(fn, *args) for each args in arg_tuples, with at most limit
+    (default: the worker count) of them in flight, so one large request
+    cannot fill the whole queue. Yields (position, result, error) as jobs
+    finish; error is the exception run_cpu raised, result is then None.
+    """
+    limit = max(1, limit or pool_size())
+    pending = iter(enumerate(arg_tuples))
+    running = {}
+
+    def start_next():
+        for position, args in pending:
+            running[asyncio.ensure_future(run_cpu(fn, *args, deadline=deadline))] = position
+            return
+
+    for _ in range(limit):
+        start_next()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                position = running.pop(task)
+                start_next()
+                error = task.exception()
+                yield position, None if error else task.result(), error
+    finally:
+        for task in running:
+            task.cancel()
@@ -8,14 +8,15 @@ def generate_recommendation(
     weights,
     criteria,
     benefit,
-    sensitivity_result=None
+    sensitivity_result=None,
+    dtype=float
 ):
 
     if not alternatives or not scores:
         return {"error": "No alternatives or scores provided."}
 
     weights = list(weights)   
-    matrix  = np.array(matrix, dtype=float)
+    matrix  = np.asarray(matrix, dtype=dtype)
     scores  = list(scores)
 
     n_alts, n_crit = matrix.shape
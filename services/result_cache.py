@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Floats are rounded to this many decimals before hashing, so payloads that
+# differ only by float noise share a cache entry.
+KEY_DECIMALS = 6
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires = item
+                if expires >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[1] >= time.monotonic()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _feed(h, value):
+    import numpy as np  # deferred so importing the caches does not load NumPy
+
+    if isinstance(value, dict):
+        for k in sorted(value):
+            h.update(json.dumps(str(k)).encode())
+            _feed(h, value[k])
+        return
+    if isinstance(value, np.ndarray) or (
+        isinstance(value, (list, tuple)) and value
+        and isinstance(value[0], (int, float, list, tuple)) and not isinstance(value[0], bool)
+    ):
+        try:
+            arr = np.round(np.asarray(value, dtype=float), KEY_DECIMALS) + 0.0
+        except (TypeError, ValueError):
+            pass
+        else:
+            h.update(repr(arr.shape).encode())
+            h.update(arr.tobytes())
+            return
+    if isinstance(value, float):
+        value = round(value, KEY_DECIMALS) + 0.0
+    h.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def canonical_key(*parts) -> str:
+    """sha256 over the parts, with numeric arrays rounded to KEY_DECIMALS."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(b"\x1f")
+        _feed(h, part)
+    return h.hexdigest()
+
+
+def _env_cache(prefix: str, maxsize: int, ttl: float) -> TTLCache:
+    return TTLCache(
+        maxsize=int(os.getenv(f"{prefix}_SIZE", maxsize)),
+        ttl=float(os.getenv(f"{prefix}_TTL", ttl)),
+    )
+
+
+# Full /analyze responses and the two independently reusable weight stages
+analysis_cache = _env_cache("DSS_ANALYSIS_CACHE", 256, 600)
+ahp_cache = _env_cache("DSS_AHP_CACHE", 1024, 3600)
+entropy_cache = _env_cache("DSS_ENTROPY_CACHE", 256, 3600)
+# full ranking vectors behind top_k responses, for their later pages
+ranking_store = _env_cache("DSS_RANKING_STORE", 256, 1800)
+
+
+# dataset_id -> analysis keys whose responses came from that dataset, so
+# deleting the dataset can drop them from analysis_cache and ranking_store
+_dataset_keys = {}
+_dataset_lock = threading.Lock()
+
+
+def tag_dataset(dataset_id: str, key: str):
+    with _dataset_lock:
+        keys = _dataset_keys.setdefault(dataset_id, set())
+        keys.add(key)
+        if len(keys) > analysis_cache.maxsize + ranking_store.maxsize:
+            # forget keys both caches have already evicted
+            keys.intersection_update(
+                k for k in keys if k in analysis_cache or k in ranking_store
+            )
+
+
+def purge_dataset(dataset_id: str) -> int:
+    """Drop every cached response and stored ranking built from dataset_id."""
+    with _dataset_lock:
+        keys = _dataset_keys.pop(dataset_id, set())
+    dropped = 0
+    for key in keys:
+        dropped += analysis_cache.pop(key) is not None
+        ranking_store.pop(key)
+    return dropped
+
+
+# Caches filled inside pool workers. Every pool job sends back how their
+# counters moved (worker_cache_delta) and the parent adds that to its
+# own numbers (merge_worker_delta), so cache_stats covers all processes.
+WORKER_CACHES = {"ahp": ahp_cache, "entropy": entropy_cache}
+_COUNTERS = ("hits", "misses", "evictions")
+
+_reported = {name: dict.fromkeys(_COUNTERS, 0) for name in WORKER_CACHES}
+_worker_totals = {name: dict.fromkeys(_COUNTERS, 0) for name in WORKER_CACHES}
+_worker_sizes = {name: {} for name in WORKER_CACHES}  # name -> {pid: size}
+_worker_lock = threading.Lock()
+
+
+def _forget_parent_counters():
+    # a forked worker starts with a copy of the parent's counters
+    for cache in WORKER_CACHES.values():
+        cache.reset_counters()
+    for seen in _reported.values():
+        seen.update(dict.fromkeys(_COUNTERS, 0))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_parent_counters)
+
+
+def worker_cache_delta() -> dict:
+    """Worker side: counter changes since the last call, plus current sizes."""
+    delta = {"pid": os.getpid()}
+    for name, cache in WORKER_CACHES.items():
+        now = cache.counters()
+        seen = _reported[name]
+        delta[name] = {k: now[k] - seen[k] for k in _COUNTERS}
+        delta[name]["size"] = now["size"]
+        seen.update({k: now[k] for k in _COUNTERS})
+    return delta
+
+
+def merge_worker_delta(delta: dict):
+    """Parent side: fold one job's worker_cache_delta into the totals."""
+    with _worker_lock:
+        for name in WORKER_CACHES:
+            for k in _COUNTERS:
+                _worker_totals[name][k] += delta[name][k]
+            _worker_sizes[name][delta["pid"]] = delta[name]["size"]
+
+
+def _with_workers(name: str, cache: TTLCache) -> dict:
+    """A worker cache's stats summed over this process and every worker."""
+    stats = cache.stats()
+    with _worker_lock:
+        for k in _COUNTERS:
+            stats[k] += _worker_totals[name][k]
+        stats["size"] += sum(_worker_sizes[name].values())
+        stats["workers_reporting"] = len(_worker_sizes[name])
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def cache_stats() -> dict:
+    return {
+        "analysis": analysis_cache.stats(),
+        "ahp": _with_workers("ahp", ahp_cache),
+        "entropy": _with_workers("entropy", entropy_cache),
+        "rankings": ranking_store.stats(),
+    }
@@ -1,12 +1,99 @@
-from mcdn_engine.fuzzy_topsis import fuzzy_topsis
+import numpy as np
 
-def sensitivity_analysis(alternatives, matrix, weights, benefit, criteria_names=None):
-    base_cc, _, _ = fuzzy_topsis(matrix, weights, benefit)
-    base_best_idx = max(range(len(base_cc)), key=lambda i: base_cc[i])
+from mcdn_engine.fuzzy_topsis import (
+    fuzzy_topsis,
+    normalise_matrix,
+    compute_spread,
+    crisp_distance_matrices,
+    closeness_batch,
+)
+
+PERTURBATION_FACTORS = [0.8, 0.9, 1.1, 1.2, 1.5]
+
+# Upper bound on k*m closeness cells scored per broadcast pass
+_BATCH_CELLS = 4_000_000
+
+
+def perturbed_weights(weights, factors=PERTURBATION_FACTORS):
+    """
+    (1 + n*len(factors), n) weight array: the base vector followed by every
+    single-criterion perturbation, each re-normalised to sum to 1.
+    """
+    base = np.asarray(weights, dtype=float)
+    n = base.shape[0]
+    f = np.asarray(factors, dtype=float)
+
+    batch = np.repeat(base[None, :], n * len(f), axis=0).reshape(n, len(f), n)
+    idx = np.arange(n)
+    batch[idx, :, idx] = base[:, None] * f[None, :]
+    batch = batch.reshape(n * len(f), n)
+
+    s = batch.sum(axis=1, keepdims=True)
+    batch = np.where(s != 0, batch / np.where(s != 0, s, 1.0), 1.0 / n)
+
+    return np.vstack([base[None, :], batch])
+
+
+def _batched_winners(matrix, weight_batch, benefit, distance_cells=None):
+    """Winner index and score for every row of weight_batch in one TOPSIS setup."""
+    if distance_cells is None:
+        norm = normalise_matrix(np.asarray(matrix, dtype=float))
+        distance_cells = crisp_distance_matrices(norm, compute_spread(norm), benefit)
+    d_pos_cells, d_neg_cells = distance_cells
+
+    m = d_pos_cells.shape[0]
+    step = max(1, _BATCH_CELLS // max(m, 1))
+    best_idx, best_cc = [], []
+    for start in range(0, weight_batch.shape[0], step):
+        cc, _, _ = closeness_batch(d_pos_cells, d_neg_cells, weight_batch[start:start + step])
+        idx = np.argmax(cc, axis=1)
+        best_idx.append(idx)
+        best_cc.append(cc[np.arange(cc.shape[0]), idx])
+
+    return np.concatenate(best_idx), np.concatenate(best_cc)
+
+
+def _looped_winners(matrix, weight_batch, benefit):
+    """Reference path: one full fuzzy_topsis run per weight vector."""
+    best_idx, best_cc = [], []
+    for w in weight_batch:
+        cc, _, _ = fuzzy_topsis(matrix, w.tolist(), benefit)
+        idx = max(range(len(cc)), key=lambda x: cc[x])
+        best_idx.append(idx)
+        best_cc.append(cc[idx])
+    return np.array(best_idx), np.array(best_cc)
+
+
+def sensitivity_analysis(
+    alternatives,
+    matrix,
+    weights,
+    benefit,
+    criteria_names=None,
+    batched=True,
+    distance_cells=None,
+):
+    """
+    Winner stability under +/- perturbation of each criterion weight.
+
+    The batched mode scores all 5n+1 weight vectors against one normalised
+    matrix with a single broadcast pass; it needs non-negative crisp weights
+    and falls back to the looped path otherwise. Callers that already hold
+    the crisp_distance_matrices of matrix can pass them as distance_cells.
+    """
+    weights = list(weights)
+    factors = PERTURBATION_FACTORS
+    weight_batch = perturbed_weights(weights, factors)
+
+    if batched and np.all(weight_batch >= 0):
+        best_idx, best_cc = _batched_winners(matrix, weight_batch, benefit, distance_cells)
+    else:
+        best_idx, best_cc = _looped_winners(matrix, weight_batch, benefit)
+
+    base_best_idx = int(best_idx[0])
     base_best = alternatives[base_best_idx]
-    base_score = base_cc[base_best_idx]
+    base_score = float(best_cc[0])
 
-    perturbation_factors = [0.8, 0.9, 1.1, 1.2, 1.5]
     results = []
 
     for i in range(len(weights)):
@@ -18,16 +105,10 @@ def sensitivity_analysis(alternatives, matrix, weights, benefit, criteria_names=
             "ever_changes": False,
         }
 
-        for factor in perturbation_factors:
-            new_w = weights[:]
-            new_w[i] *= factor
-
-            s = sum(new_w)
-            new_w = [w / s for w in new_w] if s else [1.0 / len(new_w)] * len(new_w)
-
-            cc, _, _ = fuzzy_topsis(matrix, new_w, benefit)
-            new_best_idx = max(range(len(cc)), key=lambda x: cc[x])
-            new_best = alternatives[new_best_idx]
+        for f, factor in enumerate(factors):
+            row = 1 + i * len(factors) + f
+            new_best = alternatives[int(best_idx[row])]
+            score = float(best_cc[row])
             changed = new_best != base_best
 
             if changed:
@@ -35,11 +116,11 @@ def sensitivity_analysis(alternatives, matrix, weights, benefit, criteria_names=
 
             criterion_result["perturbations"].append({
                 "factor": factor,
-                "new_weight": round(new_w[i], 4),
+                "new_weight": round(float(weight_batch[row, i]), 4),
                 "winner": new_best,
-                "winner_score": round(cc[new_best_idx], 4),
+                "winner_score": round(score, 4),
                 "changed": changed,
-                "score_delta": round(cc[new_best_idx] - base_score, 4),
+                "score_delta": round(score - base_score, 4),
             })
 
         results.append(criterion_result)
@@ -49,4 +130,170 @@ def sensitivity_analysis(alternatives, matrix, weights, benefit, criteria_names=
         "base_score": round(base_score, 4),
         "stable": not any(r["ever_changes"] for r in results),
         "criteria_sensitivity": results,
-    }
\ No newline at end of file
+    }
+
+
+def _crossings(n0, n1, t0, t1, a, b):
+    """
+    Roots in s of cc_a(s) = cc_b(s) for every (a, b) pair, where each
+    closeness is (n0 + s*n1) / (t0 + s*t1). Returns (len(a), len(b), 2),
+    NaN where no real root exists.
+    """
+    n0a, n1a, t0a, t1a = (x[a][:, None] for x in (n0, n1, t0, t1))
+    n0b, n1b, t0b, t1b = (x[b][None, :] for x in (n0, n1, t0, t1))
+
+    qa = n1a * t1b - n1b * t1a
+    qb = n0a * t1b + n1a * t0b - n0b * t1a - n1b * t0a
+    qc = n0a * t0b - n0b * t0a
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        disc = qb ** 2 - 4 * qa * qc
+        sq = np.sqrt(np.where(disc >= 0, disc, np.nan))
+        quad = np.abs(qa) > 1e-14
+        r1 = np.where(quad, (-qb - sq) / (2 * qa), -qc / qb)
+        r2 = np.where(quad, (-qb + sq) / (2 * qa), np.nan)
+
+    return np.stack([r1, r2], axis=-1)
+
+
+def _share_to_factor(s, s0):
+    """Multiplier on the base weight that yields normalised share s."""
+    if s0 <= 0 or s0 >= 1:
+        return None
+    if s >= 1:
+        return None
+    return s * (1 - s0) / (s0 * (1 - s))
+
+
+def stability_intervals(alternatives, matrix, weights, benefit, criteria_names=None, top_k=1):
+    """
+    Exact weight breakpoints at which the top-k set changes, per criterion.
+
+    Criterion i is moved along the same path as sensitivity_analysis (scale
+    w_i, re-normalise the rest), parameterised by its normalised share s in
+    [0, 1]. With crisp weights every distance is linear in s, so each
+    closeness is a ratio of linear functions and pairwise rank swaps are
+    roots of a quadratic. The sweep jumps from root to root and only
+    re-scores the alternatives once per candidate breakpoint to confirm
+    the new top-k set.
+    """
+    w = np.asarray(weights, dtype=float)
+    if np.any(w < 0):
+        raise ValueError("Stability intervals need non-negative weights")
+
+    arr = np.asarray(matrix, dtype=float)
+    m, n = arr.shape
+    top_k = max(1, min(int(top_k), m - 1))
+
+    norm = normalise_matrix(arr)
+    d_pos_cells, d_neg_cells = crisp_distance_matrices(norm, compute_spread(norm), benefit)
+    evaluations = 1
+
+    def top_set(cc):
+        return frozenset(np.argsort(-cc, kind="stable")[:top_k].tolist())
+
+    total_w = w.sum()
+    base_cc, _, _ = closeness_batch(d_pos_cells, d_neg_cells, w)
+    base_top = top_set(base_cc[0])
+    base_best = int(np.argmax(base_cc[0]))
+
+    grid_lo, grid_hi = min(PERTURBATION_FACTORS), max(PERTURBATION_FACTORS)
+    results = []
+
+    for i in range(n):
+        rest = total_w - w[i]
+        s0 = w[i] / total_w if total_w else 1.0 / n
+
+        # distances along the path: d(s) = (1 - s) * P / rest + s * D[:, i]
+        others = np.delete(np.arange(n), i)
+        if rest > 0:
+            p_pos = d_pos_cells[:, others] @ w[others] / rest
+            p_neg = d_neg_cells[:, others] @ w[others] / rest
+        else:
+            p_pos = np.zeros(m)
+            p_neg = np.zeros(m)
+
+        n0, n1 = p_neg, d_neg_cells[:, i] - p_neg
+        t0 = p_pos + p_neg
+        t1 = d_pos_cells[:, i] + d_neg_cells[:, i] - t0
+
+        def closeness_at(s):
+            tot = t0 + s * t1
+            return np.where(tot > 1e-10, (n0 + s * n1) / np.where(tot > 1e-10, tot, 1.0), 0.0)
+
+        breakpoints = []
+        bounds = {}
+
+        for direction, limit in (("increase", 1.0), ("decrease", 0.0)):
+            s_cur, current = s0, base_top
+            bounds[direction] = limit
+
+            while True:
+                inside = np.fromiter(current, dtype=int)
+                outside = np.setdiff1d(np.arange(m), inside)
+                roots = _crossings(n0, n1, t0, t1, inside, outside).ravel()
+
+                if direction == "increase":
+                    cand = roots[(roots > s_cur + 1e-12) & (roots <= limit)]
+                    if cand.size == 0:
+                        break
+                    s_next = float(cand.min())
+                    probe = min(s_next + 1e-9, (s_next + limit) / 2) if s_next < limit else s_next
+                else:
+                    cand = roots[(roots < s_cur - 1e-12) & (roots >= limit)]
+                    if cand.size == 0:
+                        break
+                    s_next = float(cand.max())
+                    probe = max(s_next - 1e-9, (s_next + limit) / 2) if s_next > limit else s_next
+
+                cc = closeness_at(probe)
+                evaluations += 1
+                new_top = top_set(cc)
+                s_cur = s_next
+
+                if new_top == current:
+                    continue
+
+                if bounds[direction] == limit:
+                    bounds[direction] = s_next
+                winner = int(np.argmax(cc))
+                breakpoints.append({
+                    "direction": direction,
+                    "weight": round(s_next, 6),
+                    "factor": None if _share_to_factor(s_next, s0) is None
+                    else round(_share_to_factor(s_next, s0), 6),
+                    "winner": alternatives[winner],
+                    "top_k": [alternatives[a] for a in np.argsort(-cc, kind="stable")[:top_k]],
+                })
+                current = new_top
+
+        f_hi = _share_to_factor(bounds["increase"], s0)
+        f_lo = _share_to_factor(bounds["decrease"], s0)
+        in_grid = [
+            b for b in breakpoints
+            if b["factor"] is not None and grid_lo <= b["factor"] <= grid_hi
+        ]
+
+        results.append({
+            "criterion_index": i,
+            "criterion_name": criteria_names[i] if criteria_names else f"C{i+1}",
+            "base_weight": round(s0, 4),
+            "stable_interval": {
+                "weight_low": round(bounds["decrease"], 6),
+                "weight_high": round(bounds["increase"], 6),
+                "factor_low": None if f_lo is None else round(f_lo, 6),
+                "factor_high": None if f_hi is None else round(f_hi, 6),
+            },
+            "breakpoints": sorted(breakpoints, key=lambda b: b["weight"]),
+            "changes_within_grid": bool(in_grid),
+        })
+
+    return {
+        "base_winner": alternatives[base_best],
+        "base_top_k": [alternatives[a] for a in np.argsort(-base_cc[0], kind="stable")[:top_k]],
+        "top_k": top_k,
+        "stable_within_grid": not any(r["changes_within_grid"] for r in results),
+        "criteria_intervals": results,
+        "topsis_evaluations": evaluations,
+        "grid_evaluations": len(PERTURBATION_FACTORS) * n + 1,
+    }
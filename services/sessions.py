@@ -0,0 +1,141 @@
+import math
+import os
+import threading
+import uuid
+
+from mcdn_engine.incremental import IncrementalAnalysis
+from services.analysis_pipeline import finish_analysis, merge_real_values
+from services.normalise_real import has_real_values
+from services.result_cache import TTLCache
+
+sessions = TTLCache(
+    maxsize=int(os.getenv("DSS_SESSION_LIMIT", 1000)),
+    ttl=float(os.getenv("DSS_SESSION_TTL", 3600)),
+)
+
+
+class SessionNotFound(KeyError):
+    pass
+
+
+def create_session(req) -> str:
+    """Build an IncrementalAnalysis from a validated CombinedRequest."""
+    if req.preference_matrices is not None:
+        raise ValueError("Sessions take a single preference_matrix, not preference_matrices")
+    if req.method != "topsis" or req.compare_methods:
+        raise ValueError("Sessions rank with fuzzy TOPSIS only")
+    if req.precision != "float64":
+        raise ValueError("Sessions compute in float64 only")
+    if req.top_k is not None:
+        raise ValueError("Sessions return the full ranking; top_k is for /analyze")
+    score_matrix = req.score_matrix
+    normalise_meta = None
+
+    if has_real_values(req.real_values):
+        score_matrix, normalise_meta = merge_real_values(req)
+
+    session_id = uuid.uuid4().hex
+    sessions.set(session_id, {
+        "engine": IncrementalAnalysis(
+            score_matrix, req.preference_matrix, req.benefit, req.ahp_method
+        ),
+        "criteria": list(req.criteria),
+        "alternatives": list(req.alternatives),
+        "normalisation_meta": normalise_meta,
+        "include": req.include,
+        "layout": req.layout,
+        "lock": threading.Lock(),
+    })
+    return session_id
+
+
+def get_session(session_id: str) -> dict:
+    session = sessions.get(session_id)
+    if session is None:
+        raise SessionNotFound(session_id)
+    return session
+
+
+UPDATE_OPS = ("score", "preference", "benefit", "add_alternative", "remove_alternative")
+
+
+def _check_update(u, m: int, n: int):
+    """Reject an update before it touches any state; m, n are the shape it applies to."""
+    if u.op not in UPDATE_OPS:
+        raise ValueError(f"Unknown update op '{u.op}'")
+    if u.op in ("score", "preference", "remove_alternative") and u.row is None:
+        raise ValueError(f"'{u.op}' updates need row")
+    if u.op in ("score", "preference", "benefit") and (u.col is None or u.value is None):
+        raise ValueError(f"'{u.op}' updates need col and value")
+    if u.op == "add_alternative" and (not u.name or u.scores is None):
+        raise ValueError("'add_alternative' updates need name and scores")
+
+    rows = n if u.op == "preference" else m
+    if u.row is not None and u.op != "add_alternative" and not 0 <= u.row < rows:
+        raise IndexError(f"row {u.row} out of range")
+    if u.col is not None and u.op in ("score", "preference", "benefit") and not 0 <= u.col < n:
+        raise IndexError(f"col {u.col} out of range")
+    if u.op == "preference" and u.row >= u.col:
+        raise IndexError("only upper-triangle preference cells (row < col) are read")
+    if u.op == "remove_alternative" and m <= 2:
+        raise ValueError("Need at least 2 alternatives")
+    if u.op == "add_alternative" and len(u.scores) != n:
+        raise ValueError(f"Expected {n} scores, got {len(u.scores)}")
+    if u.value is not None and not math.isfinite(u.value):
+        raise ValueError("value must be finite")
+    if u.op == "preference" and u.value <= 0:
+        raise ValueError("preference values must be positive")
+    if u.scores is not None and not all(math.isfinite(x) for x in u.scores):
+        raise ValueError("scores must be finite")
+
+
+def apply_updates(session: dict, updates):
+    """
+    Apply score / preference / benefit edits and alternative changes in
+    order. The whole batch is checked against the shapes it will see
+    first, so a rejected batch leaves the session untouched and an
+    accepted one is applied in place.
+    """
+    engine = session["engine"]
+    m, n = engine.shape
+    for u in updates:
+        _check_update(u, m, n)
+        m += (u.op == "add_alternative") - (u.op == "remove_alternative")
+
+    for u in updates:
+        if u.op == "add_alternative":
+            engine.append_alternative(u.scores)
+            session["alternatives"].append(u.name)
+            # per-alternative real-value details no longer match the rows
+            session["normalisation_meta"] = None
+        elif u.op == "remove_alternative":
+            engine.remove_alternative(u.row)
+            session["alternatives"].pop(u.row)
+            session["normalisation_meta"] = None
+        elif u.op == "score":
+            engine.set_score(u.row, u.col, u.value)
+        elif u.op == "preference":
+            engine.set_preference(u.row, u.col, u.value)
+        else:
+            engine.set_benefit(u.col, bool(u.value))
+
+
+def session_snapshot(session_id: str, session: dict, with_sensitivity: bool = True) -> dict:
+    """The /analyze response body for the session's current state."""
+    engine = session["engine"]
+    result = finish_analysis(
+        session["criteria"],
+        session["alternatives"],
+        engine.benefit.tolist(),
+        engine.scores,
+        (engine.ahp_w, engine.lam, engine.ci, engine.cr),
+        (engine.ent_w.tolist(), engine.entropy.tolist()),
+        engine.cw_fuzzy,
+        (engine.cc.tolist(), engine.d_pos.tolist(), engine.d_neg.tolist()),
+        session["normalisation_meta"],
+        distance_cells=engine.distance_cells() if with_sensitivity else None,
+        with_sensitivity=with_sensitivity,
+        include=session["include"],
+        layout=session["layout"],
+    )
+    return {"session_id": session_id, **result}
@@ -0,0 +1,173 @@
+import numpy as np
+
+from mcdn_engine.fuzzy_topsis import (
+    normalise_matrix,
+    compute_spread,
+    crisp_distance_matrices,
+    closeness_batch,
+)
+from services.process_pool import pool_size, run_cpu_each
+
+# Upper bound on samples*alternatives closeness cells held per chunk
+_CHUNK_CELLS = 4_000_000
+
+
+def smaa_distance_cells(matrix, benefit, n_alternatives, n_criteria):
+    """
+    Unit-weight distance cells of a validated score matrix; raises
+    ValueError on a shape mismatch, before any streaming starts.
+    """
+    try:
+        arr = np.asarray(matrix, dtype=float)
+    except ValueError:  # ragged rows
+        arr = None
+    if arr is None or arr.shape != (n_alternatives, n_criteria):
+        raise ValueError("score_matrix must be alternatives x criteria")
+    if len(benefit) != n_criteria:
+        raise ValueError("benefit must have one entry per criterion")
+    if not np.isfinite(arr).all():
+        raise ValueError("score_matrix must be finite")
+    norm = normalise_matrix(arr)
+    return crisp_distance_matrices(norm, compute_spread(norm), benefit)
+
+
+def dirichlet_alpha(weights, concentration):
+    """Dirichlet parameters centred on a crisp weight vector."""
+    w = np.clip(np.asarray(weights, dtype=float), 0, None)
+    s = w.sum()
+    w = w / s if s > 0 else np.ones_like(w) / len(w)
+    return np.maximum(w * concentration, 1e-3)
+
+
+def sample_weights(rng, size, source, params):
+    """
+    (size, n) weight samples, rows normalised to sum to 1.
+
+    source "dirichlet": params is the Dirichlet alpha vector.
+    source "fuzzy_ahp": params is an (n, 3) array of TFN weights; each
+    criterion is drawn from its triangular distribution.
+    """
+    if source == "dirichlet":
+        return rng.dirichlet(params, size=size)
+
+    tfn = np.asarray(params, dtype=float)
+    lo, mode, hi = tfn[:, 0], tfn[:, 1], tfn[:, 2]
+    u = rng.random((size, tfn.shape[0]))
+
+    # inverse CDF of the triangular distribution, safe for l == u
+    width = np.where(hi > lo, hi - lo, 1.0)
+    cut = (mode - lo) / width
+    left = lo + np.sqrt(u * width * (mode - lo))
+    right = hi - np.sqrt((1 - u) * width * (hi - mode))
+    w = np.where(hi > lo, np.where(u < cut, left, right), mode)
+
+    s = w.sum(axis=1, keepdims=True)
+    return w / np.where(s > 0, s, 1.0)
+
+
+def smaa_chunk(d_pos_cells, d_neg_cells, source, params, size, seed, ranks=None):
+    """
+    Score one chunk of sampled weight vectors.
+
+    Returns (rank_counts (m, R), central_sum (m, n)) where rank_counts[a, r]
+    counts samples placing alternative a at rank r, for the first
+    R = min(ranks, m) ranks (all of them when ranks is None), and
+    central_sum[a] sums the weight vectors under which a ranked first.
+    """
+    rng = np.random.default_rng(seed)
+    m, n = d_pos_cells.shape
+    r = m if ranks is None else max(1, min(ranks, m))
+    rank_counts = np.zeros((m, r), dtype=np.int64)
+    central_sum = np.zeros((m, n))
+
+    step = max(1, _CHUNK_CELLS // max(m, 1))
+    for start in range(0, size, step):
+        w = sample_weights(rng, min(step, size - start), source, params)
+        cc, _, _ = closeness_batch(d_pos_cells, d_neg_cells, w)
+
+        order = np.argsort(-cc, axis=1, kind="stable")[:, :r]
+        rank_counts += np.bincount(
+            (order * r + np.arange(r)[None, :]).ravel(), minlength=m * r
+        ).reshape(m, r)
+        np.add.at(central_sum, order[:, 0], w)
+
+    return rank_counts, central_sum
+
+
+def plan_chunks(n_samples, chunk_size, seed):
+    """Fixed (size, seed) chunk list; results do not depend on worker count."""
+    seeds = np.random.SeedSequence(seed)
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    return list(zip(sizes, seeds.spawn(len(sizes))))
+
+
+def summarise_smaa(alternatives, criteria, rank_counts, central_sum, n_samples):
+    acceptability = rank_counts / n_samples
+    wins = rank_counts[:, 0]
+
+    rows = []
+    for a, alt in enumerate(alternatives):
+        central = central_sum[a] / wins[a] if wins[a] else None
+        rows.append({
+            "alternative": alt,
+            "first_rank_acceptability": round(float(acceptability[a, 0]), 4),
+            "rank_acceptability": np.round(acceptability[a], 4).tolist(),
+            "central_weights": None if central is None else {
+                criteria[j]: round(float(central[j]), 4) for j in range(len(criteria))
+            },
+        })
+
+    rows.sort(key=lambda r: r["first_rank_acceptability"], reverse=True)
+    return {
+        "n_samples": n_samples,
+        "ranks_tracked": rank_counts.shape[1],
+        "most_acceptable": rows[0]["alternative"],
+        "alternatives": rows,
+    }
+
+
+async def stream_smaa(
+    alternatives,
+    criteria,
+    d_pos_cells,
+    d_neg_cells,
+    source,
+    params,
+    n_samples,
+    seed,
+    chunk_size,
+    ranks=None,
+):
+    """
+    Run SMAA chunks over smaa_distance_cells output on the process pool,
+    yielding progress events as chunks finish and a final result event.
+    Chunks are combined in plan order so the result is reproducible for a
+    given seed. Rank acceptability covers the first `ranks` positions, so
+    each chunk returns (m, ranks) counts rather than (m, m). At most one
+    chunk per worker is in flight, so a long run does not fill the pool's
+    queue. If the pool refuses or times out a chunk, an error event ends
+    the stream.
+    """
+    plan = plan_chunks(n_samples, chunk_size, seed)
+    calls = [
+        (d_pos_cells, d_neg_cells, source, params, size, chunk_seed, ranks)
+        for size, chunk_seed in plan
+    ]
+
+    results = [None] * len(plan)
+    done = 0
+    async for position, result, error in run_cpu_each(smaa_chunk, calls, limit=pool_size()):
+        if error is not None:
+            yield {"event": "error", "error": type(error).__name__, "chunks_done": done}
+            return
+        results[position] = result
+        done += 1
+        yield {"event": "progress", "chunks_done": done, "chunks_total": len(plan)}
+
+    rank_counts = sum(counts for counts, _ in results)
+    central_sum = sum(central for _, central in results)
+
+    result = summarise_smaa(alternatives, criteria, rank_counts, central_sum, n_samples)
+    yield {"event": "result", "source": source, "seed": seed, **result}
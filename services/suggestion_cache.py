@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from services.result_cache import canonical_key
+
+SUGGESTION_DB = os.getenv("DSS_SUGGESTION_DB", os.path.join("data", "suggestions.sqlite3"))
+MAX_ROWS = int(os.getenv("DSS_SUGGESTION_MAX_ROWS", 10000))
+MAX_AGE = float(os.getenv("DSS_SUGGESTION_TTL", 30 * 24 * 3600))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    key        TEXT PRIMARY KEY,
+    requested  INTEGER NOT NULL,
+    payload    TEXT NOT NULL,
+    created    REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS suggestions_last_used ON suggestions (last_used);
+"""
+
+
+def normalise_text(text) -> str:
+    """Case, whitespace and trailing punctuation do not change the decision."""
+    return re.sub(r"\s+", " ", str(text or "")).strip().strip(".?!").strip().lower()
+
+
+def suggestion_cache_key(req) -> str:
+    """
+    Key on everything but num_suggestions, so a stored answer for a larger
+    count can serve a smaller one. Alternatives and existing criteria are
+    sets as far as the prompt is concerned. Evidence-informed answers are
+    kept apart from plain ones.
+    """
+    parts = [
+        "suggestions",
+        normalise_text(req.decision_text),
+        sorted(normalise_text(a) for a in req.alternatives or []),
+        sorted(normalise_text(c) for c in req.existing_criteria or []),
+    ]
+    if getattr(req, "use_web_evidence", False):
+        parts.append("web")
+    return canonical_key(*parts)
+
+
+class SuggestionCache:
+    """
+    SQLite (WAL mode) store of validated suggestion lists. Rows older than
+    max_age are dropped; beyond max_rows the least recently used go first.
+    """
+
+    def __init__(self, path: str = SUGGESTION_DB, max_rows: int = MAX_ROWS, max_age: float = MAX_AGE):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.conn = None
+        self.hits = 0
+        self.superset_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _db(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self.conn = conn
+        return self.conn
+
+    def get(self, req):
+        """Up to num_suggestions cached suggestions, or None."""
+        key = suggestion_cache_key(req)
+        now = time.time()
+        with self.lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT requested, payload, created FROM suggestions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.max_age or row[0] < req.num_suggestions:
+                self.misses += 1
+                return None
+            with db:
+                db.execute(
+                    "UPDATE suggestions SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+                )
+            if row[0] > req.num_suggestions:
+                self.superset_hits += 1
+            else:
+                self.hits += 1
+        return json.loads(row[1])[:req.num_suggestions]
+
+    def set(self, req, suggestions):
+        key = suggestion_cache_key(req)
+        now = time.time()
+        with self.lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO suggestions (key, requested, payload, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, req.num_suggestions, json.dumps(suggestions), now, now),
+                )
+                self._evict(db, now)
+
+    def _evict(self, db, now):
+        expired = db.execute(
+            "DELETE FROM suggestions WHERE created < ?", (now - self.max_age,)
+        ).rowcount
+        overflow = db.execute(
+            "DELETE FROM suggestions WHERE key IN ("
+            "SELECT key FROM suggestions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        ).rowcount
+        self.evictions += expired + overflow
+
+    def clear(self):
+        with self.lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM suggestions")
+
+    def stats(self) -> dict:
+        with self.lock:
+            rows = self._db().execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+            size = sum(
+                os.path.getsize(p)
+                for p in (self.path, self.path + "-wal")
+                if os.path.exists(p)
+            )
+            return {
+                "path": self.path,
+                "rows": rows,
+                "max_rows": self.max_rows,
+                "max_age": self.max_age,
+                "bytes": size,
+                "hits": self.hits,
+                "superset_hits": self.superset_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+suggestion_cache = SuggestionCache()
@@ -0,0 +1,147 @@
+import bisect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+log = logging.getLogger("dss")
+
+# fraction of requests whose debug payloads are logged; 0 disables them
+LOG_SAMPLE_RATE = float(os.getenv("DSS_LOG_SAMPLE_RATE", 0))
+
+_stages = ContextVar("dss_stages", default=None)
+
+
+#  Stage timers
+@contextmanager
+def stage_timer():
+    """
+    Collect timed() stages run in this context (and in tasks it starts)
+    into the yielded {stage: seconds} dict.
+    """
+    stages = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+
+
+@contextmanager
+def timed(name: str):
+    """Add the block's wall time to the current stage_timer, if there is one."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - t0
+
+
+def server_timing(stages: dict) -> str:
+    """A Server-Timing header value; durations in milliseconds."""
+    return ", ".join(f"{name};dur={seconds * 1e3:.2f}" for name, seconds in stages.items())
+
+
+def size_bucket(m: int, n: int) -> str:
+    """Coarse matrix-size label, by number of cells, for metric series."""
+    cells = m * n
+    for limit, label in ((100, "le_1e2"), (1_000, "le_1e3"), (10_000, "le_1e4"),
+                         (100_000, "le_1e5"), (1_000_000, "le_1e6")):
+        if cells <= limit:
+            return label
+    return "gt_1e6"
+
+
+#  Sampled structured logging
+def log_sampled() -> bool:
+    """Cheap gate to check before building a debug payload."""
+    return LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE and log.isEnabledFor(logging.DEBUG)
+
+
+def log_event(event: str, level: int = logging.DEBUG, **fields):
+    log.log(level, json.dumps({"event": event, **fields}, default=str))
+
+
+#  Prometheus-style metrics
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _labels(names, values) -> str:
+    pairs = ",".join(f'{k}="{v}"' for k, v in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}
+        registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[key] = (counts, total + value)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted(self.series.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                running += count
+                labels = _labels(self.labelnames + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {running}")
+        return lines
+
+
+registry = []
+
+
+def render_gauges(name: str, help: str, values: dict, labelname: str = None, kind: str = "gauge") -> list:
+    """Point-in-time values (e.g. pool or cache counters) collected at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for key, value in values.items():
+        labels = _labels((labelname,), (key,)) if labelname else ""
+        lines.append(f"{name}{labels} {value}")
+    return lines
+
+
+def render_registry() -> list:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return lines
+
+
+analyze_seconds = Histogram(
+    "dss_analyze_seconds", "End-to-end /analyze latency.", ("size", "cache"),
+)
+analyze_stage_seconds = Histogram(
+    "dss_analyze_stage_seconds", "Time spent in each /analyze pipeline stage.", ("stage", "size"),
+)
+groq_seconds = Histogram(
+    "dss_groq_seconds", "Groq chat-completion latency.", ("mode", "outcome"),
+)
+groq_first_token_seconds = Histogram(
+    "dss_groq_first_token_seconds", "Time to the first streamed Groq token.", (),
+)
@@ -1,21 +1,27 @@
+import os
 
-import httpx
+from services.http_client import get_http_client
 
+# point DSS_DDG_URL at a local stand-in server for testing
+DDG_URL = os.getenv("DSS_DDG_URL", "https://api.duckduckgo.com/")
+
+
+async def ddg_search(query: str, max_results: int = 5, timeout: float = 8):
+    """DuckDuckGo instant-answer snippets for query; raises on HTTP errors."""
+    r = await get_http_client().get(
+        DDG_URL,
+        params={"q": query, "format": "json", "no_redirect": 1, "no_html": 1},
+        timeout=timeout,
+    )
+    r.raise_for_status()
+    data = r.json()
 
-async def _ddg_search(query: str, max_results: int = 5):
-    """Lightweight DuckDuckGo instant-answer + HTML scrape."""
     snippets = []
-    try:
-        url = f"https://api.duckduckgo.com/?q={httpx.QueryParams({'q': query})}&format=json&no_redirect=1&no_html=1"
-        async with httpx.AsyncClient(timeout=8) as client:
-            r = await client.get(url)
-            data = r.json()
-        if data.get("AbstractText"):
-            snippets.append(data["AbstractText"])
-        for t in data.get("RelatedTopics", [])[:max_results]:
-            txt = t.get("Text") or t.get("FirstURL", "")
-            if txt:
-                snippets.append(txt[:300])
-    except Exception:
-        pass
+    if data.get("AbstractText"):
+        snippets.append(data["AbstractText"])
+    for t in data.get("RelatedTopics", [])[:max_results]:
+        txt = t.get("Text") or t.get("FirstURL", "")
+        if txt:
+            snippets.append(txt[:300])
     return snippets
+
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from models import CombinedRequest
+from services.analysis_pipeline import PRECISION_TOLERANCE, ranking_table, run_analysis, top_order
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+@pytest.mark.parametrize("start, stop", [(0, 1), (0, 7), (3, 11), (0, 40), (35, 60)])
+def test_top_order_matches_stable_argsort(start, stop):
+    # few distinct values, so the cut falls inside runs of ties
+    key = np.random.default_rng(stop).integers(0, 6, 40).astype(float)
+
+    np.testing.assert_array_equal(top_order(key, stop, start), np.argsort(key, kind="stable")[start:stop])
+
+
+def test_ranking_table_layouts_agree():
+    columns = {"closeness": np.array([0.2, 0.9, 0.5, 0.7]), "d_pos": np.array([4.0, 1.0, 3.0, 2.0])}
+    ranked = np.array([1, 3])
+
+    rows = ranking_table(["w", "x", "y", "z"], columns, ranked, offset=2)
+    cols = ranking_table(["w", "x", "y", "z"], columns, ranked, "columns", offset=2)
+
+    assert rows == [
+        {"rank": 3, "alternative": "x", "closeness": 0.9, "d_pos": 1.0, "idx": 1},
+        {"rank": 4, "alternative": "z", "closeness": 0.7, "d_pos": 2.0, "idx": 3},
+    ]
+    assert cols["rank"].tolist() == [3, 4] and cols["alternative"] == ["x", "z"]
+    assert cols["closeness"].tolist() == [0.9, 0.7] and cols["idx"].tolist() == [1, 3]
+
+
+@pytest.fixture
+def body():
+    rng = np.random.default_rng(23)
+    return {
+        "criteria": ["c0", "c1", "c2"],
+        "alternatives": [f"a{i}" for i in range(23)],
+        "benefit": [True, False, True],
+        "score_matrix": rng.uniform(1, 9, (23, 3)).round(1).tolist(),
+        "preference_matrix": [[1, 2, 3], [1, 1, 2], [1, 1, 1]],
+        "include": ["ranking"],
+    }
+
+
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_top_k_pages_add_up_to_the_full_ranking(client, body, layout):
+    body["layout"] = layout
+    full = client.post("/api/analyze", json=body, headers=NO_CACHE).json()["ranking_table"]
+
+    first = client.post("/api/analyze", json={**body, "top_k": 5}, headers=NO_CACHE).json()
+    pages = [first["ranking_table"]]
+    cursor = first["ranking_page"]["next_cursor"]
+    while cursor:
+        page = client.get("/api/analyze/ranking", params={"cursor": cursor, "limit": 7}).json()
+        pages.append(page["ranking_table"])
+        cursor = page["next_cursor"]
+
+    assert first["ranking_page"]["total"] == 23
+    if layout == "rows":
+        assert [len(p) for p in pages] == [5, 7, 7, 4]
+        assert sum(pages, []) == full
+    else:
+        for name, values in full.items():
+            assert sum((p[name] for p in pages), []) == values
+
+
+def test_ranking_cursor_errors(client):
+    assert client.get("/api/analyze/ranking", params={"cursor": "nonsense"}).status_code == 400
+    assert client.get("/api/analyze/ranking", params={"cursor": "0" * 64 + ":5"}).status_code == 404
+
+
+def _analysis(body, **overrides):
+    return run_analysis(CombinedRequest(**{**body, "include": None, **overrides}))
+
+
+def test_float32_stays_within_tolerance_of_float64(body):
+    fast = _analysis(body, precision="float32")
+    exact = _analysis(body)
+
+    assert fast["precision"] == {"requested": "float32", "used": "float32", "tolerance": PRECISION_TOLERANCE}
+    assert fast["winner"] == exact["winner"]
+    np.testing.assert_allclose(
+        [row["closeness"] for row in sorted(fast["ranking_table"], key=lambda r: r["idx"])],
+        [row["closeness"] for row in sorted(exact["ranking_table"], key=lambda r: r["idx"])],
+        atol=PRECISION_TOLERANCE,
+    )
+    # entropy weights are always computed in float64
+    assert fast["entropy_weights"] == exact["entropy_weights"]
+
+
+def test_float32_near_tie_reruns_in_float64(body):
+    best = _analysis(body)["ranking_table"][0]["idx"]
+    body["score_matrix"].append(list(body["score_matrix"][best]))
+    body["alternatives"].append("twin")
+
+    result = _analysis(body, precision="float32")
+
+    assert result["precision"]["used"] == "float64"
+    assert {k: v for k, v in result.items() if k != "precision"} == _analysis(body)
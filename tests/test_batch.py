@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+
+from api.responses import dumps
+from models import CombinedRequest
+from services.analysis_pipeline import run_analysis
+from services.batch import plan_batches, run_scenario_batch
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+def _scenario(seed, **overrides):
+    rng = np.random.default_rng(seed)
+    return {
+        "criteria": ["c0", "c1", "c2"],
+        "alternatives": [f"a{i}" for i in range(6)],
+        "benefit": [True, False, True],
+        "score_matrix": rng.uniform(1, 9, (6, 3)).round(1).tolist(),
+        "preference_matrix": [[1, 3, 5], [1, 1, 2], [1, 1, 1]],
+        **overrides,
+    }
+
+
+def test_plan_batches_groups_by_score_matrix_then_chunks():
+    shared = [CombinedRequest(**_scenario(1, preference_matrix=[[1, p, 1], [1, 1, 1], [1, 1, 1]]))
+              for p in range(1, 6)]
+    other = CombinedRequest(**_scenario(2))
+    indexed = list(enumerate(shared[:3] + [other] + shared[3:]))
+
+    batches = plan_batches(indexed, chunk=2)
+
+    assert [[index for index, _ in b] for b in batches] == [[0, 1], [2, 4], [5], [3]]
+
+
+def test_shared_preparation_matches_separate_runs():
+    base = _scenario(3)
+    reqs = [
+        CombinedRequest(**base, include=["weights"]),
+        CombinedRequest(**base),
+        CombinedRequest(**base, method="vikor", include=["ranking", "sensitivity"]),
+    ]
+
+    together = run_scenario_batch(list(enumerate(reqs)))
+    separate = [run_analysis(req) for req in reqs]
+
+    assert [line["status"] for line in together] == [200, 200, 200]
+    assert dumps([line["result"] for line in together]) == dumps(separate)
+
+
+def test_batch_endpoint_streams_every_scenario(client):
+    scenarios = [_scenario(s) for s in range(6)] + [_scenario(7, benefit=[True])]
+
+    r = client.post("/api/analyze/batch", json={"scenarios": scenarios}, headers=NO_CACHE)
+    lines = {line["index"]: line for line in map(json.loads, r.text.splitlines())}
+
+    assert r.status_code == 200
+    assert sorted(lines) == list(range(7))
+    assert lines[6] == {"index": 6, "status": 400, "error": "benefit must have one entry per criterion"}
+    for index, scenario in enumerate(scenarios[:6]):
+        expected = client.post("/api/analyze", json=scenario, headers=NO_CACHE).json()
+        assert lines[index]["status"] == 200
+        assert lines[index]["result"] == expected
+
+
+def test_batch_endpoint_serves_repeats_from_cache(client):
+    scenarios = [_scenario(20), _scenario(21)]
+    client.post("/api/analyze/batch", json={"scenarios": scenarios})
+
+    r = client.post("/api/analyze/batch", json={"scenarios": scenarios})
+    lines = [json.loads(line) for line in r.text.splitlines()]
+
+    assert [line.get("cache") for line in lines] == ["HIT", "HIT"]
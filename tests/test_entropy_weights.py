@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from mcdn_engine.entropy_weights import IncrementalEntropy, entropy_weights
+
+BENEFIT = [True, False, True, False]
+
+
+def _assert_matches(state):
+    weights, entropy = state.weights()
+    ref_weights, ref_entropy = entropy_weights(state.values, state.benefit)
+
+    np.testing.assert_allclose(entropy, ref_entropy, atol=1e-12)
+    np.testing.assert_allclose(weights, ref_weights, atol=1e-10)
+
+
+def test_random_edits_track_a_full_recompute():
+    rng = np.random.default_rng(29)
+    matrix = rng.integers(1, 10, (20, 4)).astype(float)
+    matrix[:, 3] = 5.0  # a flat column
+    state = IncrementalEntropy(matrix, BENEFIT)
+    _assert_matches(state)
+
+    for step in range(300):
+        op = rng.integers(4)
+        if op == 0 or state.m <= 3:
+            state.append(rng.integers(0, 12, 4).astype(float))
+        elif op == 1:
+            state.remove(int(rng.integers(state.m)))
+        elif op == 2:
+            state.set_value(int(rng.integers(state.m)), int(rng.integers(4)), float(rng.integers(0, 12)))
+        else:
+            col = int(rng.integers(4))
+            state.set_benefit(col, not state.benefit[col])
+        _assert_matches(state)
+
+
+def test_append_grows_past_the_initial_buffer():
+    state = IncrementalEntropy([[1, 2, 3, 4], [4, 3, 2, 1]], BENEFIT)
+    for i in range(100):
+        assert state.append([i % 7, i % 5, i % 3, i % 11]) == i + 2
+
+    assert state.values.shape == (102, 4)
+    _assert_matches(state)
+
+
+def test_edit_errors():
+    state = IncrementalEntropy([[1, 2, 3, 4], [4, 3, 2, 1]], BENEFIT)
+
+    with pytest.raises(ValueError):
+        state.append([1, 2, 3])
+    with pytest.raises(IndexError):
+        state.remove(2)
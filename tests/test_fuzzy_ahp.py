@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from mcdn_engine.fuzzy_ahp import RI_TABLE, fuzzy_ahp, group_fuzzy_ahp, random_index
+from mcdn_engine.tfn import defuzz, recip_tfn, tfn_add, tfn_mul, tfn_recip, val_to_tfn
+
+
+def _reference_extent_ahp(n, pref):
+    """The original loop implementation of Chang's extent analysis."""
+    fmat = [
+        [
+            (1.0, 1.0, 1.0) if i == j
+            else val_to_tfn(pref[i][j]) if i < j
+            else recip_tfn(val_to_tfn(pref[j][i]))
+            for j in range(n)
+        ]
+        for i in range(n)
+    ]
+    row_sums = [tfn_add(row) for row in fmat]
+    tr = tfn_recip(tfn_add(row_sums))
+    weights = [tfn_mul(r, tr) for r in row_sums]
+
+    crisp = np.array([[defuzz(t) for t in row] for row in fmat])
+    w_crisp = np.array([defuzz(w) for w in weights])
+    lam = float(np.mean(crisp @ w_crisp / w_crisp))
+    ci = (lam - n) / (n - 1)
+    cr = ci / RI_TABLE[n] if RI_TABLE[n] > 0 else 0
+    return weights, round(lam, 4), round(ci, 4), round(cr, 4)
+
+
+def _preferences(n, seed):
+    return np.random.default_rng(seed).uniform(1, 9, (n, n)).round(1).tolist()
+
+
+@pytest.mark.parametrize("n", [2, 3, 7, 15])
+def test_extent_matches_reference_implementation(n):
+    pref = _preferences(n, n)
+
+    weights, lam, ci, cr = fuzzy_ahp(n, pref)
+    ref_weights, ref_lam, ref_ci, ref_cr = _reference_extent_ahp(n, pref)
+
+    np.testing.assert_allclose(weights, ref_weights, rtol=1e-12)
+    assert (lam, ci, cr) == (ref_lam, ref_ci, ref_cr)
+
+
+def test_geometric_mean_is_consistent_with_extent_ordering():
+    # criterion 0 dominates every other one, criterion 3 is dominated by all
+    pref = [[1, 5, 7, 9], [1, 1, 3, 5], [1, 1, 1, 3], [1, 1, 1, 1]]
+
+    extent, *_ = fuzzy_ahp(4, pref, "extent")
+    geometric, lam, ci, cr = fuzzy_ahp(4, pref, "geometric_mean")
+
+    crisp = [defuzz(w) for w in geometric]
+    assert crisp == sorted(crisp, reverse=True)
+    assert np.argsort([defuzz(w) for w in extent]).tolist() == np.argsort(crisp).tolist()
+    assert all(lo <= mid <= hi for lo, mid, hi in geometric)
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError):
+        fuzzy_ahp(3, _preferences(3, 0), "eigenvector")
+
+
+def test_random_index_uses_the_table_then_simulates():
+    assert [random_index(n) for n in (1, 2, 3, 15)] == [0, 0, 0.58, 1.58]
+    simulated = [random_index(n) for n in (16, 20, 30)]
+
+    # seeded, so repeat calls agree even without the cache
+    assert random_index.__wrapped__(20) == simulated[1]
+    assert simulated == sorted(simulated)
+    assert 1.58 < simulated[0] < 1.62 and simulated[-1] < 1.8
+
+
+def test_large_criteria_sets_are_supported():
+    n = 60
+    weights, lam, ci, cr = fuzzy_ahp(n, _preferences(n, 1), "geometric_mean")
+
+    assert len(weights) == n
+    assert np.isfinite([lam, ci, cr]).all()
+
+
+def _assert_same_ahp(got, want):
+    """AHP tuples equal up to the exp/log round trip of the geometric mean."""
+    np.testing.assert_allclose(got[0], want[0], rtol=1e-12)
+    assert got[1:4] == pytest.approx(want[1:4], abs=1e-4)
+
+
+def test_group_of_one_expert_is_plain_ahp():
+    pref = _preferences(5, 2)
+
+    weights, lam, ci, cr, experts = group_fuzzy_ahp(5, [pref])
+
+    _assert_same_ahp((weights, lam, ci, cr), fuzzy_ahp(5, pref))
+    assert [experts[k][0] for k in ("lambda_max", "CI", "CR")] == pytest.approx([lam, ci, cr], abs=1e-4)
+
+
+def test_group_reports_each_experts_consistency():
+    prefs = [_preferences(6, seed) for seed in (3, 4, 5)]
+
+    *_, experts = group_fuzzy_ahp(6, prefs, method="geometric_mean")
+
+    for k, pref in enumerate(prefs):
+        _, lam, ci, cr = fuzzy_ahp(6, pref, "geometric_mean")
+        assert (experts["lambda_max"][k], experts["CI"][k], experts["CR"][k]) == (lam, ci, cr)
+
+
+def test_expert_weights_select_and_blend():
+    a, b = _preferences(4, 6), _preferences(4, 7)
+
+    _assert_same_ahp(group_fuzzy_ahp(4, [a, b], [1, 0]), fuzzy_ahp(4, a))
+    # weights are normalised, so scaling them changes nothing
+    _assert_same_ahp(group_fuzzy_ahp(4, [a, b], [1, 3]), group_fuzzy_ahp(4, [a, b], [0.25, 0.75]))
+    with pytest.raises(ValueError):
+        group_fuzzy_ahp(4, [a, b], [0, 0])
+
+
+def test_analyze_in_group_mode(client):
+    body = {
+        "criteria": ["c0", "c1", "c2"],
+        "alternatives": ["x", "y", "z"],
+        "benefit": [True, True, False],
+        "score_matrix": [[1, 5, 3], [4, 2, 2], [3, 3, 1]],
+        "preference_matrices": [_preferences(3, 8), _preferences(3, 9)],
+        "expert_weights": [2, 1],
+        "include": ["weights", "consistency"],
+    }
+
+    r = client.post("/api/analyze", json=body)
+
+    weights, lam, *_ = group_fuzzy_ahp(3, body["preference_matrices"], body["expert_weights"])
+    assert r.status_code == 200
+    np.testing.assert_allclose(r.json()["ahp_weights"], weights)
+    assert r.json()["consistency"]["lambda_max"] == lam
+    assert len(r.json()["consistency"]["experts"]["CR"]) == 2
+
+    bad = client.post("/api/analyze", json={**body, "expert_weights": [1]})
+    assert bad.status_code == 400
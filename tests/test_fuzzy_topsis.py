@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+import pytest
+
+from mcdn_engine.fuzzy_topsis import fuzzy_topsis
+
+
+def _reference_topsis(matrix, weights, benefit):
+    """The original per-cell loop implementation, kept as the parity oracle."""
+    arr = np.array(matrix, dtype=float)
+    m, n = arr.shape
+
+    norm = np.zeros_like(arr)
+    for j in range(n):
+        col = arr[:, j]
+        den = np.sqrt(np.sum(col ** 2))
+        norm[:, j] = col / den if den != 0 else col
+
+    spreads = [min(0.3, np.std(norm[:, j]) / (abs(np.mean(norm[:, j])) + 1e-10)) for j in range(n)]
+    w_tfn = [tuple(w) if isinstance(w, (list, tuple)) else (w, w, w) for w in weights]
+    vmat = [
+        [
+            tuple(t * w for t, w in zip(
+                (norm[i, j] * (1 - spreads[j]), norm[i, j], norm[i, j] * (1 + spreads[j])), w_tfn[j]
+            ))
+            for j in range(n)
+        ]
+        for i in range(m)
+    ]
+
+    fpis, fnis = [], []
+    for j in range(n):
+        cols = [[vmat[i][j][c] for i in range(m)] for c in range(3)]
+        hi = tuple(max(c) for c in cols)
+        lo = tuple(min(c) for c in cols)
+        fpis.append(hi if benefit[j] else lo)
+        fnis.append(lo if benefit[j] else hi)
+
+    def dist(a, b):
+        return math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b)) / 3)
+
+    d_pos = [sum(dist(vmat[i][j], fpis[j]) for j in range(n)) for i in range(m)]
+    d_neg = [sum(dist(vmat[i][j], fnis[j]) for j in range(n)) for i in range(m)]
+    cc = [d_neg[i] / (d_pos[i] + d_neg[i]) if d_pos[i] + d_neg[i] > 1e-10 else 0 for i in range(m)]
+    return cc, d_pos, d_neg
+
+
+@pytest.mark.parametrize("fuzzy_weights", [False, True])
+def test_matches_reference_implementation(fuzzy_weights):
+    rng = np.random.default_rng(7)
+    matrix = rng.uniform(1, 9, (40, 6)).round(2).tolist()
+    benefit = [True, False, True, True, False, True]
+    weights = rng.dirichlet(np.ones(6)).tolist()
+    if fuzzy_weights:
+        weights = [(0.8 * w, w, 1.2 * w) for w in weights]
+
+    got = fuzzy_topsis(matrix, weights, benefit)
+    want = _reference_topsis(matrix, weights, benefit)
+
+    for g, w in zip(got, want):
+        np.testing.assert_allclose(g, w, rtol=1e-12, atol=1e-12)
+
+
+def test_constant_column_and_zero_column():
+    matrix = [[0, 5, 1], [0, 5, 2], [0, 5, 3]]
+    weights = [0.2, 0.3, 0.5]
+    benefit = [True, True, False]
+
+    got = fuzzy_topsis(matrix, weights, benefit)
+    want = _reference_topsis(matrix, weights, benefit)
+
+    for g, w in zip(got, want):
+        np.testing.assert_allclose(g, w, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from services import http_client
+from services.http_client import SingleFlight, close_http_client, get_http_client
+
+
+def test_client_reuses_one_keep_alive_connection(stub_server):
+    stub_server.respond("/ping", body={"ok": True})
+
+    async def calls():
+        client = get_http_client()
+        try:
+            for _ in range(3):
+                r = await client.get(stub_server.url + "/ping")
+                assert r.json() == {"ok": True}
+            return client, r.http_version
+        finally:
+            await close_http_client()
+
+    client, version = asyncio.run(calls())
+
+    assert len(stub_server.requests) == 3
+    assert len(set(stub_server.peers)) == 1
+    # a plain-HTTP stand-in never negotiates HTTP/2, with or without h2
+    assert version == "HTTP/1.1"
+    assert client.is_closed
+
+
+def test_client_is_recreated_after_close():
+    async def lifecycle():
+        first = get_http_client()
+        assert get_http_client() is first
+        await close_http_client()
+        second = get_http_client()
+        await close_http_client()
+        return first, second
+
+    first, second = asyncio.run(lifecycle())
+    assert first is not second
+
+
+def test_http2_follows_h2_availability():
+    import importlib.util
+
+    assert http_client.HTTP2_AVAILABLE == (importlib.util.find_spec("h2") is not None)
+
+
+def test_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("DSS_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("DSS_HTTP_MAX_KEEPALIVE", "3")
+
+    limits = http_client._limits()
+
+    assert limits.max_connections == 7 and limits.max_keepalive_connections == 3
+
+
+def test_single_flight_coalesces_concurrent_calls(stub_server):
+    stub_server.respond("/slow", body={"n": 1}, delay=0.2)
+    flights = SingleFlight()
+
+    async def fetch():
+        r = await get_http_client().get(stub_server.url + "/slow")
+        return r.json()
+
+    async def burst():
+        try:
+            return await asyncio.gather(*(flights.run("k", fetch) for _ in range(5)))
+        finally:
+            await close_http_client()
+
+    results = asyncio.run(burst())
+
+    assert results == [{"n": 1}] * 5
+    assert len(stub_server.requests) == 1
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+@pytest.mark.skipif(not http_client.HTTP2_AVAILABLE, reason="h2 is not installed")
+def test_client_is_configured_for_http2():
+    async def check():
+        try:
+            return get_http_client()._transport._pool._http2
+        finally:
+            await close_http_client()
+
+    assert asyncio.run(check())
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from mcdn_engine.fuzzy_topsis import compute_spread, normalise_matrix, weights_to_tfn
+from mcdn_engine.ranking_methods import (
+    RANKING_METHODS, method_context, promethee, rank_agreement, run_method,
+)
+
+BENEFIT = [True, False, True, False]
+WEIGHTS = [0.35, 0.15, 0.3, 0.2]
+
+
+def _context(matrix, weights=WEIGHTS):
+    norm = normalise_matrix(np.asarray(matrix, dtype=float))
+    return method_context(norm, compute_spread(norm), weights_to_tfn(weights), BENEFIT)
+
+
+@pytest.fixture
+def ctx():
+    return _context(np.random.default_rng(13).uniform(1, 9, (30, 4)).round(1))
+
+
+def _reference_promethee(ctx):
+    """PROMETHEE II with the full (m, m, n) difference tensor."""
+    fmat, w = ctx["fmat"], ctx["w"]
+    sign = np.where(ctx["benefit"], 1.0, -1.0)
+    tfn = np.sort(fmat * sign[None, :, None], axis=-1)
+    span = np.ptp(tfn[..., 1], axis=0)
+
+    diffs = np.stack([
+        tfn[:, None, :, 0] - tfn[None, :, :, 2],
+        tfn[:, None, :, 1] - tfn[None, :, :, 1],
+        tfn[:, None, :, 2] - tfn[None, :, :, 0],
+    ])
+    pref = np.clip(diffs / np.where(span > 0, span, np.inf), 0, 1).mean(axis=0)
+    pi = pref @ w
+    np.fill_diagonal(pi, 0)
+    m = pi.shape[0]
+    plus, minus = pi.sum(axis=1) / (m - 1), pi.sum(axis=0) / (m - 1)
+    return plus - minus
+
+
+def test_promethee_matches_full_matrix_reference(ctx):
+    np.testing.assert_allclose(promethee(ctx)["score"], _reference_promethee(ctx), atol=1e-12)
+
+
+def test_promethee_tiles_do_not_change_the_flows(ctx):
+    whole = promethee(ctx)
+    tiled = promethee(ctx, tile_cells=7 * 30)
+
+    for key in ("phi_plus", "phi_minus", "score"):
+        np.testing.assert_allclose(tiled[key], whole[key], atol=1e-12)
+
+
+@pytest.mark.parametrize("name", list(RANKING_METHODS))
+def test_dominating_alternative_ranks_first(name):
+    matrix = np.random.default_rng(17).uniform(2, 8, (12, 4)).round(1)
+    # best on every criterion: highest benefit values, lowest costs
+    matrix[5] = [9, 1, 9, 1]
+
+    result = run_method(name, _context(matrix))
+
+    assert result["order"][0] == 5
+    if name == "vikor":
+        assert result["score"][5] == 0
+
+
+def test_rank_agreement():
+    orders = {"a": np.array([0, 1, 2, 3]), "b": np.array([0, 1, 2, 3]), "c": np.array([3, 2, 1, 0])}
+
+    rho = rank_agreement(orders)["spearman"]
+
+    np.testing.assert_allclose(rho, [[1, 1, -1], [1, 1, -1], [-1, -1, 1]])
+
+
+def test_analyze_compare_methods(client):
+    rng = np.random.default_rng(19)
+    body = {
+        "criteria": ["c0", "c1", "c2", "c3"],
+        "alternatives": [f"a{i}" for i in range(10)],
+        "benefit": BENEFIT,
+        "score_matrix": rng.uniform(1, 9, (10, 4)).round(1).tolist(),
+        "preference_matrix": [[1, 2, 1, 3], [1, 1, 1, 1], [1, 1, 1, 2], [1, 1, 1, 1]],
+        "method": "vikor",
+        "compare_methods": True,
+        "include": ["ranking"],
+    }
+
+    r = client.post("/api/analyze", json=body)
+
+    assert r.status_code == 200
+    result = r.json()
+    assert result["method"] == "vikor"
+    comparison = result["method_comparison"]
+    assert list(comparison["methods"]) == list(RANKING_METHODS)
+    assert comparison["methods"]["vikor"]["winner"] == result["winner"]
+    for name, method in comparison["methods"].items():
+        assert sorted(method["rank"]) == list(range(1, 11))
+        assert comparison["spearman"][name][name] == 1
+    # VIKOR's Q is lower-is-better, so the table ascends
+    qs = [row["score"] for row in result["ranking_table"]]
+    assert qs == sorted(qs)
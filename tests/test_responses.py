@@ -0,0 +1,30 @@
+import json
+
+import numpy as np
+import pytest
+
+from api import responses
+
+CONTENT = {
+    "scores": np.array([0.25, 0.5], dtype=np.float32),
+    "order": np.array([1, 0]),
+    "winner": np.int64(1),
+    "name": "café",
+}
+
+
+def test_orjson_and_stdlib_encoders_agree(monkeypatch):
+    pytest.importorskip("orjson")
+    fast = json.loads(responses.dumps(CONTENT))
+
+    monkeypatch.setattr(responses, "orjson", None)
+    slow = json.loads(responses.dumps(CONTENT))
+
+    assert fast == slow == {"scores": [0.25, 0.5], "order": [1, 0], "winner": 1, "name": "café"}
+
+
+def test_stdlib_fallback_rejects_nan(monkeypatch):
+    monkeypatch.setattr(responses, "orjson", None)
+
+    with pytest.raises(ValueError):
+        responses.dumps({"x": float("nan")})
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from mcdn_engine.fuzzy_topsis import (
+    closeness_batch, compute_spread, crisp_distance_matrices, normalise_matrix,
+)
+from services.sensitivity_analysis import perturbed_weights, sensitivity_analysis, stability_intervals
+
+ALTERNATIVES = [f"a{i}" for i in range(25)]
+CRITERIA = ["cost", "speed", "quality", "support", "risk"]
+BENEFIT = [False, True, True, True, False]
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(3).uniform(1, 9, (25, 5)).round(1).tolist()
+
+
+def test_perturbed_weights_are_normalised():
+    batch = perturbed_weights([0.1, 0.2, 0.3, 0.4])
+
+    assert batch.shape == (1 + 4 * 5, 4)
+    np.testing.assert_allclose(batch[1:].sum(axis=1), 1.0)
+    np.testing.assert_allclose(batch[0], [0.1, 0.2, 0.3, 0.4])
+
+
+def test_batched_matches_looped(matrix):
+    weights = [0.3, 0.1, 0.25, 0.15, 0.2]
+
+    batched = sensitivity_analysis(ALTERNATIVES, matrix, weights, BENEFIT, CRITERIA)
+    looped = sensitivity_analysis(ALTERNATIVES, matrix, weights, BENEFIT, CRITERIA, batched=False)
+
+    assert batched == looped
+
+
+def test_precomputed_distance_cells_match(matrix):
+    weights = [0.2] * 5
+    norm = normalise_matrix(np.asarray(matrix, dtype=float))
+    cells = crisp_distance_matrices(norm, compute_spread(norm), BENEFIT)
+
+    assert sensitivity_analysis(ALTERNATIVES, matrix, weights, BENEFIT, CRITERIA, distance_cells=cells) == (
+        sensitivity_analysis(ALTERNATIVES, matrix, weights, BENEFIT, CRITERIA)
+    )
+
+
+def _brute_force_interval(matrix, weights, benefit, i, top_k, steps=2000):
+    """Share range around the base share of criterion i that keeps the base top-k set."""
+    norm = normalise_matrix(np.asarray(matrix, dtype=float))
+    cells = crisp_distance_matrices(norm, compute_spread(norm), benefit)
+    w = np.asarray(weights, dtype=float) / sum(weights)
+    others = np.delete(np.arange(len(w)), i)
+
+    shares = np.linspace(0, 1, steps + 1)
+    batch = np.zeros((shares.size, len(w)))
+    batch[:, i] = shares
+    batch[:, others] = (1 - shares)[:, None] * w[others] / w[others].sum()
+    cc, _, _ = closeness_batch(*cells, batch)
+    tops = [frozenset(np.argsort(-row, kind="stable")[:top_k].tolist()) for row in cc]
+    base = frozenset(np.argsort(-closeness_batch(*cells, w)[0][0], kind="stable")[:top_k].tolist())
+
+    start = int(round(w[i] * steps))
+    lo = hi = start
+    while lo > 0 and tops[lo - 1] == base:
+        lo -= 1
+    while hi < steps and tops[hi + 1] == base:
+        hi += 1
+    return shares[lo], shares[hi]
+
+
+@pytest.mark.parametrize("top_k", [1, 3])
+def test_stability_intervals_match_brute_force(matrix, top_k):
+    weights = [0.3, 0.1, 0.25, 0.15, 0.2]
+    result = stability_intervals(ALTERNATIVES, matrix, weights, BENEFIT, CRITERIA, top_k=top_k)
+
+    for i, criterion in enumerate(result["criteria_intervals"]):
+        lo, hi = _brute_force_interval(matrix, weights, BENEFIT, i, top_k)
+        interval = criterion["stable_interval"]
+        assert interval["weight_low"] == pytest.approx(lo, abs=1e-3)
+        assert interval["weight_high"] == pytest.approx(hi, abs=1e-3)
+
+
+@pytest.mark.parametrize("patch, detail", [
+    ({"benefit": [True]}, "benefit must have one entry per criterion"),
+    ({"score_matrix": [[1, 2], [3, 1]]}, "score_matrix must be alternatives x criteria"),
+    ({"score_matrix": [[1, 2], [3], [2, 2]]}, "score_matrix must be alternatives x criteria"),
+    ({"combined_weights": [0.5]}, "combined_weights must have one entry per criterion"),
+    ({"combined_weights": [0, 0]}, "combined_weights must be finite, non-negative and not all zero"),
+])
+def test_intervals_endpoint_rejects_bad_shapes(client, patch, detail):
+    body = {
+        "criteria": ["a", "b"],
+        "alternatives": ["x", "y", "z"],
+        "combined_weights": [0.5, 0.5],
+        "score_matrix": [[1, 2], [3, 1], [2, 2]],
+        "benefit": [True, False],
+    }
+    assert client.post("/api/sensitivity/intervals", json=body).status_code == 200
+
+    r = client.post("/api/sensitivity/intervals", json={**body, **patch})
+    assert r.status_code == 400
+    assert r.json()["detail"] == detail
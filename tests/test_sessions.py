@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+N_CRITERIA = 4
+CRITERIA = [f"c{j}" for j in range(N_CRITERIA)]
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+@pytest.fixture
+def body():
+    rng = np.random.default_rng(9)
+    return {
+        "criteria": CRITERIA,
+        "alternatives": [f"a{i}" for i in range(8)],
+        "benefit": [True, False, True, True],
+        "score_matrix": rng.uniform(1, 9, (8, N_CRITERIA)).round(1).tolist(),
+        "preference_matrix": rng.uniform(1, 5, (N_CRITERIA, N_CRITERIA)).round(1).tolist(),
+    }
+
+
+def _assert_same_analysis(session, analysis):
+    assert session.keys() - {"session_id"} == analysis.keys()
+    for key, value in analysis.items():
+        if key in ("ahp_weights", "entropy_weights", "combined_weights", "entropy_values"):
+            np.testing.assert_allclose(session[key], value, rtol=1e-9)
+        else:
+            assert session[key] == value, key
+
+
+def test_session_matches_analyze_after_edits(client, body):
+    created = client.post("/api/sessions", json=body).json()
+    _assert_same_analysis(created, client.post("/api/analyze", json=body, headers=NO_CACHE).json())
+
+    updates = [
+        {"op": "score", "row": 2, "col": 1, "value": 8.5},
+        {"op": "preference", "row": 0, "col": 3, "value": 4.0},
+        {"op": "benefit", "col": 2, "value": 0},
+        {"op": "add_alternative", "name": "new", "scores": [5, 5, 5, 5]},
+        {"op": "remove_alternative", "row": 0},
+    ]
+    patched = client.patch(f"/api/sessions/{created['session_id']}", json={"updates": updates})
+    assert patched.status_code == 200
+    assert patched.json()["sensitivity"] is None
+
+    body["score_matrix"][2][1] = 8.5
+    body["preference_matrix"][0][3] = 4.0
+    body["benefit"][2] = False
+    body["score_matrix"] = body["score_matrix"][1:] + [[5, 5, 5, 5]]
+    body["alternatives"] = body["alternatives"][1:] + ["new"]
+
+    session = client.get(f"/api/sessions/{created['session_id']}").json()
+    _assert_same_analysis(session, client.post("/api/analyze", json=body, headers=NO_CACHE).json())
+
+
+@pytest.mark.parametrize("updates", [
+    [{"op": "score", "row": 0, "col": 0, "value": 2.0}, {"op": "preference", "row": 2, "col": 1, "value": 3}],
+    [{"op": "score", "row": 0, "col": 0, "value": 2.0}, {"op": "score", "row": 99, "col": 0, "value": 1}],
+    [{"op": "add_alternative", "name": "x", "scores": [1, 2]}],
+    [{"op": "remove_alternative", "row": 0}] * 7,
+    [{"op": "rename", "row": 0}],
+])
+def test_rejected_batch_leaves_session_untouched(client, body, updates):
+    session_id = client.post("/api/sessions", json=body).json()["session_id"]
+    before = client.get(f"/api/sessions/{session_id}").json()
+
+    r = client.patch(f"/api/sessions/{session_id}", json={"updates": updates})
+
+    assert r.status_code == 400
+    assert client.get(f"/api/sessions/{session_id}").json() == before
+
+
+def test_deleted_session_is_gone(client, body):
+    session_id = client.post("/api/sessions", json=body).json()["session_id"]
+
+    assert client.delete(f"/api/sessions/{session_id}").status_code == 200
+    assert client.get(f"/api/sessions/{session_id}").status_code == 404
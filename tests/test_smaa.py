@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+
+from mcdn_engine.fuzzy_topsis import fuzzy_topsis
+from services.smaa import dirichlet_alpha, smaa_chunk, smaa_distance_cells
+
+MATRIX = np.random.default_rng(11).uniform(1, 9, (12, 4)).round(1).tolist()
+BENEFIT = [True, False, True, True]
+
+
+def test_tracked_ranks_match_full_counts():
+    cells = smaa_distance_cells(MATRIX, BENEFIT, 12, 4)
+    alpha = dirichlet_alpha([0.25] * 4, 20.0)
+
+    full, central_full = smaa_chunk(*cells, "dirichlet", alpha, 3000, 5)
+    top, central_top = smaa_chunk(*cells, "dirichlet", alpha, 3000, 5, ranks=3)
+
+    assert full.shape == (12, 12) and top.shape == (12, 3)
+    np.testing.assert_array_equal(top, full[:, :3])
+    np.testing.assert_array_equal(central_top, central_full)
+    # every sample places one alternative at each rank and each alternative once
+    assert (full.sum(axis=0) == 3000).all() and (full.sum(axis=1) == 3000).all()
+
+
+def test_concentrated_weights_pick_the_topsis_winner():
+    weights = [0.4, 0.1, 0.3, 0.2]
+    cc, _, _ = fuzzy_topsis(MATRIX, weights, BENEFIT)
+    cells = smaa_distance_cells(MATRIX, BENEFIT, 12, 4)
+
+    counts, _ = smaa_chunk(*cells, "dirichlet", dirichlet_alpha(weights, 1e6), 500, 1, ranks=1)
+
+    assert int(np.argmax(counts[:, 0])) == int(np.argmax(cc))
+    assert counts[:, 0].max() == 500
+
+
+def _smaa_body(**overrides):
+    return {
+        "criteria": ["c0", "c1", "c2", "c3"],
+        "alternatives": [f"a{i}" for i in range(12)],
+        "score_matrix": MATRIX,
+        "benefit": BENEFIT,
+        "combined_weights": [0.4, 0.1, 0.3, 0.2],
+        "weight_source": "dirichlet",
+        "n_samples": 4000,
+        "chunk_size": 1000,
+        "ranks": 2,
+        "seed": 3,
+        **overrides,
+    }
+
+
+def test_smaa_endpoint_streams_progress_then_result(client):
+    r = client.post("/api/smaa", json=_smaa_body())
+    events = [json.loads(line) for line in r.text.splitlines()]
+
+    assert r.status_code == 200
+    assert [e["event"] for e in events] == ["progress"] * 4 + ["result"]
+    result = events[-1]
+    assert result["ranks_tracked"] == 2
+    assert all(len(row["rank_acceptability"]) == 2 for row in result["alternatives"])
+    assert sum(row["first_rank_acceptability"] for row in result["alternatives"]) == pytest.approx(1, abs=1e-3)
+
+    # chunks are combined in plan order, so a seed reproduces the run
+    assert client.post("/api/smaa", json=_smaa_body()).text.splitlines()[-1] == r.text.splitlines()[-1]
+
+
+def test_smaa_endpoint_rejects_bad_shapes_before_streaming(client):
+    r = client.post("/api/smaa", json=_smaa_body(score_matrix=MATRIX[:5]))
+
+    assert r.status_code == 400
+    assert r.json()["detail"] == "score_matrix must be alternatives x criteria"
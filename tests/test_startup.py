@@ -0,0 +1,24 @@
+import json
+import subprocess
+import sys
+
+from benchmarks.import_profile import DEFAULT_BUDGET_MS, DEFERRED, ROOT, profile_imports
+
+
+def test_import_main_defers_llm_and_web_modules():
+    code = (
+        "import json, sys, main; "
+        f"print(json.dumps([m for m in {list(DEFERRED)!r} if m in sys.modules]))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+
+
+def test_import_main_within_budget():
+    # best of several runs, so one descheduled interpreter does not fail the check
+    report = profile_imports("main", runs=8, top=5)
+
+    assert report["deferred_loaded"] == []
+    assert report["total_ms"] <= DEFAULT_BUDGET_MS, report["slowest"]
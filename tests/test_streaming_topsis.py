@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from mcdn_engine.entropy_weights import entropy_weights
+from mcdn_engine.fuzzy_topsis import fuzzy_topsis
+from mcdn_engine.streaming_topsis import rank_file
+
+BENEFIT = [True, False, True, False, True]
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(5).uniform(1, 9, (1000, 5)).round(3)
+
+
+def _expected_top(matrix, weights, top_k):
+    cc, d_pos, d_neg = (np.asarray(x) for x in fuzzy_topsis(matrix, weights, BENEFIT))
+    order = np.argsort(-cc, kind="stable")[:top_k]
+    return order.tolist(), cc[order]
+
+
+@pytest.mark.parametrize("fmt", ["npy", "csv"])
+def test_chunked_ranking_matches_in_memory(tmp_path, matrix, fmt):
+    weights = [0.3, 0.1, 0.2, 0.25, 0.15]
+    path = tmp_path / f"matrix.{fmt}"
+    if fmt == "npy":
+        np.save(path, matrix)
+    else:
+        np.savetxt(path, matrix, delimiter=",", header="a,b,c,d,e", comments="", fmt="%.3f")
+
+    result = rank_file(str(path), fmt, BENEFIT, weights, top_k=20, chunk_rows=64)
+
+    rows, cc = _expected_top(matrix, weights, 20)
+    assert [r["row"] for r in result["ranking"]] == rows
+    np.testing.assert_allclose([r["closeness"] for r in result["ranking"]], cc, atol=5e-5)
+    assert result["n_alternatives"] == 1000 and result["passes"] == 2
+
+
+def test_streamed_entropy_weights_match_in_memory(tmp_path, matrix):
+    path = tmp_path / "matrix.npy"
+    np.save(path, matrix)
+
+    result = rank_file(str(path), "npy", BENEFIT, top_k=10, chunk_rows=97)
+
+    weights, entropy = entropy_weights(matrix, BENEFIT)
+    np.testing.assert_allclose(result["entropy_values"], entropy, rtol=1e-9)
+    np.testing.assert_allclose(np.asarray(result["weights"])[:, 1], weights, rtol=1e-9)
+    assert [r["row"] for r in result["ranking"]] == _expected_top(matrix, weights, 10)[0]
+    assert result["passes"] == 3
+
+
+def test_csv_labels_follow_their_rows(tmp_path):
+    path = tmp_path / "labelled.csv"
+    path.write_text("id,x,y\nA,1,9\nB,9,1\nC,5,5\n")
+
+    result = rank_file(str(path), "csv", [True, True], [0.9, 0.1], top_k=3, chunk_rows=2, id_column=True)
+
+    assert [r["label"] for r in result["ranking"]] == ["B", "C", "A"]
+
+
+def test_stream_endpoint_ranks_the_uploaded_body(client, matrix):
+    weights = [0.3, 0.1, 0.2, 0.25, 0.15]
+    body = "a,b,c,d,e\n" + "\n".join(",".join(f"{x:.3f}" for x in row) for row in matrix)
+
+    r = client.post(
+        "/api/topsis/stream",
+        params={"benefit": BENEFIT, "weights": weights, "top_k": 5, "chunk_rows": 128},
+        content=body.encode(),
+    )
+
+    assert r.status_code == 200
+    assert [row["row"] for row in r.json()["ranking"]] == _expected_top(matrix, weights, 5)[0]
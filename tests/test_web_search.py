@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import evidence, web_search
+from services.http_client import close_http_client
+
+
+def run(coro):
+    """Run coro on a fresh loop and close the shared client bound to it."""
+    async def wrapped():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(wrapped())
+
+
+@pytest.fixture
+def ddg(stub_server, monkeypatch):
+    monkeypatch.setattr(web_search, "DDG_URL", stub_server.url + "/ddg")
+    evidence.evidence_cache.clear()
+    return stub_server
+
+
+def test_ddg_search_returns_abstract_and_topics(ddg):
+    ddg.respond("/ddg", body={
+        "AbstractText": "Lisbon is the capital of Portugal.",
+        "RelatedTopics": [{"Text": "Population 545,000"}, {"FirstURL": "https://example.org"}, {}],
+    })
+
+    snippets = run(web_search.ddg_search("lisbon", max_results=5))
+
+    assert snippets == ["Lisbon is the capital of Portugal.", "Population 545,000", "https://example.org"]
+    path, query = ddg.requests[0]
+    assert query["q"] == ["lisbon"] and query["format"] == ["json"]
+
+
+def test_ddg_search_times_out(ddg):
+    ddg.respond("/ddg", body={"AbstractText": "late"}, delay=1.0)
+
+    with pytest.raises(httpx.TimeoutException):
+        run(web_search.ddg_search("slow", timeout=0.2))
+
+
+def test_ddg_search_raises_on_http_error(ddg):
+    ddg.respond("/ddg", status=503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(web_search.ddg_search("down"))
+
+
+def test_gather_evidence_keeps_what_finished_before_the_deadline(ddg, monkeypatch):
+    async def search(query, max_results=5, timeout=8):
+        if query == "slow":
+            await asyncio.sleep(5)
+        return await web_search.ddg_search(query, max_results, timeout)
+
+    monkeypatch.setattr(evidence, "ddg_search", search)
+    ddg.respond("/ddg", body={"AbstractText": "fast answer"})
+
+    out = run(evidence.gather_evidence(["fast", "slow"], deadline=0.5))
+
+    assert out["results"] == {"fast": ["fast answer"]}
+    assert out["timed_out"] == 1 and out["failed"] == 0
+
+
+def test_failed_search_falls_back_to_no_evidence(ddg):
+    ddg.respond("/ddg", status=500)
+
+    out = run(evidence.gather_evidence(["broken"], deadline=2))
+
+    assert out["results"] == {} and out["failed"] == 1
+    assert evidence.evidence_prompt(out) == ""
+    # failures are not cached, so a later call retries
+    assert evidence.evidence_cache.get("broken") is None
+
+
+def test_queries_sharing_a_snippet_each_keep_it(ddg):
+    ddg.respond("/ddg", body={
+        "AbstractText": "Model X weighs 1.2 kg and costs 999 USD.",
+        "RelatedTopics": [{"Text": "Model X weighs 1.2 kg and costs  999 USD."}],
+    })
+
+    out = run(evidence.gather_evidence(["model x price", "model x weight"], deadline=2))
+
+    assert out["results"] == {
+        "model x price": ["Model X weighs 1.2 kg and costs 999 USD."],
+        "model x weight": ["Model X weighs 1.2 kg and costs 999 USD."],
+    }
+    assert evidence.evidence_prompt(out).count("Model X") == 1